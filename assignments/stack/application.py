@@ -9,19 +9,238 @@ Author: Data Structure Course
 Date: 2024
 """
 
-from stack import ArrayStack, LinkedListStack, is_balanced_parentheses, evaluate_postfix, infix_to_postfix
+import gc
+import struct
+import sys
+import time
+from types import GeneratorType
+
+from stack import ArrayStack, LinkedListStack, BoundedStack, PersistentStack, is_balanced_parentheses, evaluate_postfix, infix_to_postfix
+
+
+class TextBuffer:
+    """
+    Chunked rope holding the text of a document.
+    
+    Text is kept as a list of string chunks. Appends go to a small tail
+    that is joined into a new chunk once it grows past CHUNK_SIZE, so
+    typing at the end of the document is O(1) amortized instead of
+    rebuilding the whole string on every keystroke.
+    """
+    
+    CHUNK_SIZE = 4096
+    
+    def __init__(self, text=""):
+        """
+        Initialize the buffer.
+        
+        Args:
+            text (str): Initial content (default: "")
+        """
+        self._chunks = [text] if text else []
+        self._tail = []
+        self._tail_length = 0
+        self._length = len(text)
+        self._text = text
+    
+    def __len__(self):
+        return self._length
+    
+    def _flush(self):
+        """Join the tail into a regular chunk."""
+        if self._tail:
+            self._chunks.append("".join(self._tail))
+            self._tail = []
+            self._tail_length = 0
+    
+    def text(self):
+        """
+        Get the whole content.
+        
+        Returns:
+            str: The document text (cached until the next edit)
+        """
+        if self._text is None:
+            self._flush()
+            self._text = "".join(self._chunks)
+        return self._text
+    
+    def insert(self, offset, text):
+        """
+        Insert text at an offset.
+        
+        Time Complexity: O(len(text)) amortized at the end of the
+        document, O(n / CHUNK_SIZE + CHUNK_SIZE) elsewhere
+        """
+        if not text:
+            return
+        if offset == self._length:
+            self._tail.append(text)
+            self._tail_length += len(text)
+            if self._tail_length >= self.CHUNK_SIZE:
+                self._flush()
+        else:
+            self._flush()
+            index, start = self._locate(offset)
+            chunk = self._chunks[index]
+            split = offset - start
+            self._chunks[index:index + 1] = [chunk[:split] + text, chunk[split:]]
+        self._length += len(text)
+        self._text = None
+    
+    def delete(self, offset, count):
+        """
+        Delete count characters starting at offset.
+        
+        Returns:
+            str: The deleted text
+            
+        Time Complexity: O(count) at the end of the document,
+        O(n / CHUNK_SIZE + CHUNK_SIZE + count) elsewhere
+        """
+        if count <= 0:
+            return ""
+        if offset + count == self._length:
+            removed = []
+            remaining = count
+            for pieces in (self._tail, self._chunks):
+                while remaining and pieces:
+                    piece = pieces.pop()
+                    if len(piece) > remaining:
+                        pieces.append(piece[:-remaining])
+                        piece = piece[-remaining:]
+                    removed.append(piece)
+                    remaining -= len(piece)
+            self._tail_length = sum(len(piece) for piece in self._tail)
+            removed.reverse()
+            deleted = "".join(removed)
+        else:
+            self._flush()
+            index, start = self._locate(offset)
+            end_index, end_start = self._locate(offset + count)
+            first = self._chunks[index]
+            last = self._chunks[end_index] if end_index < len(self._chunks) else ""
+            middle = "".join(self._chunks[index:end_index + 1])
+            deleted = middle[offset - start:offset - start + count]
+            kept = first[:offset - start] + last[offset + count - end_start:]
+            self._chunks[index:end_index + 1] = [kept] if kept else []
+        self._length -= count
+        self._text = None
+        return deleted
+    
+    def _locate(self, offset):
+        """Return (chunk index, chunk start offset) of the chunk holding offset."""
+        start = 0
+        for index, chunk in enumerate(self._chunks):
+            if offset < start + len(chunk):
+                return index, start
+            start += len(chunk)
+        return len(self._chunks), start
+    
+    def snapshot(self):
+        """
+        Capture the current content cheaply.
+        
+        Chunks are immutable strings, so only the chunk list is copied.
+        
+        Returns:
+            tuple: Opaque snapshot for restore()
+            
+        Time Complexity: O(n / CHUNK_SIZE)
+        """
+        self._flush()
+        return tuple(self._chunks), self._length
+    
+    def restore(self, snapshot):
+        """Restore content captured with snapshot()."""
+        chunks, length = snapshot
+        self._chunks = list(chunks)
+        self._tail = []
+        self._tail_length = 0
+        self._length = length
+        self._text = None
 
 
 class TextEditor:
     """
     Simple text editor that demonstrates undo/redo functionality using stacks.
+    
+    The undo and redo stacks hold compact edit operations
+    ('insert' or 'delete', offset, text) rather than copies of the whole
+    document, so undoing or redoing an edit costs O(edit size). The undo
+    history can be capped by count or bytes, evicting the oldest edits.
     """
     
-    def __init__(self):
-        """Initialize the text editor with empty content and stacks."""
-        self.content = ""
-        self.undo_stack = ArrayStack()
+    COALESCE_LIMIT = 256
+    
+    def __init__(self, verbose=True, checkpoint_interval=0, history_limit=None,
+                 history_bytes=None, coalesce_typing=False):
+        """
+        Initialize the text editor with empty content and stacks.
+        
+        Args:
+            verbose (bool): Print every action (default: True)
+            checkpoint_interval (int): Snapshot the document every this many
+                edits so multi-step undo/redo can jump to the nearest
+                snapshot; 0 disables checkpoints (default: 0)
+            history_limit (int): Maximum number of undo steps kept
+                (default: no limit)
+            history_bytes (int): Byte budget for the undo history
+                (default: no limit)
+            coalesce_typing (bool): Merge consecutive type_text calls into
+                one undo step of up to COALESCE_LIMIT characters
+                (default: False)
+        """
+        self._buffer = TextBuffer()
+        if history_limit is None and history_bytes is None:
+            self.undo_stack = ArrayStack()
+        else:
+            self.undo_stack = BoundedStack(history_limit, history_bytes)
         self.redo_stack = ArrayStack()
+        self.verbose = verbose
+        self.checkpoint_interval = checkpoint_interval
+        self.coalesce_typing = coalesce_typing
+        self._checkpoints = []  # (undo depth, buffer snapshot), by depth
+    
+    def _depth(self):
+        """Number of edits ever on the undo stack, counting evicted ones."""
+        return self.undo_stack.size() + getattr(self.undo_stack, 'evicted_items', 0)
+    
+    @property
+    def content(self):
+        """str: The current document text."""
+        return self._buffer.text()
+    
+    def _record(self, edit):
+        """Push a new edit onto the undo stack and invalidate redo history."""
+        self.redo_stack.clear()
+        if self.coalesce_typing and edit[0] == 'insert' and not self.undo_stack.is_empty():
+            kind, offset, text = self.undo_stack.peek()
+            if (kind == 'insert' and offset + len(text) == edit[1] and
+                    len(text) + len(edit[2]) <= self.COALESCE_LIMIT):
+                edit = (kind, offset, text + edit[2])
+                self.undo_stack.pop()
+        
+        depth = self._depth()
+        while self._checkpoints and self._checkpoints[-1][0] > depth:
+            self._checkpoints.pop()
+        self.undo_stack.push(edit)
+        depth = self._depth()
+        if self.checkpoint_interval and depth % self.checkpoint_interval == 0:
+            self._checkpoints.append((depth, self._buffer.snapshot()))
+        
+        # Checkpoints below the evicted part of the history are unreachable
+        evicted = depth - self.undo_stack.size()
+        while self._checkpoints and self._checkpoints[0][0] < evicted:
+            self._checkpoints.pop(0)
+    
+    def _apply(self, edit, reverse=False):
+        """Apply an edit, or its inverse when reverse is True."""
+        kind, offset, text = edit
+        if (kind == 'insert') != reverse:
+            self._buffer.insert(offset, text)
+        else:
+            self._buffer.delete(offset, len(text))
     
     def type_text(self, text):
         """
@@ -30,15 +249,11 @@ class TextEditor:
         Args:
             text (str): Text to add
         """
-        # Save current state for undo
-        self.undo_stack.push(('type', self.content))
-        
-        # Clear redo stack when new action is performed
-        self.redo_stack = ArrayStack()
-        
-        # Perform action
-        self.content += text
-        print(f"Typed: '{text}' -> Content: '{self.content}'")
+        edit = ('insert', len(self._buffer), text)
+        self._buffer.insert(edit[1], text)
+        self._record(edit)
+        if self.verbose:
+            print(f"Typed: '{text}' -> Content: '{self.content}'")
     
     def delete_chars(self, count):
         """
@@ -47,47 +262,76 @@ class TextEditor:
         Args:
             count (int): Number of characters to delete
         """
-        if count > len(self.content):
-            count = len(self.content)
-        
-        # Save current state for undo
-        deleted_text = self.content[-count:] if count > 0 else ""
-        self.undo_stack.push(('delete', self.content))
-        
-        # Clear redo stack
-        self.redo_stack = ArrayStack()
+        count = max(0, min(count, len(self._buffer)))
+        offset = len(self._buffer) - count
+        deleted_text = self._buffer.delete(offset, count)
+        self._record(('delete', offset, deleted_text))
+        if self.verbose:
+            print(f"Deleted {count} chars ('{deleted_text}') -> Content: '{self.content}'")
+    
+    def _checkpoint_between(self, low, high):
+        """Return the checkpoint whose depth is in [low, high] closest to low."""
+        for depth, snapshot in self._checkpoints:
+            if low <= depth <= high:
+                return depth, snapshot
+        return None
+    
+    def undo(self, steps=1):
+        """
+        Undo the last action(s).
         
-        # Perform action
-        self.content = self.content[:-count]
-        print(f"Deleted {count} chars ('{deleted_text}') -> Content: '{self.content}'")
-    
-    def undo(self):
-        """Undo the last action."""
+        Args:
+            steps (int): Number of actions to undo (default: 1)
+        """
         if self.undo_stack.is_empty():
-            print("Nothing to undo")
+            if self.verbose:
+                print("Nothing to undo")
             return
         
-        # Save current state for redo
-        self.redo_stack.push(('restore', self.content))
+        depth = self._depth()
+        steps = min(steps, self.undo_stack.size())
+        edits = self.undo_stack.pop_many(steps)
+        self.redo_stack.push_many(edits)
         
-        # Restore previous state
-        action, previous_content = self.undo_stack.pop()
-        self.content = previous_content
-        print(f"Undo -> Content: '{self.content}'")
-    
-    def redo(self):
-        """Redo the last undone action."""
+        # Jump to the checkpoint nearest the target, if that saves work
+        checkpoint = self._checkpoint_between(depth - steps, depth - 2)
+        if checkpoint is not None:
+            self._buffer.restore(checkpoint[1])
+            edits = edits[depth - checkpoint[0]:]
+        for edit in edits:
+            self._apply(edit, reverse=True)
+        if self.verbose:
+            print(f"Undo -> Content: '{self.content}'")
+    
+    def redo(self, steps=1):
+        """
+        Redo the last undone action(s).
+        
+        Args:
+            steps (int): Number of actions to redo (default: 1)
+        """
         if self.redo_stack.is_empty():
-            print("Nothing to redo")
+            if self.verbose:
+                print("Nothing to redo")
             return
         
-        # Save current state for undo
-        self.undo_stack.push(('restore', self.content))
+        depth = self._depth()
+        steps = min(steps, self.redo_stack.size())
+        edits = self.redo_stack.pop_many(steps)
+        self.undo_stack.push_many(edits)
         
-        # Restore redo state
-        action, redo_content = self.redo_stack.pop()
-        self.content = redo_content
-        print(f"Redo -> Content: '{self.content}'")
+        checkpoint = None
+        for candidate in reversed(self._checkpoints):
+            if depth + 2 <= candidate[0] <= depth + steps:
+                checkpoint = candidate
+                break
+        if checkpoint is not None:
+            self._buffer.restore(checkpoint[1])
+            edits = edits[checkpoint[0] - depth:]
+        for edit in edits:
+            self._apply(edit)
+        if self.verbose:
+            print(f"Redo -> Content: '{self.content}'")
     
     def show_status(self):
         """Show current editor status."""
@@ -96,15 +340,365 @@ class TextEditor:
         print(f"Can redo: {not self.redo_stack.is_empty()}")
 
 
+class CallTrace:
+    """
+    Preallocated ring buffer of call and return events.
+    
+    Each event is packed into a fixed-size record of (kind, name id,
+    call id, timestamp_ns, depth) in one bytearray that is allocated up
+    front, so recording costs a dictionary lookup and a struct.pack_into,
+    with no printing and no allocation. Once the buffer is full the oldest
+    records are overwritten. Names are interned to small ids, and events
+    are only decoded when read back or exported as folded stacks (for
+    flame graphs) or Chrome trace JSON.
+    """
+    
+    CALL = 0
+    RETURN = 1
+    _RECORD = struct.Struct("<BIQqI")
+    
+    def __init__(self, capacity=1 << 20):
+        """
+        Initialize an empty trace.
+        
+        Args:
+            capacity (int): Number of events kept (default: 1048576)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buffer = bytearray(capacity * self._RECORD.size)
+        self._pack_into = self._RECORD.pack_into
+        self._name_ids = {}
+        self.names = []  # Name of each name id
+        self.recorded = 0  # Events recorded, including overwritten ones
+    
+    def _intern(self, name):
+        """Assign the next name id to a function or label."""
+        name_id = self._name_ids[name] = len(self.names)
+        self.names.append(getattr(name, '__name__', None) or str(name))
+        return name_id
+    
+    def record(self, kind, name, call_id, depth):
+        """
+        Append one event.
+        
+        Args:
+            kind (int): CallTrace.CALL or CallTrace.RETURN
+            name: Function (or any hashable label) being called or returned from
+            call_id (int): Id shared by a call and its return
+            depth (int): Stack depth including this call
+            
+        Time Complexity: O(1)
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._intern(name)
+        recorded = self.recorded
+        self._pack_into(self._buffer, recorded % self.capacity * self._RECORD.size,
+                        kind, name_id, call_id, time.perf_counter_ns(), depth)
+        self.recorded = recorded + 1
+    
+    @property
+    def dropped(self):
+        """int: Number of oldest events overwritten so far."""
+        return max(self.recorded - self.capacity, 0)
+    
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+    
+    def events(self):
+        """
+        Decode the retained events, oldest first.
+        
+        Yields:
+            tuple: (kind, name, call_id, timestamp_ns, depth)
+        """
+        size = self._RECORD.size
+        view = memoryview(self._buffer)
+        start = self.recorded % self.capacity if self.dropped else 0
+        names = self.names
+        for part in (view[start * size:len(self) * size], view[:start * size]):
+            for kind, name_id, call_id, timestamp, depth in self._RECORD.iter_unpack(part):
+                yield kind, names[name_id], call_id, timestamp, depth
+    
+    def clear(self):
+        """Forget every event (the interned names are kept)."""
+        self.recorded = 0
+    
+    def folded_stacks(self):
+        """
+        Export the trace in the folded-stack format used by flame graphs.
+        
+        Each line is a ";"-separated call path, outermost first, and the
+        nanoseconds spent in its last function itself (excluding calls it
+        made). Calls still open at the end of the trace are cut off at the
+        last event. Once the buffer has wrapped, returns whose call was
+        overwritten are skipped and callers that were overwritten show up
+        as "...".
+        
+        Returns:
+            str: One "outer;inner nanoseconds" line per distinct path
+        """
+        # Paths are nodes of a tree, so each event is O(1) however deep
+        nodes = {}  # (parent node, name) -> node
+        parents = []
+        labels = []
+        self_ns = []
+        path = []  # [node, call_id, start_ns, child_ns] of the open calls
+        last = None
+        for kind, name, call_id, timestamp, depth in self.events():
+            last = timestamp
+            if kind == self.CALL:
+                if path:
+                    parent = path[-1][0]
+                elif depth > 1:
+                    parent = self._node(nodes, parents, labels, self_ns, -1, "...")
+                else:
+                    parent = -1
+                node = self._node(nodes, parents, labels, self_ns, parent, name)
+                path.append([node, call_id, timestamp, 0])
+            elif path and path[-1][1] == call_id:
+                self._close(path, self_ns, timestamp)
+        while path:
+            self._close(path, self_ns, last)
+        
+        lines = []
+        paths = []
+        for node, parent in enumerate(parents):
+            paths.append(labels[node] if parent < 0 else f"{paths[parent]};{labels[node]}")
+            lines.append(f"{paths[node]} {self_ns[node]}\n")
+        return "".join(lines)
+    
+    @staticmethod
+    def _node(nodes, parents, labels, self_ns, parent, name):
+        """Find or add the call path extending parent by name."""
+        key = (parent, name)
+        node = nodes.get(key)
+        if node is None:
+            node = nodes[key] = len(labels)
+            parents.append(parent)
+            labels.append(name)
+            self_ns.append(0)
+        return node
+    
+    @staticmethod
+    def _close(path, self_ns, timestamp):
+        """Pop the innermost open call and add up its self time."""
+        node, call_id, start, child_ns = path.pop()
+        elapsed = timestamp - start
+        self_ns[node] += elapsed - child_ns
+        if path:
+            path[-1][3] += elapsed
+    
+    def chrome_trace(self, pid=1, tid=1):
+        """
+        Export the trace as Chrome trace events.
+        
+        The result can be saved with json.dump() and opened in
+        chrome://tracing or Perfetto.
+        
+        Args:
+            pid (int): Process id shown in the viewer (default: 1)
+            tid (int): Thread id shown in the viewer (default: 1)
+            
+        Returns:
+            dict: {"traceEvents": [...]} with one "B" (begin) or "E" (end)
+            event per record, timestamps in microseconds; returns whose
+            call was overwritten are left out
+        """
+        events = []
+        origin = None
+        open_calls = set()
+        for kind, name, call_id, timestamp, depth in self.events():
+            if origin is None:
+                origin = timestamp
+            if kind == self.CALL:
+                open_calls.add(call_id)
+            elif call_id in open_calls:
+                open_calls.discard(call_id)
+            else:
+                continue  # Its call was overwritten
+            events.append({
+                'name': name,
+                'ph': 'B' if kind == self.CALL else 'E',
+                'ts': (timestamp - origin) / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {'call_id': call_id, 'depth': depth},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ns'}
+
+
 class FunctionCallSimulator:
     """
     Simulates function call stack to demonstrate how recursion works.
+    
+    call_function() and return_from_function() walk through the frames by
+    hand on call_stack, an ArrayStack that is shown without popping and
+    re-pushing its frames. snapshot() copies them into a PersistentStack
+    that stays valid while the simulation goes on.
+    
+    run() actually executes recursive functions, written as generators
+    that yield their sub-calls as (function, *args) tuples and receive
+    the results back from the yield:
+    
+        def factorial(n):
+            if n <= 1:
+                return 1
+            return n * (yield factorial, n - 1)
+    
+    The suspended callers wait on an ArrayStack of frames instead of the
+    interpreter's stack, so the recursion depth is limited only by
+    memory, not by sys.getrecursionlimit(). Exceptions propagate to the
+    callers as in ordinary recursion, and with memoize=True each
+    (function, *args) result is computed only once.
+    
+    With a CallTrace, call_function(), return_from_function() and run()
+    record compact events into it instead of printing, to be exported
+    later as folded stacks or Chrome trace JSON.
     """
     
-    def __init__(self):
-        """Initialize the call stack."""
+    def __init__(self, memoize=False, trace=None):
+        """
+        Initialize the call stack.
+        
+        Args:
+            memoize (bool): Cache run() results by (function, *args), which
+                must then be hashable (default: False)
+            trace (CallTrace): Record calls and returns here instead of
+                printing them (default: None)
+        """
         self.call_stack = ArrayStack()
         self.call_count = 0
+        self.memo = {} if memoize else None
+        self.max_depth = 0
+        self.trace = trace
+    
+    def run(self, function, *args, disable_gc=False):
+        """
+        Execute a function, trampolining the sub-calls it yields.
+        
+        Functions that are not generators are called directly and act as
+        leaf calls, so ordinary helpers can be yielded too. With a trace,
+        every call made (not answered from the memo) records a call event
+        and a return event, also when it raises.
+        
+        Args:
+            function: Generator function (or plain function) to call
+            *args: Positional arguments for the call
+            disable_gc (bool): Pause the process-wide cyclic garbage
+                collector until run() returns. Very deep recursions keep
+                millions of suspended generators alive that every
+                collection rescans, but cycles created meanwhile (in any
+                thread) are not freed until the end (default: False)
+            
+        Returns:
+            The value the function returns
+            
+        Raises:
+            Exception: Whatever the outermost call raises
+            
+        Time Complexity: O(1) per call and return on top of the
+        functions' own work
+        """
+        memo = self.memo
+        call = (function,) + args
+        if memo is not None and call in memo:
+            return memo[call]
+        self.call_count += 1
+        call_id = base_id = self.call_count
+        trace = self.trace
+        if trace is not None:
+            record = trace.record
+            record(CallTrace.CALL, function, call_id, 1)
+        try:
+            generator = function(*args)
+        except Exception:
+            if trace is not None:
+                record(CallTrace.RETURN, function, call_id, 1)
+            raise
+        if type(generator) is not GeneratorType:
+            if trace is not None:
+                record(CallTrace.RETURN, function, call_id, 1)
+            if memo is not None:
+                memo[call] = generator
+            return generator
+        
+        frames = ArrayStack()  # (generator, call, call_id) of every suspended caller
+        push = frames.push
+        pop = frames.pop
+        depth = 1
+        max_depth = self.max_depth
+        calls = 0
+        value = None
+        error = None
+        collecting = disable_gc and gc.isenabled()
+        if collecting:
+            gc.disable()
+        try:
+            while True:
+                try:
+                    if error is None:
+                        request = generator.send(value)
+                    else:
+                        failure, error = error, None
+                        request = generator.throw(failure)
+                except StopIteration as stop:
+                    value = stop.value
+                    if trace is not None:
+                        record(CallTrace.RETURN, call[0], call_id, depth)
+                    if memo is not None:
+                        memo[call] = value
+                    if depth == 1:
+                        return value
+                    generator, call, call_id = pop()
+                    depth -= 1
+                    continue
+                except Exception as exc:
+                    if trace is not None:
+                        record(CallTrace.RETURN, call[0], call_id, depth)
+                    if depth == 1:
+                        raise
+                    error = exc
+                    generator, call, call_id = pop()
+                    depth -= 1
+                    continue
+                
+                # The yielded value is a sub-call
+                if memo is not None and request in memo:
+                    value = memo[request]
+                    continue
+                calls += 1
+                if trace is not None:
+                    record(CallTrace.CALL, request[0], base_id + calls, depth + 1)
+                try:
+                    result = request[0](*request[1:])
+                except Exception as exc:
+                    error = exc  # Raised at the yield, like a failed call
+                    if trace is not None:
+                        record(CallTrace.RETURN, request[0], base_id + calls, depth + 1)
+                    continue
+                if type(result) is not GeneratorType:
+                    value = result
+                    if trace is not None:
+                        record(CallTrace.RETURN, request[0], base_id + calls, depth + 1)
+                    if memo is not None:
+                        memo[request] = value
+                    continue
+                push((generator, call, call_id))
+                generator = result
+                call = request
+                call_id = base_id + calls
+                value = None
+                depth += 1
+                if depth > max_depth:
+                    max_depth = depth
+        finally:
+            if collecting:
+                gc.enable()
+            self.call_count += calls
+            self.max_depth = max(max_depth, 1)
     
     def call_function(self, function_name, parameters):
         """
@@ -123,6 +717,10 @@ class FunctionCallSimulator:
         }
         
         self.call_stack.push(frame)
+        if self.trace is not None:
+            self.trace.record(CallTrace.CALL, function_name, self.call_count,
+                              self.call_stack.size())
+            return
         print(f"→ Calling {function_name}({parameters}) [Call #{self.call_count}]")
         self.show_call_stack()
     
@@ -137,10 +735,26 @@ class FunctionCallSimulator:
             print("No function to return from!")
             return
         
+        depth = self.call_stack.size()
         frame = self.call_stack.pop()
+        if self.trace is not None:
+            self.trace.record(CallTrace.RETURN, frame['function'], frame['call_id'], depth)
+            return
         print(f"← Returning from {frame['function']} with value: {return_value}")
         self.show_call_stack()
     
+    def snapshot(self):
+        """
+        Capture the current call stack.
+        
+        Returns:
+            PersistentStack: The frames, top first, unaffected by later
+                calls and returns
+        
+        Time Complexity: O(n) to take, O(1) for each later version
+        """
+        return PersistentStack(reversed(self.call_stack))
+    
     def show_call_stack(self):
         """Display the current call stack."""
         if self.call_stack.is_empty():
@@ -148,20 +762,10 @@ class FunctionCallSimulator:
             return
         
         print("Call stack (top to bottom):")
-        temp_stack = ArrayStack()
-        
-        # Pop all items to display them
-        while not self.call_stack.is_empty():
-            frame = self.call_stack.pop()
-            temp_stack.push(frame)
-        
-        # Display and restore
-        level = temp_stack.size()
-        while not temp_stack.is_empty():
-            frame = temp_stack.pop()
-            indent = "  " * (level - temp_stack.size() - 1)
+        # Outermost call first, so nesting reads like a tree
+        for level, frame in enumerate(reversed(self.call_stack)):
+            indent = "  " * level
             print(f"{indent}└─ {frame['function']}({frame['parameters']}) [#{frame['call_id']}]")
-            self.call_stack.push(frame)
         print()
 
 
@@ -336,6 +940,33 @@ def demo_function_calls():
     
     print("Factorial calculation complete!")
     
+    # Now let the simulator actually run a recursion far deeper than
+    # Python's own call stack allows
+    def triangular(n):
+        if n == 0:
+            return 0
+        return n + (yield triangular, n - 1)
+    
+    def fibonacci(n):
+        if n < 2:
+            return n
+        return (yield fibonacci, n - 1) + (yield fibonacci, n - 2)
+    
+    depth = 100000
+    simulator = FunctionCallSimulator()
+    result = simulator.run(triangular, depth)
+    print(f"\ntriangular({depth}) = {result} "
+          f"(depth {simulator.max_depth}, recursion limit {sys.getrecursionlimit()})")
+    simulator = FunctionCallSimulator(memoize=True)
+    print(f"fibonacci(200) = {simulator.run(fibonacci, 200)} "
+          f"in {simulator.call_count} calls with memoization")
+    
+    # Trace a run silently, then render it afterwards
+    trace = CallTrace()
+    FunctionCallSimulator(trace=trace).run(fibonacci, 4)
+    print(f"\nTraced fibonacci(4): {trace.recorded} events, as folded stacks (name ns):")
+    print(trace.folded_stacks(), end="")
+    
     print("\n" + "="*50 + "\n")
 
 
@@ -343,36 +974,17 @@ def demo_stack_comparison():
     """Compare array-based vs linked list-based stacks."""
     print("=== STACK IMPLEMENTATION COMPARISON ===\n")
     
-    import time
+    # Imported here because benchmark.py imports this module
+    from benchmark import CASES, run_case
     
-    # Test with larger dataset
+    # Test with larger dataset, median of repeated runs after a warmup
     test_size = 10000
+    array_result = run_case(CASES['push_pop/ArrayStack'], test_size, memory=False)
+    ll_result = run_case(CASES['push_pop/LinkedListStack'], test_size, memory=False)
+    array_time = array_result['median_ns'] / 1e9
+    ll_time = ll_result['median_ns'] / 1e9
     
-    # Array-based stack performance
-    array_stack = ArrayStack()
-    
-    start_time = time.time()
-    for i in range(test_size):
-        array_stack.push(i)
-    
-    for i in range(test_size):
-        array_stack.pop()
-    
-    array_time = time.time() - start_time
-    
-    # Linked list-based stack performance
-    ll_stack = LinkedListStack()
-    
-    start_time = time.time()
-    for i in range(test_size):
-        ll_stack.push(i)
-    
-    for i in range(test_size):
-        ll_stack.pop()
-    
-    ll_time = time.time() - start_time
-    
-    print(f"Performance test with {test_size} operations:")
+    print(f"Performance test with {test_size} operations (median of {array_result['repeat']} runs):")
     print(f"Array-based stack: {array_time:.6f} seconds")
     print(f"Linked list-based stack: {ll_time:.6f} seconds")
     
@@ -380,6 +992,7 @@ def demo_stack_comparison():
         print("Array-based stack is faster (better cache locality)")
     else:
         print("Linked list-based stack is faster")
+    print("Run benchmark.py for every implementation, sizes up to 1e8 and JSON output")
     
     print("\nMemory characteristics:")
     print("Array-based: Better cache locality, occasional resize cost")
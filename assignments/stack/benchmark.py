@@ -0,0 +1,1515 @@
+"""
+Stack Benchmarks
+
+This module measures the performance of the stack implementations and
+utilities in stack.py and application.py. The benchmark harness runs each
+case with warmup and repeated timed runs, reports statistics, ops/s and
+tracemalloc peaks, and writes JSON that can be compared between runs to
+flag regressions. The comparison reports below it measure individual
+optimizations against simpler reference approaches.
+
+Usage:
+    python benchmark.py                              # Harness, default sizes
+    python benchmark.py --sizes 1e3 1e5 1e7 --json run.json
+    python benchmark.py --compare old.json new.json  # Flag regressions
+    python benchmark.py --reports                    # Comparison reports
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import argparse
+import asyncio
+import decimal
+import gc
+import json
+import os
+import platform
+import pickle
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from application import CallTrace, FunctionCallSimulator, TextEditor
+from instrumentation import instrument
+from stack import (AggregateStack, ArrayStack, AsyncStack, BoundedStack, ConcurrentStack, DiskBackedStack,
+                   ExpressionCache, LinkedListStack, Node, PersistentStack,
+                   TypedArrayStack, check_balanced_stream, compile_expression,
+                   evaluate_infix, evaluate_many, evaluate_postfix, evaluate_postfix_batch,
+                   expression_cache, decimal_mode, int_mode,
+                   infix_to_postfix, is_balanced_parentheses, tokenize)
+from queues import AggregateQueue, RingBuffer, TwoStackQueue
+from stack import dump, load
+from stack import (largest_rectangle, next_greater, sliding_window_max, stock_span)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Benchmark harness
+
+def run_case(make, size, repeat=5, warmup=1, memory=True):
+    """
+    Time one benchmark case at one size.
+
+    Args:
+        make: Function taking size and returning a zero-argument callable
+            that does the work; setup done in make() is not timed, and a
+            fresh callable is made for every run
+        size (int): Problem size (number of elements processed)
+        repeat (int): Number of timed runs
+        warmup (int): Number of untimed runs first
+        memory (bool): Also measure the tracemalloc peak in an extra run
+
+    Returns:
+        dict: Run times in ns and their statistics, ops/s from the median
+        and the peak traced memory in bytes (None if not measured)
+    """
+    for _ in range(warmup):
+        make(size)()
+
+    times = []
+    for _ in range(repeat):
+        work = make(size)
+        gc.collect()
+        start = time.perf_counter_ns()
+        work()
+        times.append(time.perf_counter_ns() - start)
+
+    peak = None
+    if memory:
+        work = make(size)
+        gc.collect()
+        tracemalloc.start()
+        work()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        'size': size,
+        'repeat': repeat,
+        'times_ns': times,
+        'min_ns': min(times),
+        'median_ns': median,
+        'mean_ns': statistics.fmean(times),
+        'stdev_ns': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'ops_per_sec': size / (median / 1e9) if median else float('inf'),
+        'peak_bytes': peak,
+    }
+
+
+def _push_pop(factory):
+    """Case: push size items one by one, then pop them all."""
+    def make(size):
+        stack = factory()
+
+        def work():
+            push = stack.push
+            pop = stack.pop
+            for i in range(size):
+                push(i)
+            for _ in range(size):
+                pop()
+        return work
+    return make
+
+
+def _persistent_push_pop(size):
+    def work():
+        stack = PersistentStack()
+        for i in range(size):
+            stack = stack.push(i)
+        for _ in range(size):
+            _, stack = stack.pop()
+    return work
+
+
+def _bulk_push_pop(factory):
+    """Case: push_many size items, then pop_many them."""
+    def make(size):
+        stack = factory()
+        items = list(range(size))
+
+        def work():
+            stack.push_many(items)
+            stack.pop_many(size)
+        return work
+    return make
+
+
+def _async_push_pop_case(size):
+    async def run():
+        stack = AsyncStack()
+        for i in range(size):
+            await stack.push(i)
+        for _ in range(size):
+            await stack.pop()
+    return lambda: asyncio.run(run())
+
+
+def _brackets(size):
+    unit = "{[(a)]}"
+    return unit * (size // len(unit))
+
+
+def _is_balanced_case(size):
+    text = _brackets(size)
+    return lambda: is_balanced_parentheses(text)
+
+
+def _stream_case(size):
+    chunks = [_brackets(size).encode()]
+    return lambda: check_balanced_stream(chunks)
+
+
+def _postfix_expression(size):
+    """A valid postfix expression with about size tokens."""
+    tokens = ["1"]
+    for i in range(max(size // 2, 1)):
+        tokens.append(str(i % 9 + 1))
+        tokens.append("+-*"[i % 3])
+    return " ".join(tokens)
+
+
+def _infix_expression(size):
+    """A valid infix expression with about size tokens."""
+    tokens = ["1"]
+    for i in range(max(size // 2, 1)):
+        tokens.append("+-*/"[i % 4])
+        tokens.append(str(i % 9 + 1))
+    return " ".join(tokens)
+
+
+def _evaluate_postfix_case(size):
+    expression = _postfix_expression(size)
+
+    def work():
+        expression_cache.clear()  # Measure compile + evaluate
+        evaluate_postfix(expression)
+    return work
+
+
+def _evaluate_compiled_case(size):
+    program = compile_expression(_postfix_expression(size), cache=ExpressionCache())
+    return program.evaluate
+
+
+def _infix_to_postfix_case(size):
+    expression = _infix_expression(size)
+    return lambda: infix_to_postfix(expression)
+
+
+def _evaluate_infix_case(size):
+    expression = _infix_expression(size)
+    return lambda: evaluate_infix(expression)
+
+
+def _tokenize_case(size):
+    expression = _infix_expression(size).replace(" ", "")
+    return lambda: tokenize(expression)
+
+
+def _text_editor_case(size):
+    def work():
+        editor = TextEditor(verbose=False)
+        for i in range(size):
+            editor.type_text("abcdefghij"[i % 10])
+        editor.undo(size)
+    return work
+
+
+CASES = {
+    'push_pop/ArrayStack': _push_pop(ArrayStack),
+    'push_pop/LinkedListStack': _push_pop(LinkedListStack),
+    'push_pop/LinkedListStack(pool)': _push_pop(lambda: LinkedListStack(pool_size=1024)),
+    'push_pop/TypedArrayStack': _push_pop(lambda: TypedArrayStack('q')),
+    'push_pop/BoundedStack': _push_pop(BoundedStack),
+    'push_pop/AggregateStack': _push_pop(lambda: AggregateStack('min')),
+    # A small budget so sizes from 1e3 up spill to disk
+    'push_pop/DiskBackedStack': _push_pop(lambda: DiskBackedStack(memory_items=512)),
+    'push_pop/DiskBackedStack(q)': _push_pop(lambda: DiskBackedStack(memory_items=512,
+                                                                      typecode='q')),
+    'push_pop/ConcurrentStack': _push_pop(ConcurrentStack),
+    'push_pop/PersistentStack': _persistent_push_pop,
+    'push_pop/AsyncStack': _async_push_pop_case,
+    'bulk/ArrayStack': _bulk_push_pop(ArrayStack),
+    'bulk/LinkedListStack': _bulk_push_pop(LinkedListStack),
+    'bulk/TypedArrayStack': _bulk_push_pop(lambda: TypedArrayStack('q')),
+    'bulk/AggregateStack': _bulk_push_pop(lambda: AggregateStack('min')),
+    'parentheses/is_balanced_parentheses': _is_balanced_case,
+    'parentheses/check_balanced_stream': _stream_case,
+    'expression/evaluate_postfix': _evaluate_postfix_case,
+    'expression/compiled_evaluate': _evaluate_compiled_case,
+    'expression/infix_to_postfix': _infix_to_postfix_case,
+    'expression/tokenize': _tokenize_case,
+    'expression/evaluate_infix': _evaluate_infix_case,
+    'application/TextEditor': _text_editor_case,
+}
+
+
+def run_suite(sizes=(1000, 10000, 100000), repeat=5, warmup=1, memory=True,
+              select=None, verbose=True):
+    """
+    Run every benchmark case at every size.
+
+    Args:
+        sizes: Problem sizes to run
+        repeat (int): Timed runs per case and size
+        warmup (int): Untimed runs first
+        memory (bool): Measure tracemalloc peaks
+        select (str): Only run cases whose name contains this text
+        verbose (bool): Print a line per result
+
+    Returns:
+        dict: Environment metadata and a list of results, ready for JSON
+    """
+    results = []
+    for name, make in CASES.items():
+        if select and select not in name:
+            continue
+        for size in sizes:
+            result = run_case(make, size, repeat, warmup, memory)
+            result['name'] = name
+            results.append(result)
+            if verbose:
+                peak = result['peak_bytes']
+                peak_text = f"{peak / 2**20:9.2f} MiB" if peak is not None else ""
+                spread = result['stdev_ns'] / result['median_ns'] if result['median_ns'] else 0
+                print(f"{name:38} n={size:<10} {result['median_ns'] / 1e6:10.3f} ms "
+                      f"±{spread:5.1%} {result['ops_per_sec'] / 1e6:9.3f} M ops/s {peak_text}")
+    return {
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'repeat': repeat,
+        'warmup': warmup,
+        'results': results,
+    }
+
+
+def compare_runs(baseline, current, threshold=0.10):
+    """
+    Compare two suite runs and flag regressions.
+
+    Args:
+        baseline (dict): Earlier run_suite() output
+        current (dict): Later run_suite() output
+        threshold (float): Relative median slowdown counted as a
+            regression (default: 0.10, i.e. 10%)
+
+    Returns:
+        list: (name, size, ratio, regressed) tuples, ratio being
+        current median time / baseline median time
+    """
+    before = {(r['name'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = (result['name'], result['size'])
+        if key not in before or not before[key]['median_ns']:
+            continue
+        ratio = result['median_ns'] / before[key]['median_ns']
+        rows.append((key[0], key[1], ratio, ratio > 1 + threshold))
+    return rows
+
+
+# Comparison reports
+
+def _time_per_call(func, calls, repeat=5):
+    """
+    Time a zero-argument function.
+
+    Args:
+        func: Function to call
+        calls (int): Number of calls per run
+        repeat (int): Number of runs; the fastest one is reported
+
+    Returns:
+        float: Best time per call in microseconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def _evaluate_postfix_reparse(expression):
+    """Reference postfix evaluator that re-parses on every call."""
+    stack = ArrayStack()
+    for token in expression.split():
+        if token in ['+', '-', '*', '/']:
+            if stack.size() < 2:
+                raise ValueError("Invalid postfix expression")
+            operand2 = stack.pop()
+            operand1 = stack.pop()
+            if token == '+':
+                result = operand1 + operand2
+            elif token == '-':
+                result = operand1 - operand2
+            elif token == '*':
+                result = operand1 * operand2
+            else:
+                if operand2 == 0:
+                    raise ValueError("Division by zero")
+                result = operand1 / operand2
+            stack.push(result)
+        else:
+            try:
+                stack.push(float(token))
+            except ValueError:
+                raise ValueError(f"Invalid token: {token}")
+    if stack.size() != 1:
+        raise ValueError("Invalid postfix expression")
+    return stack.pop()
+
+
+def benchmark_expression_cache(calls=20000):
+    """Compare re-parsing postfix evaluation with the compiled program cache."""
+    print("=== COMPILED EXPRESSION CACHE ===")
+    expression = "15 7 1 1 + - / 3 * 2 1 1 + + -"
+    cache = ExpressionCache()
+    program = compile_expression(expression, cache=cache)
+
+    reparse = _time_per_call(lambda: _evaluate_postfix_reparse(expression), calls)
+    cached = _time_per_call(
+        lambda: compile_expression(expression, cache=cache).evaluate(), calls)
+    precompiled = _time_per_call(program.evaluate, calls)
+
+    print(f"Re-parse every call:   {reparse:8.3f} us/eval")
+    print(f"Cache lookup + run:    {cached:8.3f} us/eval ({reparse / cached:.1f}x)")
+    print(f"Precompiled program:   {precompiled:8.3f} us/eval ({reparse / precompiled:.1f}x)")
+    print(f"Cache stats: {cache.stats()}")
+    print()
+
+
+def benchmark_postfix_batch(rows=100000):
+    """Compare per-row scalar evaluation with NumPy column evaluation."""
+    print("=== BATCH POSTFIX EVALUATION ===")
+    if np is None:
+        print("NumPy not installed, skipping\n")
+        return
+    expression = "P Q + R * P R - /"
+    rng = np.random.default_rng(0)
+    columns = {name: rng.uniform(1, 100, rows) for name in "PQR"}
+
+    start = time.perf_counter()
+    for p, q, r in zip(columns['P'], columns['Q'], columns['R']):
+        evaluate_postfix(f"{p} {q} + {r} * {p} {r} - /")
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluate_postfix_batch(expression, columns, errors="mask")
+    batch = time.perf_counter() - start
+
+    print(f"Per-row scalar loop:   {scalar:8.4f} s for {rows} rows")
+    print(f"Batch (NumPy columns): {batch:8.4f} s for {rows} rows ({scalar / batch:.0f}x)")
+    print()
+
+
+def _infix_to_postfix_split(expression):
+    """Reference converter: the space-separated, split()-based algorithm."""
+    precedence = {'+': 1, '-': 1, '*': 2, '/': 2}
+    stack = ArrayStack()
+    output = []
+    for token in expression.split():
+        if token.replace('.', '').replace('-', '').isdigit() or token.isalpha():
+            output.append(token)
+        elif token == '(':
+            stack.push(token)
+        elif token == ')':
+            while not stack.is_empty() and stack.peek() != '(':
+                output.append(stack.pop())
+            if not stack.is_empty():
+                stack.pop()
+        elif token in precedence:
+            while (not stack.is_empty() and stack.peek() != '(' and
+                   stack.peek() in precedence and
+                   precedence[stack.peek()] >= precedence[token]):
+                output.append(stack.pop())
+            stack.push(token)
+    while not stack.is_empty():
+        output.append(stack.pop())
+    return ' '.join(output)
+
+
+_PRETOKENIZE = re.compile(r"\d+\.?\d*|[A-Za-z]+|\S")
+
+
+def _formula_corpus(count, seed=0):
+    """Unspaced infix formulas with numbers, variables and parentheses."""
+    rng = random.Random(seed)
+    formulas = []
+    for _ in range(count):
+        parts = [str(rng.randint(1, 999))]
+        for _ in range(rng.randint(2, 8)):
+            parts.append(rng.choice("+-*/"))
+            operand = rng.choice([str(rng.randint(1, 999)), "x", "rate", "2.5"])
+            if rng.random() < 0.2:
+                operand = f"({operand}+{rng.randint(1, 9)})"
+            parts.append(operand)
+        formulas.append("".join(parts))
+    return formulas
+
+
+def benchmark_tokenizer(formulas=1000000):
+    """Compare the scanner-based parser with pre-tokenizing in Python."""
+    print("=== EXPRESSION TOKENIZER ===")
+    corpus = _formula_corpus(formulas)
+    characters = sum(len(formula) for formula in corpus)
+    cache = ExpressionCache(maxsize=1)  # Formulas are unique, so always compile
+
+    def run(func):
+        start = time.perf_counter()
+        for formula in corpus:
+            func(formula)
+        return time.perf_counter() - start
+
+    tokens = sum(len(tokenize(formula)) for formula in corpus[:10000]) * formulas / min(formulas, 10000)
+    scan = run(tokenize)
+    pretokenized = run(lambda f: _infix_to_postfix_split(" ".join(_PRETOKENIZE.findall(f))))
+    scanned = run(infix_to_postfix)
+    two_step = run(lambda f: compile_expression(
+        _infix_to_postfix_split(" ".join(_PRETOKENIZE.findall(f))), cache=cache))
+    direct = run(lambda f: compile_expression(f, notation="infix", cache=cache))
+
+    print(f"Corpus: {formulas} unspaced formulas, {characters / 1e6:.1f}M chars, ~{tokens / 1e6:.1f}M tokens")
+    print(f"tokenize():                       {scan:7.2f} s ({tokens / scan / 1e6:.2f} M tokens/s, "
+          f"{characters / scan / 1e6:.1f} MB/s)")
+    print(f"Pre-tokenize + split converter:   {pretokenized:7.2f} s ({formulas / pretokenized / 1e3:.0f}k formulas/s)")
+    print(f"infix_to_postfix (scanner):       {scanned:7.2f} s ({formulas / scanned / 1e3:.0f}k formulas/s, "
+          f"{pretokenized / scanned:.2f}x)")
+    print(f"Pre-tokenize + convert + compile: {two_step:7.2f} s")
+    print(f"Compile infix tokens directly:    {direct:7.2f} s ({two_step / direct:.2f}x)")
+    print()
+
+
+def benchmark_evaluate_infix(formulas=200000):
+    """Compare one-pass infix evaluation with converting to postfix first."""
+    print("=== ONE-PASS INFIX EVALUATION ===")
+    corpus = _formula_corpus(formulas, seed=1)
+    variables = {'x': 1.5, 'rate': 0.25}
+    cache = ExpressionCache(maxsize=1)  # Formulas are unique, so always compile
+
+    def run(func):
+        start = time.perf_counter()
+        for formula in corpus:
+            try:
+                func(formula)
+            except ValueError:
+                pass  # Division by zero in a few random formulas
+        return time.perf_counter() - start
+
+    composed = run(lambda f: compile_expression(infix_to_postfix(f), cache=cache).evaluate(variables))
+    compiled = run(lambda f: compile_expression(f, notation="infix", cache=cache).evaluate(variables))
+    direct = run(lambda f: evaluate_infix(f, variables))
+
+    print(f"infix_to_postfix + postfix compile: {composed:6.2f} s ({composed / formulas * 1e6:.2f} us/formula)")
+    print(f"Compile infix tokens + run:         {compiled:6.2f} s ({composed / compiled:.2f}x)")
+    print(f"evaluate_infix (two stacks):        {direct:6.2f} s ({composed / direct:.2f}x)")
+    print()
+
+
+def benchmark_evaluate_many(formulas=200000):
+    """Measure batch evaluation scaling from one worker to all cores."""
+    print("=== PARALLEL BATCH EVALUATION ===")
+    corpus = _formula_corpus(formulas, seed=2)
+    variables = {'x': 1.5, 'rate': 0.25}
+    cores = os.cpu_count() or 1
+
+    # The single-core pipeline has no variables, so substitute them first
+    constant_corpus = [formula.replace("x", "1.5").replace("rate", "0.25") for formula in corpus]
+    start = time.perf_counter()
+    for formula in constant_corpus:
+        try:
+            evaluate_postfix(infix_to_postfix(formula))
+        except ValueError:
+            pass
+    serial = time.perf_counter() - start
+    expression_cache.clear()
+    print(f"evaluate_postfix(infix_to_postfix()) loop: {serial:6.2f} s for {formulas} formulas")
+
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+    for workers in worker_counts:
+        start = time.perf_counter()
+        evaluate_many(corpus, variables, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"evaluate_many, {workers:2} worker(s):            {elapsed:6.2f} s "
+              f"({formulas / elapsed / 1e3:.0f}k formulas/s, {serial / elapsed:.2f}x)")
+
+    # A pool always pays for pickling, even with one worker process
+    for chunksize in (16, 256, None):
+        with ProcessPoolExecutor(cores) as pool:
+            pool.submit(int).result()  # Start the workers before timing
+            start = time.perf_counter()
+            evaluate_many(corpus, variables, workers=cores, chunksize=chunksize, executor=pool)
+            elapsed = time.perf_counter() - start
+        label = "auto" if chunksize is None else chunksize
+        print(f"Process pool ({cores} workers), chunksize={label!s:5}: {elapsed:6.2f} s")
+    if cores == 1:
+        print("(Only one core available, so no speedup is possible here)")
+    print()
+
+
+def benchmark_numeric_modes(evaluations=200000, formulas=50000):
+    """Compare evaluation throughput of each numeric mode."""
+    print("=== NUMERIC MODES ===")
+    expression = "1234 56 + 789 * 12 / 345 - 6 7 + *"
+    corpus = [formula.replace("2.5", "5").replace("rate", "7").replace("x", "3")
+              for formula in _formula_corpus(formulas, seed=4)]
+    modes = [("float", "float"), ("int (floor /)", "int"), ("int (true /)", int_mode("true")),
+             ("decimal", "decimal"), ("decimal (prec=50)", decimal_mode(decimal.Context(prec=50))),
+             ("fraction", "fraction")]
+
+    for label, mode in modes:
+        program = compile_expression(expression, cache=ExpressionCache(), mode=mode)
+        start = time.perf_counter()
+        for _ in range(evaluations):
+            program.evaluate()
+        compiled = time.perf_counter() - start
+
+        cache = ExpressionCache(maxsize=1)  # Formulas are unique, so always compile
+        start = time.perf_counter()
+        for formula in corpus:
+            compile_expression(formula, notation="infix", cache=cache, mode=mode).evaluate()
+        cold = time.perf_counter() - start
+
+        print(f"{label:18} {evaluations / compiled / 1e3:7.0f}k evals/s compiled, "
+              f"{formulas / cold / 1e3:5.0f}k formulas/s compile + eval")
+    print()
+
+
+def _measure(func):
+    """
+    Run a function once for timing and once under tracemalloc.
+
+    Returns:
+        tuple: (seconds, peak traced bytes)
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_parentheses_stream(megabytes=16):
+    """Compare the in-memory bracket checker with the streaming validator."""
+    print("=== STREAMING PARENTHESES CHECK ===")
+    import io
+
+    record = b'{"id": [1, 2, {"tags": ["a", "b"]}], "f": (3)},'
+    count = megabytes * (1 << 20) // len(record)
+    data = b"[" + record * count + b"{}]"
+    size_mb = len(data) / (1 << 20)
+    text = data.decode()
+
+    in_memory, in_memory_peak = _measure(lambda: is_balanced_parentheses(text))
+    streaming, streaming_peak = _measure(
+        lambda: check_balanced_stream(io.BytesIO(data)))
+
+    print(f"is_balanced_parentheses: {size_mb / in_memory:8.1f} MB/s, "
+          f"peak {in_memory_peak / 1024:8.1f} KiB (plus the {size_mb:.0f} MB input)")
+    print(f"check_balanced_stream:   {size_mb / streaming:8.1f} MB/s, "
+          f"peak {streaming_peak / 1024:8.1f} KiB (1 MiB chunks)")
+    print()
+
+
+def benchmark_typed_array_stack(size=1000000):
+    """Compare memory and push/pop throughput of the stack implementations."""
+    print("=== TYPED ARRAY STACK ===")
+    factories = [
+        ("ArrayStack", ArrayStack),
+        ("LinkedListStack", LinkedListStack),
+        ("TypedArrayStack('q')", lambda: TypedArrayStack('q')),
+    ]
+    for name, factory in factories:
+        def fill():
+            stack = factory()
+            push = stack.push
+            for i in range(size):
+                push(i + 1000)  # Outside the small-int cache
+            return stack
+
+        tracemalloc.start()
+        stack = fill()
+        per_element = tracemalloc.get_traced_memory()[0] / size
+        tracemalloc.stop()
+        del stack
+
+        start = time.perf_counter()
+        stack = fill()
+        pop = stack.pop
+        for _ in range(size):
+            pop()
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:22} {per_element:6.1f} bytes/element, "
+              f"{2 * size / elapsed / 1e6:6.2f} M ops/s (push + pop)")
+
+    stack = TypedArrayStack('q')
+    start = time.perf_counter()
+    stack.push_many(range(size))
+    stack.pop_many(size)
+    elapsed = time.perf_counter() - start
+    print(f"{'  push_many/pop_many':22} {'':20}   {2 * size / elapsed / 1e6:6.2f} M ops/s")
+    print()
+
+
+def benchmark_bulk_operations(size=100000, batch=100):
+    """Compare looped single push/pop calls with push_many/pop_many."""
+    print("=== BULK OPERATIONS ===")
+    items = list(range(batch))
+    rounds = size // batch
+    for name, factory in [("ArrayStack", ArrayStack),
+                          ("LinkedListStack", LinkedListStack)]:
+        stack = factory()
+
+        def looped():
+            push = stack.push
+            pop = stack.pop
+            for _ in range(rounds):
+                for item in items:
+                    push(item)
+                for _ in range(batch):
+                    pop()
+
+        def bulk():
+            for _ in range(rounds):
+                stack.push_many(items)
+                stack.pop_many(batch)
+
+        single = _time_per_call(looped, 1, repeat=3)
+        many = _time_per_call(bulk, 1, repeat=3)
+        print(f"{name:16} single calls {single / 1e3:8.2f} ms, "
+              f"bulk {many / 1e3:8.2f} ms ({single / many:.1f}x) "
+              f"for {size} pushes + pops in batches of {batch}")
+    print()
+
+
+def benchmark_concurrent_stack(operations=200000, thread_counts=(1, 2, 4, 8, 16, 32)):
+    """Measure ConcurrentStack throughput as the number of threads grows."""
+    print("=== CONCURRENT STACK CONTENTION ===")
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil_enabled else 'disabled (free-threaded build)'}")
+    for threads in thread_counts:
+        row = []
+        for options in [{}, {'elimination': True}]:
+            stack = ConcurrentStack(**options)
+            per_thread = operations // threads
+
+            def worker():
+                push = stack.push
+                pop = stack.pop
+                for i in range(per_thread):
+                    push(i)
+                    pop()
+
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            row.append(f"{2 * per_thread * threads / elapsed / 1e6:6.2f} M ops/s")
+            if options:
+                row.append(f"{stack.eliminated} eliminated")
+        print(f"{threads:3} threads: locked {row[0]}, elimination {row[1]} ({row[2]})")
+    print()
+
+
+class _PollingStack:
+    """ArrayStack consumer that polls is_empty() with asyncio.sleep."""
+
+    def __init__(self, interval=0.001):
+        self._stack = ArrayStack()
+        self._interval = interval
+
+    async def push(self, item):
+        self._stack.push(item)
+
+    async def pop(self):
+        while self._stack.is_empty():
+            await asyncio.sleep(self._interval)
+        return self._stack.pop()
+
+
+def _async_push_pop(stack):
+    """Return the awaitable push and pop of a stack or asyncio queue."""
+    if isinstance(stack, asyncio.Queue):
+        return stack.put, stack.get
+    return stack.push, stack.pop
+
+
+def benchmark_async_stack(items=100000, wakeups=2000):
+    """Compare AsyncStack with asyncio.LifoQueue and is_empty() polling."""
+    print("=== ASYNC STACK ===")
+    candidates = [("AsyncStack", AsyncStack),
+                  ("asyncio.LifoQueue", asyncio.LifoQueue),
+                  ("Polling ArrayStack", _PollingStack)]
+
+    async def throughput(factory):
+        stack = factory()
+        push, pop = _async_push_pop(stack)
+        start = time.perf_counter()
+        for _ in range(items // 100):
+            for i in range(100):
+                await push(i)
+            for i in range(100):
+                await pop()
+        return 2 * items / (time.perf_counter() - start)
+
+    async def wakeup_latency(factory):
+        push, pop = _async_push_pop(factory())
+        latencies = []
+
+        async def consumer():
+            for _ in range(wakeups):
+                sent = await pop()
+                latencies.append(time.perf_counter() - sent)
+
+        task = asyncio.ensure_future(consumer())
+        for i in range(wakeups):
+            await asyncio.sleep(0)  # Let the consumer start waiting
+            await push(time.perf_counter())
+            while len(latencies) <= i:
+                await asyncio.sleep(0)
+        await task
+        latencies.sort()
+        return latencies[len(latencies) // 2]
+
+    for name, factory in candidates:
+        ops = asyncio.run(throughput(factory))
+        latency = asyncio.run(wakeup_latency(factory))
+        print(f"{name:20} {ops / 1e6:6.2f} M ops/s, median wake-up {latency * 1e6:8.1f} us")
+    print()
+
+
+class _SnapshotEditor:
+    """Reference editor that stores full content snapshots for undo."""
+
+    def __init__(self):
+        self.content = ""
+        self.undo_stack = ArrayStack()
+        self.redo_stack = ArrayStack()
+
+    def type_text(self, text):
+        self.undo_stack.push(('type', self.content))
+        self.redo_stack = ArrayStack()
+        self.content += text
+
+
+def benchmark_text_editor(keystrokes=1000000, snapshot_keystrokes=20000):
+    """Compare snapshot-based and edit-based undo history while typing."""
+    print("=== TEXT EDITOR HISTORY ===")
+    for name, factory, count in [
+            ("Snapshot history", _SnapshotEditor, snapshot_keystrokes),
+            ("Edit history", lambda: TextEditor(verbose=False), keystrokes)]:
+        def session():
+            editor = factory()
+            for i in range(count):
+                editor.type_text("abcdefghij"[i % 10])
+            return editor
+
+        start = time.perf_counter()
+        session()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        editor = session()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(editor.content) == count
+        del editor
+        print(f"{name:17} {count:8} keystrokes: {elapsed / count * 1e6:7.2f} us/keystroke, "
+              f"{retained / 2**20:8.1f} MiB retained")
+    print()
+
+
+def benchmark_bounded_history(keystrokes=200000):
+    """Measure retained memory of capped and coalesced editor history."""
+    print("=== BOUNDED UNDO HISTORY ===")
+    configs = [
+        ("Unbounded", {}),
+        ("history_limit=1000", {'history_limit': 1000}),
+        ("history_bytes=1 MiB", {'history_bytes': 1 << 20}),
+        ("coalesce_typing", {'coalesce_typing': True}),
+    ]
+    for name, options in configs:
+        def session():
+            editor = TextEditor(verbose=False, **options)
+            for i in range(keystrokes):
+                editor.type_text("abcdefghij"[i % 10])
+            return editor
+
+        start = time.perf_counter()
+        session()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        editor = session()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        evicted = getattr(editor.undo_stack, 'evicted_items', 0)
+        print(f"{name:20} {editor.undo_stack.size():7} steps kept, {evicted:7} evicted, "
+              f"{retained / 2**20:6.1f} MiB traced, {elapsed / keystrokes * 1e6:5.2f} us/keystroke")
+        del editor
+    print()
+
+
+def _show_by_draining(stack):
+    """Reference inspection that pops everything and pushes it back."""
+    temp = ArrayStack()
+    while not stack.is_empty():
+        temp.push(stack.pop())
+    frames = []
+    while not temp.is_empty():
+        frame = temp.pop()
+        frames.append(frame)
+        stack.push(frame)
+    return frames
+
+
+def benchmark_persistent_stack(depths=(10, 100, 1000, 10000)):
+    """Compare persistent snapshots with drain-and-refill and copy patterns."""
+    print("=== PERSISTENT STACK ===")
+    for depth in depths:
+        calls = max(1, 100000 // depth)
+        array_stack = ArrayStack()
+        persistent = PersistentStack()
+        for i in range(depth):
+            array_stack.push(i)
+            persistent = persistent.push(i)
+
+        drain = _time_per_call(lambda: _show_by_draining(array_stack), calls)
+        iterate = _time_per_call(lambda: list(persistent), calls)
+        copy = _time_per_call(lambda: list(array_stack._data), calls)
+        snapshot = _time_per_call(persistent.snapshot, calls)
+        print(f"depth {depth:6}: inspect by draining {drain:9.2f} us, "
+              f"persistent iteration {iterate:8.2f} us; "
+              f"snapshot by copy {copy:7.2f} us, persistent {snapshot:5.2f} us")
+    print()
+
+
+class _DictNode:
+    """Reference node with a per-instance __dict__ (no __slots__)."""
+
+    def __init__(self, data, next_node=None):
+        self.data = data
+        self.next = next_node
+
+
+def benchmark_node_pool(size=1000000, churn=1000000, gc_elements=10_000_000):
+    """
+    Compare node memory, push/pop churn and GC pauses for LinkedListStack.
+
+    The GC pause is measured over 10M nodes, which takes about 1.2 GB of
+    RAM with the dict-based ones; pass a smaller gc_elements on machines
+    with less memory.
+    """
+    print("=== LINKED LIST NODES ===")
+    for name, node_class in [("dict Node", _DictNode), ("slotted Node", Node)]:
+        tracemalloc.start()
+        head = None
+        for i in range(size):
+            head = node_class(i + 1000, head)
+        per_node = tracemalloc.get_traced_memory()[0] / size
+        tracemalloc.stop()
+        del head
+
+        head = None
+        for i in range(gc_elements):
+            head = node_class(i, head)
+        start = time.perf_counter()
+        gc.collect()
+        pause = time.perf_counter() - start
+        del head
+        print(f"{name:13} {per_node:6.1f} bytes/element (with its int), "
+              f"full gc.collect() at {gc_elements} nodes: {pause * 1e3:7.1f} ms")
+
+    for name, pool_size in [("no pool", 0), ("pool_size=64", 64)]:
+        stack = LinkedListStack(pool_size=pool_size)
+
+        def work():
+            push = stack.push
+            pop = stack.pop
+            for i in range(churn // 16):
+                for j in range(16):
+                    push(j)
+                for j in range(16):
+                    pop()
+
+        elapsed = _time_per_call(work, 1, repeat=3) / 1e6
+        print(f"Churn, {name:13} {2 * churn / elapsed / 1e6:6.2f} M ops/s")
+    print()
+
+
+def benchmark_stack_repr(sizes=(1000, 100000, 1000000)):
+    """Show that repr() of a stack costs O(repr_limit), not O(n)."""
+    print("=== STACK REPR ===")
+    for size in sizes:
+        array_stack = ArrayStack()
+        array_stack.push_many(range(size))
+        ll_stack = LinkedListStack()
+        ll_stack.push_many(range(size))
+        full = _time_per_call(lambda: f"ArrayStack({array_stack._data})", 1, repeat=3)
+        array_repr = _time_per_call(lambda: repr(array_stack), 100)
+        ll_repr = _time_per_call(lambda: repr(ll_stack), 100)
+        print(f"{size:8} items: full list format {full:10.1f} us, "
+              f"ArrayStack repr {array_repr:6.1f} us, LinkedListStack repr {ll_repr:6.1f} us")
+    print()
+
+
+def benchmark_instrumentation(operations=500000):
+    """Show that instrumentation costs nothing unless it is used."""
+    print("=== INSTRUMENTATION OVERHEAD ===")
+
+    def churn(stack):
+        push = stack.push
+        pop = stack.pop
+        for i in range(operations):
+            push(i)
+        for i in range(operations):
+            pop()
+
+    for stack_class in [ArrayStack, LinkedListStack]:
+        name = stack_class.__name__
+        before = _time_per_call(lambda: churn(stack_class()), 1, repeat=5)
+        instrumented = instrument(stack_class)
+        after = _time_per_call(lambda: churn(stack_class()), 1, repeat=5)
+        enabled = _time_per_call(lambda: churn(instrumented()), 1, repeat=5)
+        print(f"{name:16} plain {before / 1e3:7.1f} ms, "
+              f"plain after instrument() {after / 1e3:7.1f} ms ({after / before - 1:+.1%}), "
+              f"instrumented {enabled / 1e3:7.1f} ms ({enabled / before - 1:+.0%})")
+    print()
+
+
+def _deep_push_pop(factory, depth):
+    """
+    Push depth items then pop them all, in a fresh worker process.
+
+    Returns:
+        tuple: (push seconds, pop seconds, peak RSS growth in bytes)
+    """
+    import resource
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stack = factory()
+    push = stack.push
+    pop = stack.pop
+    start = time.perf_counter()
+    for i in range(depth):
+        push(i)
+    pushed = time.perf_counter()
+    for i in range(depth):
+        pop()
+    popped = time.perf_counter()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if hasattr(stack, 'close'):
+        stack.close()
+    return pushed - start, popped - pushed, (peak - baseline) * 1024
+
+
+def benchmark_aggregate_stack(depths=(100000, 1000000, 10000000), operations=200000):
+    """Compare AggregateStack queries with rescanning a plain stack."""
+    print("=== AGGREGATE STACK ===")
+    rng = random.Random(0)
+    for depth in depths:
+        items = [rng.random() for _ in range(depth)]
+        plain = ArrayStack()
+        plain.push_many(items)
+        tracked = AggregateStack('min')
+        tracked.push_many(items)
+        rescan = _time_per_call(lambda: min(plain._data), 1, repeat=3)
+        lookup = _time_per_call(tracked.aggregate, 10000)
+        print(f"min of {depth:>9} items: rescan {rescan:12.1f} us, "
+              f"aggregate() {lookup * 1e3:6.1f} ns ({rescan / lookup:,.0f}x)")
+        del plain, tracked
+    print()
+
+    # Push/pop/query cost around a fixed depth, with a query after every push
+    values = [rng.random() for _ in range(operations)]
+
+    def churn(stack, query):
+        push = stack.push
+        pop = stack.pop
+        for value in values:
+            push(value)
+            query()
+            pop()
+
+    plain = ArrayStack()
+    plain.push_many(values[:1000])
+    base = _time_per_call(lambda: churn(plain, plain.peek), 1, repeat=3)
+    print(f"{'ArrayStack + peek()':32} {base / operations * 1e3:7.1f} ns per push/query/pop")
+    for label, combine in [("'min' preset", 'min'), ("'sum' preset", 'sum'),
+                           ("lambda a, b: min(a, b)", lambda a, b: min(a, b))]:
+        stack = AggregateStack(combine)
+        stack.push_many(values[:1000])
+        elapsed = _time_per_call(lambda: churn(stack, stack.aggregate), 1, repeat=3)
+        print(f"{label:32} {elapsed / operations * 1e3:7.1f} ns per push/query/pop "
+              f"({elapsed / base:.2f}x)")
+
+    for label, combine in [("'min' preset", 'min'), ("'sum' preset", 'sum'),
+                           ("lambda a, b: min(a, b)", lambda a, b: min(a, b))]:
+        stack = AggregateStack(combine)
+        elapsed = _time_per_call(lambda: (stack.push_many(values), stack.clear()), 1, repeat=3)
+        print(f"push_many {label:22} {elapsed / operations * 1e3:7.1f} ns per item")
+    print()
+
+
+def _sliding_min_deque(values, window):
+    """Sliding-window minimum with a hand-written monotonic deque."""
+    candidates = deque()
+    result = []
+    for index, value in enumerate(values):
+        while candidates and values[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(index)
+        if candidates[0] <= index - window:
+            candidates.popleft()
+        result.append(values[candidates[0]])
+    return result
+
+
+def benchmark_queues(operations=1000000, depth=1000, held=1000000, window=1000,
+                     rescan_values=20000):
+    """Compare the queues in queues.py with collections.deque and queue.Queue."""
+    print("=== QUEUES ===")
+    import queue
+
+    ring_capacity = depth + 1
+    cases = [
+        ("collections.deque", deque, "append", "popleft"),
+        ("queue.Queue", queue.Queue, "put", "get"),
+        ("TwoStackQueue", TwoStackQueue, "enqueue", "dequeue"),
+        ("RingBuffer", lambda: RingBuffer(ring_capacity), "enqueue", "dequeue"),
+        ("RingBuffer('q')", lambda: RingBuffer(ring_capacity, 'q'), "enqueue", "dequeue"),
+        ("RingBuffer(block)", lambda: RingBuffer(ring_capacity, overflow="block"),
+         "enqueue", "dequeue"),
+    ]
+    print(f"Enqueue + dequeue at a depth of {depth}, {operations} rounds:")
+    for name, factory, put_name, get_name in cases:
+        buffer = factory()
+        put = getattr(buffer, put_name)
+        get = getattr(buffer, get_name)
+        for i in range(depth):
+            put(i)
+
+        def churn():
+            for i in range(operations):
+                put(i)
+                get()
+
+        elapsed = _time_per_call(churn, 1, repeat=3) / 1e6
+        print(f"  {name:20} {2 * operations / elapsed / 1e6:7.2f} M ops/s")
+
+    print(f"Memory holding {held} ints, including the int objects:")
+    for name, factory, put_name, get_name in cases[:5]:
+        if name.startswith("RingBuffer"):
+            factory = {"RingBuffer": lambda: RingBuffer(held),
+                       "RingBuffer('q')": lambda: RingBuffer(held, 'q')}[name]
+        tracemalloc.start()
+        buffer = factory()
+        put = getattr(buffer, put_name)
+        for i in range(held):
+            put(i + 1000)  # Outside the small-int cache
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del buffer, put
+        print(f"  {name:20} {size / held:6.1f} bytes/item")
+
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(operations)]
+
+    def aggregate_queue():
+        minimum = AggregateQueue('min', window=window)
+        enqueue = minimum.enqueue
+        aggregate = minimum.aggregate
+        return [enqueue(value) or aggregate() for value in values]
+
+    def rescan():
+        recent = deque(maxlen=window)
+        append = recent.append
+        return [append(value) or min(recent) for value in values[:rescan_values]]
+
+    print(f"Sliding-window minimum over {operations} values, window {window}:")
+    aggregate_time = _time_per_call(aggregate_queue, 1, repeat=3) / 1e6
+    deque_time = _time_per_call(lambda: _sliding_min_deque(values, window), 1, repeat=3) / 1e6
+    rescan_time = _time_per_call(rescan, 1, repeat=1) / 1e6 * operations / rescan_values
+    assert aggregate_queue() == _sliding_min_deque(values, window)
+    print(f"  {'AggregateQueue':20} {operations / aggregate_time / 1e6:7.2f} M values/s")
+    print(f"  {'monotonic deque':20} {operations / deque_time / 1e6:7.2f} M values/s")
+    print(f"  {'min(deque) rescan':20} {operations / rescan_time / 1e6:7.2f} M values/s "
+          f"(timed on {rescan_values} values)")
+    print()
+
+
+def _count_down(n):
+    """Generator recursion for FunctionCallSimulator.run()."""
+    if n == 0:
+        return 0
+    return 1 + (yield _count_down, n - 1)
+
+
+def _count_down_native(n):
+    return 0 if n == 0 else 1 + _count_down_native(n - 1)
+
+
+def _count_down_through_c(n):
+    # Each level re-enters the interpreter from C (map), using C stack
+    return 0 if n == 0 else 1 + sum(map(_count_down_through_c, (n - 1,)))
+
+
+def _fibonacci(n):
+    if n < 2:
+        return n
+    return (yield _fibonacci, n - 1) + (yield _fibonacci, n - 2)
+
+
+def _native_recursion(function, depth, limit):
+    """Time a native recursion with the given recursion limit (in a worker)."""
+    sys.setrecursionlimit(limit)
+    start = time.perf_counter()
+    try:
+        function(depth)
+    except RecursionError:
+        return "RecursionError"
+    return time.perf_counter() - start
+
+
+def benchmark_function_executor(depths=(500, 100000, 1000000), fibonacci=25):
+    """Compare FunctionCallSimulator.run() with native recursion."""
+    print("=== RECURSION WITHOUT THE CALL STACK ===")
+    default_limit = sys.getrecursionlimit()
+
+    def show(label, outcome, depth):
+        if isinstance(outcome, str):
+            print(f"  {label:34} {outcome}")
+        else:
+            print(f"  {label:34} {outcome * 1e3:9.1f} ms ({depth / outcome / 1e6:5.2f} M calls/s)")
+
+    for depth in depths:
+        print(f"Depth {depth}:")
+        for label, disable_gc in [("FunctionCallSimulator.run()", False),
+                                  ("  with disable_gc=True", True)]:
+            simulator = FunctionCallSimulator()
+            start = time.perf_counter()
+            simulator.run(_count_down, depth, disable_gc=disable_gc)
+            show(label, time.perf_counter() - start, depth)
+        # Each native run gets a fresh process, as a deep one may crash it
+        for label, function, limit in [
+                (f"native, limit {default_limit}", _count_down_native, default_limit),
+                ("native, setrecursionlimit", _count_down_native, depth + 100),
+                ("native via map, setrecursionlimit", _count_down_through_c, depth + 100)]:
+            try:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    outcome = pool.submit(_native_recursion, function, depth, limit).result()
+            except Exception as exc:
+                outcome = f"worker crashed ({type(exc).__name__})"
+            show(label, outcome, depth)
+
+    calls = []
+    for memoize in [False, True]:
+        simulator = FunctionCallSimulator(memoize=memoize)
+        start = time.perf_counter()
+        simulator.run(_fibonacci, fibonacci)
+        calls.append((memoize, simulator.call_count, time.perf_counter() - start))
+    for memoize, count, elapsed in calls:
+        print(f"fibonacci({fibonacci}), memoize={memoize!s:5} {count:8} calls, "
+              f"{elapsed * 1e3:9.2f} ms")
+    print()
+
+
+def _simulate_calls(simulator, events, depth):
+    """Call down to depth and return back up until events have happened."""
+    call = simulator.call_function
+    ret = simulator.return_from_function
+    for _ in range(max(events // (2 * depth), 1)):
+        for level in range(depth):
+            call("visit", {'level': level})
+        for level in range(depth):
+            ret(level)
+
+
+def benchmark_call_tracing(events=100000, depths=(10, 100, 1000), run_depth=100000):
+    """Compare CallTrace recording with the printing FunctionCallSimulator."""
+    print("=== CALL TRACING ===")
+    import contextlib
+    import io
+
+    print("call_function/return_from_function, output to /dev/null:")
+    for depth in depths:
+        # Printing redraws the whole stack per event, so run fewer events
+        printed = max(events // depth, 2 * depth)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            _simulate_calls(FunctionCallSimulator(), printed, depth)
+            printing = (time.perf_counter() - start) / printed
+        trace = CallTrace(capacity=events)
+        start = time.perf_counter()
+        _simulate_calls(FunctionCallSimulator(trace=trace), events, depth)
+        tracing = (time.perf_counter() - start) / trace.recorded
+        print(f"  depth {depth:5}: printing {printing * 1e9:10.0f} ns/event, "
+              f"tracing {tracing * 1e9:6.0f} ns/event ({printing / tracing:,.0f}x)")
+
+    simulator = FunctionCallSimulator()
+    start = time.perf_counter()
+    simulator.run(_count_down, run_depth)
+    plain = time.perf_counter() - start
+    trace = CallTrace(capacity=2 * run_depth)
+    simulator = FunctionCallSimulator(trace=trace)
+    start = time.perf_counter()
+    simulator.run(_count_down, run_depth)
+    traced = time.perf_counter() - start
+    print(f"run() to depth {run_depth}: {plain * 1e3:7.1f} ms untraced, "
+          f"{traced * 1e3:7.1f} ms traced ({(traced - plain) / trace.recorded * 1e9:.0f} ns/event, "
+          f"{CallTrace._RECORD.size} bytes/event)")
+
+    trace = CallTrace(capacity=events)
+    _simulate_calls(FunctionCallSimulator(trace=trace), events, depths[0])
+    for label, export in [("folded stacks", trace.folded_stacks),
+                          ("Chrome trace JSON", lambda: json.dumps(trace.chrome_trace()))]:
+        start = time.perf_counter()
+        export()
+        elapsed = time.perf_counter() - start
+        print(f"Export {trace.recorded} events as {label:17}: {elapsed * 1e3:7.1f} ms")
+    print()
+
+
+def benchmark_disk_backed_stack(depth=10000000, memory_items=1000000):
+    """Compare ArrayStack with DiskBackedStack at 10x the memory budget."""
+    print("=== DISK-BACKED STACK ===")
+    print(f"depth {depth:,}, memory budget {memory_items:,} items")
+    from functools import partial
+
+    factories = [
+        ("ArrayStack", ArrayStack),
+        ("DiskBackedStack", partial(DiskBackedStack, memory_items)),
+        ("DiskBackedStack('q')", partial(DiskBackedStack, memory_items, 'q')),
+    ]
+    for name, factory in factories:
+        # Peak RSS never goes down, so each stack gets a fresh process
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            push_time, pop_time, rss = pool.submit(_deep_push_pop, factory, depth).result()
+        print(f"{name:21} push {depth / push_time / 1e6:5.2f}M/s, "
+              f"pop {depth / pop_time / 1e6:5.2f}M/s, peak RSS +{rss / (1 << 20):6.1f} MiB")
+    print()
+
+
+def benchmark_snapshots(size=10000000, blobs=1000):
+    """Compare dump()/load() with pickling the whole stack."""
+    print("=== STACK SNAPSHOTS ===")
+    array_stack = ArrayStack()
+    array_stack.push_many(range(size))
+    linked_stack = LinkedListStack()
+    linked_stack.push_many(range(size))
+    stacks = [
+        (f"ArrayStack of {size:,} ints", array_stack),
+        (f"TypedArrayStack('d') of {size:,}", TypedArrayStack('d', range(size))),
+        (f"LinkedListStack of {size:,} ints", linked_stack),
+    ]
+    if np is not None:
+        # NumPy arrays pickle their data as out-of-band buffers
+        array_blobs = ArrayStack()
+        array_blobs.push_many(np.zeros(8192) for _ in range(blobs))
+        stacks.append((f"ArrayStack of {blobs:,} 64 KiB NumPy arrays", array_blobs))
+
+    def timed(write, read):
+        with tempfile.TemporaryFile() as f:
+            start = time.perf_counter()
+            write(f)
+            written = time.perf_counter()
+            nbytes = f.tell()
+            f.seek(0)
+            read(f)
+            return written - start, time.perf_counter() - written, nbytes
+
+    for name, stack in stacks:
+        print(name)
+        for label, write, read in [
+                ("dump/load", lambda f: dump(stack, f), load),
+                ("  no GC", lambda f: dump(stack, f), lambda f: load(f, disable_gc=True)),
+                ("pickle", lambda f: pickle.dump(stack, f, protocol=5), pickle.load)]:
+            try:
+                dumped, loaded, nbytes = timed(write, read)
+            except RecursionError:
+                print(f"  {label:10} RecursionError")
+                continue
+            print(f"  {label:10} dump {dumped:6.2f} s, load {loaded:6.2f} s, "
+                  f"{nbytes / 1e6:6.1f} MB")
+    print()
+
+
+def _next_greater_naive(values):
+    """Scan ahead from every element: O(n^2) in the worst case."""
+    n = len(values)
+    result = [-1] * n
+    for i in range(n):
+        for j in range(i + 1, n):
+            if values[j] > values[i]:
+                result[i] = j
+                break
+    return result
+
+
+def _next_greater_loop(values):
+    """Per-element stack loop over a NumPy array, as usually hand-written."""
+    result = [-1] * len(values)
+    stack = []
+    for i, value in enumerate(values):
+        while stack and values[stack[-1]] < value:
+            result[stack.pop()] = i
+        stack.append(i)
+    return result
+
+
+def benchmark_monotonic_kernels(sizes=(1000000, 10000000, 100000000), window=100,
+                                naive_size=5000, sequence_limit=10000000):
+    """Compare the monotonic-stack kernels on lists, arrays and memmaps."""
+    print("=== MONOTONIC STACK KERNELS ===")
+    if np is None:
+        print("NumPy not installed, skipping\n")
+        return
+    rng = np.random.default_rng(0)
+    kernels = [
+        ("next_greater", next_greater),
+        ("stock_span", stock_span),
+        ("largest_rectangle", largest_rectangle),
+        (f"sliding_window_max({window})", lambda values: sliding_window_max(values, window)),
+    ]
+
+    def timed(func, *args):
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+
+    # A falling price never sees a greater one: the naive scan's worst case
+    prices = np.linspace(200, 100, naive_size)
+    naive = timed(_next_greater_naive, prices.tolist())
+    loop = timed(_next_greater_loop, prices)
+    kernel = timed(next_greater, prices)
+    print(f"next_greater on {naive_size:,} falling prices: naive scan {naive * 1e3:7.1f} ms, "
+          f"hand-written loop {loop * 1e3:5.1f} ms, kernel {kernel * 1e3:5.1f} ms")
+
+    for size in sizes:
+        print(f"{size:,} elements:")
+        with tempfile.TemporaryDirectory() as directory:
+            if size > sequence_limit:
+                # Too big to hold comfortably: stream a memmap in chunks
+                prices = np.memmap(os.path.join(directory, "prices"), dtype=np.float64,
+                                   mode="w+", shape=(size,))
+                last = 100.0
+                for start in range(0, size, 10000000):
+                    stop = min(start + 10000000, size)
+                    prices[start:stop] = last + np.cumsum(rng.standard_normal(stop - start))
+                    last = prices[stop - 1]
+                sequence = None
+            else:
+                prices = 100 + np.cumsum(rng.standard_normal(size))
+                sequence = prices.tolist()
+            for name, kernel in kernels:
+                vectorized = timed(kernel, prices)
+                line = f"  {name:24} NumPy {size / vectorized / 1e6:6.1f}M/s"
+                if sequence is not None:
+                    per_element = timed(kernel, sequence)
+                    line += (f", list {size / per_element / 1e6:5.1f}M/s "
+                             f"({per_element / vectorized:4.1f}x)")
+                print(line)
+            if sequence is not None and size == sizes[0]:
+                loop = timed(_next_greater_loop, prices)
+                print(f"  {'hand-written loop':24} {size / loop / 1e6:6.1f}M/s (next_greater)")
+            del prices
+    print()
+
+
+REPORTS = [
+    benchmark_expression_cache,
+    benchmark_postfix_batch,
+    benchmark_tokenizer,
+    benchmark_evaluate_infix,
+    benchmark_evaluate_many,
+    benchmark_numeric_modes,
+    benchmark_parentheses_stream,
+    benchmark_typed_array_stack,
+    benchmark_bulk_operations,
+    benchmark_aggregate_stack,
+    benchmark_queues,
+    benchmark_disk_backed_stack,
+    benchmark_snapshots,
+    benchmark_monotonic_kernels,
+    benchmark_concurrent_stack,
+    benchmark_async_stack,
+    benchmark_function_executor,
+    benchmark_call_tracing,
+    benchmark_text_editor,
+    benchmark_bounded_history,
+    benchmark_persistent_stack,
+    benchmark_node_pool,
+    benchmark_stack_repr,
+    benchmark_instrumentation,
+]
+
+
+def main(argv=None):
+    """Run the benchmark harness, a run comparison, or the reports."""
+    parser = argparse.ArgumentParser(description="Stack benchmarks")
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5],
+                        help="problem sizes, e.g. 1e3 1e6 1e8")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the tracemalloc run")
+    parser.add_argument('--select', help="only run cases containing this text")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="compare two JSON result files")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown flagged as a regression (default: 0.10)")
+    parser.add_argument('--reports', action='store_true',
+                        help="run the comparison reports instead")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows = compare_runs(baseline, current, args.threshold)
+        for name, size, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:38} n={size:<10} {ratio:6.2f}x {flag}")
+        regressions = sum(1 for row in rows if row[3])
+        print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    if args.reports:
+        for report in REPORTS:
+            report()
+        return 0
+
+    run = run_suite([int(size) for size in args.sizes], args.repeat, args.warmup,
+                    not args.no_memory, args.select)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nWrote {len(run['results'])} results to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
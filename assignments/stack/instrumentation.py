@@ -0,0 +1,290 @@
+"""
+Stack Instrumentation
+
+This module adds opt-in metrics to the stack classes in stack.py. Instead of
+checking a flag inside every push and pop, instrument() builds a subclass
+whose methods record counters, so stacks created from the plain classes run
+exactly the original code.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import os
+import struct
+import sys
+import time
+
+
+# Upper bounds of the depth histogram buckets (powers of two)
+DEPTH_BUCKETS = tuple(2 ** i for i in range(41))
+
+
+class StackMetrics:
+    """
+    Counters and high-water marks for one instrumented stack.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize zeroed metrics.
+
+        Args:
+            name (str): Label identifying the stack in reports
+        """
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        """Zero every counter and restart the rate clock."""
+        self.pushes = 0
+        self.pops = 0
+        self.empty_pops = 0
+        self.peak_depth = 0
+        self.resizes = 0
+        self.resize_ns = 0
+        self.depth_counts = [0] * len(DEPTH_BUCKETS)
+        self.depth_sum = 0
+        self.started_ns = time.perf_counter_ns()
+
+    def snapshot(self):
+        """
+        Get the current metrics.
+
+        Returns:
+            dict: Counters, peak depth, resize time, per-second rates
+            and the push-depth histogram as {bucket upper bound: count}
+            with the sum of the recorded depths
+        """
+        elapsed = max(time.perf_counter_ns() - self.started_ns, 1) / 1e9
+        return {
+            'name': self.name,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'empty_pops': self.empty_pops,
+            'peak_depth': self.peak_depth,
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_ns / 1e9,
+            'push_rate': self.pushes / elapsed,
+            'pop_rate': self.pops / elapsed,
+            'elapsed_seconds': elapsed,
+            'depth_histogram': {bound: count for bound, count
+                                in zip(DEPTH_BUCKETS, self.depth_counts) if count},
+            'depth_sum': self.depth_sum,
+        }
+
+
+class HistogramSink:
+    """
+    In-process sink that keeps every reported snapshot.
+
+    Snapshots are cumulative, so histograms are merged across stacks
+    (by name) using each stack's latest report.
+    """
+
+    def __init__(self):
+        """Initialize an empty report history."""
+        self.reports = []
+
+    def __call__(self, snapshot):
+        self.reports.append(snapshot)
+
+    def depth_histogram(self):
+        """
+        Merge the depth histograms of the latest report of each stack.
+
+        Returns:
+            dict: {bucket upper bound: count}
+        """
+        latest = {report['name']: report for report in self.reports}
+        merged = {}
+        for report in latest.values():
+            for bound, count in report['depth_histogram'].items():
+                merged[bound] = merged.get(bound, 0) + count
+        return dict(sorted(merged.items()))
+
+
+def prometheus_text(snapshot):
+    """
+    Render a metrics snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): Result of StackMetrics.snapshot()
+
+    Returns:
+        str: The exposition text
+    """
+    name = snapshot['name'].replace('\\', '\\\\').replace('"', '\\"')
+    labels = f'stack="{name}"'
+    lines = []
+    for metric, kind, value in [
+            ('stack_pushes_total', 'counter', snapshot['pushes']),
+            ('stack_pops_total', 'counter', snapshot['pops']),
+            ('stack_empty_pops_total', 'counter', snapshot['empty_pops']),
+            ('stack_resizes_total', 'counter', snapshot['resizes']),
+            ('stack_resize_seconds_total', 'counter', snapshot['resize_seconds']),
+            ('stack_depth_peak', 'gauge', snapshot['peak_depth'])]:
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric}{{{labels}}} {value}")
+
+    lines.append("# TYPE stack_push_depth histogram")
+    cumulative = 0
+    histogram = snapshot['depth_histogram']
+    total = sum(histogram.values())
+    for bound in DEPTH_BUCKETS:
+        if cumulative == total:
+            break  # Higher buckets would all repeat the total
+        cumulative += histogram.get(bound, 0)
+        lines.append(f'stack_push_depth_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'stack_push_depth_bucket{{{labels},le="+Inf"}} {cumulative}')
+    lines.append(f"stack_push_depth_sum{{{labels}}} {snapshot['depth_sum']}")
+    lines.append(f"stack_push_depth_count{{{labels}}} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusFileSink:
+    """
+    Sink that writes the latest snapshot to a file for a textfile collector.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the sink.
+
+        Args:
+            path (str): File to (re)write on every report
+        """
+        self.path = path
+
+    def __call__(self, snapshot):
+        # Write then rename so a scraper never reads a partial file
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(prometheus_text(snapshot))
+        os.replace(temp_path, self.path)
+
+
+_instrumented_classes = {}
+_EMPTY_LIST_SIZE = sys.getsizeof([])
+_POINTER_SIZE = struct.calcsize('P')
+
+
+def _list_capacity(data):
+    """Return how many items a list can hold before it reallocates."""
+    return (sys.getsizeof(data) - _EMPTY_LIST_SIZE) // _POINTER_SIZE
+
+
+def instrument(stack_class):
+    """
+    Return an instrumented subclass of a stack class.
+
+    Can be used as a class decorator. Instances take two extra keyword
+    arguments: name (label for reports) and sink (callable receiving
+    snapshots from report()). Resize time is tracked for list-backed
+    stacks by timing only the pushes that find the list at capacity.
+
+    Args:
+        stack_class: ArrayStack, LinkedListStack or a compatible class
+
+    Returns:
+        type: The instrumented subclass (cached per class)
+
+    Examples:
+        >>> TracedStack = instrument(ArrayStack)
+        >>> stack = TracedStack(name="jobs", sink=print)
+    """
+    if stack_class in _instrumented_classes:
+        return _instrumented_classes[stack_class]
+
+    class Instrumented(stack_class):
+        def __init__(self, *args, name=None, sink=None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.metrics = StackMetrics(name or stack_class.__name__)
+            self.sink = sink
+            self._list = self._data if isinstance(getattr(self, '_data', None), list) else None
+            self._capacity = _list_capacity(self._list) if self._list is not None else None
+
+        def _record_depths(self, first, last):
+            # One sample per depth in first..last, added bucket by bucket
+            # so a bulk push costs O(log n) rather than O(n)
+            if first > last:
+                return
+            metrics = self.metrics
+            if last > metrics.peak_depth:
+                metrics.peak_depth = last
+            metrics.depth_sum += (first + last) * (last - first + 1) // 2
+            counts = metrics.depth_counts
+            depth = first
+            while depth <= last:
+                bucket = (depth - 1).bit_length()
+                upper = min(1 << bucket, last)
+                counts[bucket] += upper - depth + 1
+                depth = upper + 1
+
+        def push(self, item):
+            data = self._list
+            if data is not None and len(data) >= self._capacity:
+                # Only a push into a full list reallocates, so only time those
+                start = time.perf_counter_ns()
+                super().push(item)
+                self.metrics.resize_ns += time.perf_counter_ns() - start
+                self.metrics.resizes += 1
+                self._capacity = _list_capacity(data)
+            else:
+                super().push(item)
+            metrics = self.metrics
+            metrics.pushes += 1
+            depth = self.size()
+            if depth > metrics.peak_depth:
+                metrics.peak_depth = depth
+            metrics.depth_counts[(depth - 1).bit_length()] += 1
+            metrics.depth_sum += depth
+
+        def push_many(self, items):
+            before = self.size()
+            super().push_many(items)
+            after = self.size()
+            self.metrics.pushes += after - before
+            self._record_depths(before + 1, after)
+            self._refresh_capacity()
+
+        def pop(self):
+            try:
+                item = super().pop()
+            except IndexError:
+                self.metrics.empty_pops += 1
+                raise
+            self.metrics.pops += 1
+            data = self._list
+            if data is not None and len(data) < self._capacity >> 1:
+                self._capacity = _list_capacity(data)  # CPython shrank it
+            return item
+
+        def pop_many(self, n):
+            try:
+                items = super().pop_many(n)
+            except IndexError:
+                self.metrics.empty_pops += 1
+                raise
+            self.metrics.pops += len(items)
+            self._refresh_capacity()
+            return items
+
+        def clear(self):
+            super().clear()
+            self._refresh_capacity()
+
+        def _refresh_capacity(self):
+            if self._list is not None:
+                self._capacity = _list_capacity(self._list)
+
+        def report(self):
+            """Send a metrics snapshot to the sink and return it."""
+            snapshot = self.metrics.snapshot()
+            if self.sink is not None:
+                self.sink(snapshot)
+            return snapshot
+
+    Instrumented.__name__ = Instrumented.__qualname__ = f"Instrumented{stack_class.__name__}"
+    _instrumented_classes[stack_class] = Instrumented
+    return Instrumented
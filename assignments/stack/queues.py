@@ -0,0 +1,662 @@
+"""
+Queue Implementations
+
+This module builds FIFO queues out of the primitives in stack.py: a queue
+made of two ArrayStacks, a fixed-capacity ring buffer, and a queue that
+answers min/max/sum (or any associative fold) of its contents in O(1)
+using two AggregateStacks, which makes sliding-window aggregates cheap.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import threading
+from array import array
+
+from stack import AggregateStack, ArrayStack, NO_IDENTITY, format_items
+
+
+class TwoStackQueue:
+    """
+    FIFO queue built from two ArrayStacks.
+    
+    New items are pushed onto the back stack. dequeue() pops from the front
+    stack and, when it runs dry, moves the whole back stack over in one
+    bulk pop_many/push_many, which reverses it into FIFO order. Every item
+    is moved at most once, so each operation is O(1) amortized.
+    """
+    
+    repr_limit = ArrayStack.repr_limit
+    
+    def __init__(self, items=()):
+        """
+        Initialize a queue.
+        
+        Args:
+            items: Optional iterable of initial items, front to back
+        """
+        self._front = ArrayStack()  # Top is the oldest item
+        self._back = ArrayStack()  # Top is the newest item
+        self._back.push_many(items)
+    
+    def _refill(self, message):
+        """Move the back stack onto the empty front stack."""
+        back = self._back
+        if not back:
+            raise IndexError(message)
+        self._front.push_many(back.pop_many(len(back)))
+    
+    def enqueue(self, item):
+        """
+        Add an item to the back of the queue.
+        
+        Args:
+            item: The item to be added
+            
+        Time Complexity: O(1) amortized
+        """
+        self._back.push(item)
+    
+    def dequeue(self):
+        """
+        Remove and return the item at the front of the queue.
+        
+        Returns:
+            The oldest item in the queue
+            
+        Raises:
+            IndexError: If the queue is empty
+            
+        Time Complexity: O(1) amortized
+        """
+        front = self._front
+        if not front:
+            self._refill("dequeue from empty queue")
+        return front.pop()
+    
+    def enqueue_many(self, items):
+        """
+        Add every item of an iterable, first item ending up nearest the front.
+        
+        Args:
+            items: Iterable of items
+            
+        Time Complexity: O(k) amortized for k items
+        """
+        self._back.push_many(items)
+    
+    def dequeue_many(self, n):
+        """
+        Remove and return the n oldest items.
+        
+        Args:
+            n (int): Number of items to dequeue
+            
+        Returns:
+            list: The items front first
+            
+        Raises:
+            IndexError: If the queue holds fewer than n items; the queue
+                is left unchanged
+            
+        Time Complexity: O(n) amortized
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(self):
+            raise IndexError("dequeue from empty queue")
+        front = self._front
+        items = front.pop_many(min(n, len(front)))
+        if len(items) < n:
+            self._refill("dequeue from empty queue")
+            items.extend(front.pop_many(n - len(items)))
+        return items
+    
+    def peek(self):
+        """
+        Return the front item without removing it.
+        
+        Returns:
+            The oldest item in the queue
+            
+        Raises:
+            IndexError: If the queue is empty
+            
+        Time Complexity: O(1)
+        """
+        if self._front:
+            return self._front.peek()
+        for item in reversed(self._back):
+            return item
+        raise IndexError("peek from empty queue")
+    
+    def clear(self):
+        """
+        Remove all items from the queue.
+        
+        Time Complexity: O(n)
+        """
+        self._front.clear()
+        self._back.clear()
+    
+    def is_empty(self):
+        """
+        Check if the queue is empty.
+        
+        Returns:
+            bool: True if queue is empty, False otherwise
+        """
+        return not self._front and not self._back
+    
+    def size(self):
+        """
+        Get the number of items in the queue.
+        
+        Returns:
+            int: Number of items in the queue
+        """
+        return len(self._front) + len(self._back)
+    
+    def __len__(self):
+        return len(self._front) + len(self._back)
+    
+    def __bool__(self):
+        return bool(self._front) or bool(self._back)
+    
+    def __iter__(self):
+        """Iterate over the items from front to back without copying."""
+        yield from self._front
+        yield from reversed(self._back)
+    
+    def __str__(self):
+        """String representation of the queue (front to back)."""
+        items = format_items(iter(self), len(self), self.repr_limit, True)
+        return f"TwoStackQueue({items})"
+    
+    def __repr__(self):
+        """Developer representation of the queue."""
+        return self.__str__()
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO queue in a preallocated circular array.
+    
+    The slots are allocated once, as a list or, with a typecode, as an
+    array.array of machine numbers, and the front index wraps around, so
+    enqueue and dequeue never resize or shift anything.
+    
+    When the buffer is full, overflow="overwrite" drops the oldest item
+    (counted in overwritten), which suits telemetry and "last N" logs.
+    overflow="block" applies back-pressure instead: enqueue() waits for a
+    free slot the way ConcurrentStack.push() does, and every operation runs
+    under a lock so producers and consumers can share the buffer between
+    threads. Overwrite mode takes no lock and is for use from one thread.
+    """
+    
+    repr_limit = ArrayStack.repr_limit
+    
+    def __init__(self, capacity, typecode=None, overflow="overwrite"):
+        """
+        Initialize an empty buffer.
+        
+        Args:
+            capacity (int): Number of slots
+            typecode (str): array module type code, or None to hold any
+                objects (default: None)
+            overflow (str): "overwrite" or "block" (default: "overwrite")
+            
+        Raises:
+            ValueError: If capacity is not positive or overflow is unknown
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if overflow not in ("overwrite", "block"):
+            raise ValueError(f"Unknown overflow mode: {overflow}")
+        self.capacity = capacity
+        self.typecode = typecode
+        self.overflow = overflow
+        if typecode is None:
+            self._slots = [None] * capacity
+        else:
+            self._slots = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._head = 0  # Slot of the oldest item
+        self._size = 0
+        self.overwritten = 0
+        if overflow == "block":
+            self._lock = threading.Lock()
+            self._not_empty = threading.Condition(self._lock)
+            self._not_full = threading.Condition(self._lock)
+        else:
+            self._lock = None
+    
+    def _put(self, item):
+        """Store an item behind the newest one, overwriting if full."""
+        capacity = self.capacity
+        if self._size == capacity:
+            head = self._head
+            self._slots[head] = item
+            self._head = head + 1 if head + 1 < capacity else 0
+            self.overwritten += 1
+        else:
+            index = self._head + self._size
+            self._slots[index if index < capacity else index - capacity] = item
+            self._size += 1
+    
+    def _get(self):
+        """Remove and return the oldest item of a non-empty buffer."""
+        head = self._head
+        slots = self._slots
+        item = slots[head]
+        if self.typecode is None:
+            slots[head] = None  # Don't keep the item alive
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        self._size -= 1
+        return item
+    
+    def enqueue(self, item, block=True, timeout=None):
+        """
+        Add an item to the back of the buffer.
+        
+        Args:
+            item: The item to be added
+            block (bool): In "block" mode, wait for a free slot when the
+                buffer is full (default: True)
+            timeout (float): Maximum seconds to wait (default: forever)
+            
+        Raises:
+            IndexError: In "block" mode, if the buffer is still full when
+                giving up
+            
+        Time Complexity: O(1), excluding waiting
+        """
+        if self._lock is None:
+            self._put(item)
+            return
+        with self._lock:
+            if self._size == self.capacity:
+                if not block or not self._not_full.wait_for(
+                        lambda: self._size < self.capacity, timeout):
+                    raise IndexError("enqueue to full queue")
+            self._put(item)
+            self._not_empty.notify()
+    
+    def try_enqueue(self, item):
+        """
+        Enqueue an item only if there is a free slot right now.
+        
+        Returns:
+            bool: True if the item was added without overwriting anything
+        """
+        if self._lock is None:
+            if self._size == self.capacity:
+                return False
+            self._put(item)
+            return True
+        try:
+            self.enqueue(item, block=False)
+        except IndexError:
+            return False
+        return True
+    
+    def dequeue(self, block=True, timeout=None):
+        """
+        Remove and return the item at the front of the buffer.
+        
+        Args:
+            block (bool): In "block" mode, wait for an item when the
+                buffer is empty (default: True)
+            timeout (float): Maximum seconds to wait (default: forever)
+            
+        Returns:
+            The oldest item in the buffer
+            
+        Raises:
+            IndexError: If the buffer is (still) empty
+            
+        Time Complexity: O(1), excluding waiting
+        """
+        if self._lock is None:
+            if not self._size:
+                raise IndexError("dequeue from empty queue")
+            return self._get()
+        with self._lock:
+            if not self._size:
+                if not block or not self._not_empty.wait_for(lambda: self._size, timeout):
+                    raise IndexError("dequeue from empty queue")
+            item = self._get()
+            self._not_full.notify()
+            return item
+    
+    def enqueue_many(self, items):
+        """
+        Add every item of an iterable, first item ending up nearest the front.
+        
+        In "overwrite" mode the items are copied in at most two slices, and
+        only the newest capacity items survive. In "block" mode each item
+        waits for its slot in turn.
+        
+        Args:
+            items: Iterable (or array of the same typecode) of items
+            
+        Time Complexity: O(k) for k items
+        """
+        if self._lock is not None:
+            for item in items:
+                self.enqueue(item)
+            return
+        if self.typecode is None:
+            items = list(items)
+        elif not (isinstance(items, array) and items.typecode == self.typecode):
+            items = array(self.typecode, items)
+        capacity = self.capacity
+        slots = self._slots
+        count = len(items)
+        if count >= capacity:
+            self.overwritten += self._size + count - capacity
+            slots[:] = items[count - capacity:]
+            self._head = 0
+            self._size = capacity
+            return
+        dropped = max(self._size + count - capacity, 0)
+        if dropped:
+            self.overwritten += dropped
+            self._head = (self._head + dropped) % capacity
+            self._size -= dropped
+        start = (self._head + self._size) % capacity
+        first = min(count, capacity - start)
+        slots[start:start + first] = items[:first]
+        slots[:count - first] = items[first:]
+        self._size += count
+    
+    def dequeue_many(self, n):
+        """
+        Remove and return the n oldest items.
+        
+        Args:
+            n (int): Number of items to dequeue
+            
+        Returns:
+            list: The items front first (an array for typed buffers)
+            
+        Raises:
+            IndexError: If the buffer holds fewer than n items; the buffer
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if self._lock is not None:
+            with self._lock:
+                items = self._take(n)
+                self._not_full.notify(n)
+                return items
+        return self._take(n)
+    
+    def _take(self, n):
+        """Slice the n oldest items out of the buffer."""
+        if n > self._size:
+            raise IndexError("dequeue from empty queue")
+        capacity = self.capacity
+        slots = self._slots
+        head = self._head
+        end = min(head + n, capacity)
+        items = slots[head:end] + slots[:n - (end - head)]
+        if self.typecode is None:
+            slots[head:end] = [None] * (end - head)
+            slots[:n - (end - head)] = [None] * (n - (end - head))
+        self._head = (head + n) % capacity
+        self._size -= n
+        return items
+    
+    def peek(self):
+        """
+        Return the front item without removing it.
+        
+        Raises:
+            IndexError: If the buffer is empty
+        """
+        if not self._size:
+            raise IndexError("peek from empty queue")
+        return self._slots[self._head]
+    
+    def clear(self):
+        """Remove all items from the buffer."""
+        if self._lock is not None:
+            with self._lock:
+                self._take(self._size)
+                self._not_full.notify_all()
+        else:
+            self._take(self._size)
+    
+    def is_empty(self):
+        """
+        Check if the buffer is empty.
+        
+        Returns:
+            bool: True if buffer is empty, False otherwise
+        """
+        return self._size == 0
+    
+    def is_full(self):
+        """
+        Check if every slot is in use.
+        
+        Returns:
+            bool: True if the next enqueue overwrites or blocks
+        """
+        return self._size == self.capacity
+    
+    def size(self):
+        """
+        Get the number of items in the buffer.
+        
+        Returns:
+            int: Number of items in the buffer
+        """
+        return self._size
+    
+    def __len__(self):
+        return self._size
+    
+    def __bool__(self):
+        return self._size > 0
+    
+    def __iter__(self):
+        """Iterate over the items from front to back."""
+        slots = self._slots
+        capacity = self.capacity
+        head = self._head
+        for offset in range(self._size):
+            index = head + offset
+            yield slots[index if index < capacity else index - capacity]
+    
+    def __str__(self):
+        """String representation of the buffer (front to back)."""
+        items = format_items(iter(self), self._size, self.repr_limit, True)
+        return f"RingBuffer({items}, capacity={self.capacity})"
+    
+    def __repr__(self):
+        """Developer representation of the buffer."""
+        return self.__str__()
+
+
+class AggregateQueue:
+    """
+    FIFO queue that keeps an associative fold of its contents in O(1).
+    
+    This is the two-stack queue with AggregateStacks in place of plain
+    ones: the back stack folds the items in arrival order and the front
+    stack folds them from the front of the queue onwards, so the aggregate
+    of the whole queue is one combine of the two stack aggregates. With a
+    window, enqueue() drops the oldest item once the queue is longer than
+    the window, giving sliding-window min/max/sum in O(1) amortized per
+    item. combine can be any associative function or the "min", "max" and
+    "sum" presets of AggregateStack.
+    
+    Examples:
+        >>> window = AggregateQueue('max', window=3)
+        >>> [window.enqueue(x) or window.aggregate() for x in [1, 3, 2, 0, 1]]
+        [1, 3, 3, 3, 2]
+    """
+    
+    repr_limit = ArrayStack.repr_limit
+    
+    def __init__(self, combine, identity=NO_IDENTITY, window=None):
+        """
+        Initialize an empty queue.
+        
+        Args:
+            combine: Associative function of two values, or the preset
+                name "min", "max" or "sum"
+            identity: Aggregate of an empty queue (default: 0 for "sum",
+                none otherwise, so aggregate() of an empty queue raises)
+            window (int): Maximum number of items kept, or None for no
+                limit (default: None)
+            
+        Raises:
+            ValueError: If window is not positive or the preset is unknown
+        """
+        if window is not None and window < 1:
+            raise ValueError("window must be positive")
+        self._back = AggregateStack(combine, identity)
+        preset = self._back._preset
+        if preset is None:
+            # The front stack holds the oldest item on top, so it folds
+            # each new (older) item in on the left
+            self._front = AggregateStack(lambda aggregate, item: combine(item, aggregate),
+                                         identity)
+        else:
+            self._front = AggregateStack(preset, identity)
+        self.combine = self._back.combine
+        self.window = window
+        self._preset = preset
+        self._identity = self._back._identity
+    
+    def enqueue(self, item):
+        """
+        Add an item to the back of the queue.
+        
+        With a window, the oldest item is dropped once the queue holds
+        more than window items.
+        
+        Args:
+            item: The item to be added
+            
+        Time Complexity: O(1) amortized
+        """
+        back = self._back
+        back.push(item)
+        window = self.window
+        if window is not None and len(back) + len(self._front) > window:
+            self.dequeue()
+    
+    def dequeue(self):
+        """
+        Remove and return the item at the front of the queue.
+        
+        Returns:
+            The oldest item in the queue
+            
+        Raises:
+            IndexError: If the queue is empty
+            
+        Time Complexity: O(1) amortized
+        """
+        front = self._front
+        if not front:
+            back = self._back
+            if not back:
+                raise IndexError("dequeue from empty queue")
+            front.push_many(back.pop_many(len(back)))
+        return front.pop()
+    
+    def aggregate(self):
+        """
+        Get the fold of every item in the queue, front to back.
+        
+        Returns:
+            The combined value of the items (the identity for an empty
+            queue)
+            
+        Raises:
+            IndexError: If the queue is empty and has no identity
+            
+        Time Complexity: O(1)
+        """
+        front = self._front
+        back = self._back
+        if not front:
+            if not back and self._identity is NO_IDENTITY:
+                raise IndexError("aggregate of empty queue")
+            return back.aggregate()
+        if not back:
+            return front.aggregate()
+        first = front.aggregate()
+        last = back.aggregate()
+        preset = self._preset
+        if preset == 'min':
+            return last if last < first else first
+        if preset == 'max':
+            return last if last > first else first
+        if preset == 'sum':
+            return first + last
+        return self.combine(first, last)
+    
+    def peek(self):
+        """
+        Return the front item without removing it.
+        
+        Raises:
+            IndexError: If the queue is empty
+        """
+        if self._front:
+            return self._front.peek()
+        for item in reversed(self._back):
+            return item
+        raise IndexError("peek from empty queue")
+    
+    def clear(self):
+        """Remove all items from the queue."""
+        self._front.clear()
+        self._back.clear()
+    
+    def is_empty(self):
+        """
+        Check if the queue is empty.
+        
+        Returns:
+            bool: True if queue is empty, False otherwise
+        """
+        return not self._front and not self._back
+    
+    def size(self):
+        """
+        Get the number of items in the queue.
+        
+        Returns:
+            int: Number of items in the queue
+        """
+        return len(self._front) + len(self._back)
+    
+    def __len__(self):
+        return len(self._front) + len(self._back)
+    
+    def __bool__(self):
+        return bool(self._front) or bool(self._back)
+    
+    def __iter__(self):
+        """Iterate over the items from front to back without copying."""
+        yield from self._front
+        yield from reversed(self._back)
+    
+    def __str__(self):
+        """String representation of the queue (front to back)."""
+        items = format_items(iter(self), len(self), self.repr_limit, True)
+        name = self._preset or getattr(self.combine, '__name__', repr(self.combine))
+        return f"AggregateQueue({name!r}, {items})"
+    
+    def __repr__(self):
+        """Developer representation of the queue."""
+        return self.__str__()
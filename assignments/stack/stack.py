@@ -8,6 +8,60 @@ Author: Data Structure Course
 Date: 2024
 """
 
+import asyncio
+import gc
+import math
+import mmap
+import operator
+import os
+import pickle
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, DecimalException
+from fractions import Fraction
+from itertools import accumulate, chain, islice, repeat
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batch evaluation
+    np = None
+
+
+def format_items(items_from_top, size, limit, top_first):
+    """
+    Format at most limit items of a stack for __repr__.
+    
+    Only the top limit items are read, so formatting a huge stack costs
+    O(limit) rather than O(n).
+    
+    Args:
+        items_from_top: Iterator over the items, top first
+        size (int): Total number of items
+        limit (int): Maximum number of items shown
+        top_first (bool): List the top item first instead of last
+        
+    Returns:
+        str: "[a, b, c]", or "[..., b, c], size=n" when truncated
+    """
+    shown = [repr(item) for item in islice(items_from_top, limit)]
+    if not top_first:
+        shown.reverse()
+    if size <= len(shown):
+        return f"[{', '.join(shown)}]"
+    if top_first:
+        shown.append("...")
+    else:
+        shown.insert(0, "...")
+    return f"[{', '.join(shown)}], size={size}"
+
 
 class ArrayStack:
     """
@@ -16,6 +70,8 @@ class ArrayStack:
     Provides O(1) amortized time complexity for all operations.
     """
     
+    repr_limit = 50  # Maximum number of items shown by __repr__
+    
     def __init__(self):
         """Initialize an empty stack."""
         self._data = []
@@ -43,9 +99,79 @@ class ArrayStack:
             
         Time Complexity: O(1)
         """
-        if self.is_empty():
+        try:
+            return self._data.pop()
+        except IndexError:
+            raise IndexError("pop from empty stack") from None
+    
+    def push_many(self, items):
+        """
+        Push every item of an iterable, first item ending up lowest.
+        
+        Args:
+            items: Iterable of items to push
+            
+        Time Complexity: O(k) amortized for k items
+        """
+        self._data.extend(items)
+    
+    def pop_many(self, n):
+        """
+        Remove and return the top n items.
+        
+        Args:
+            n (int): Number of items to pop
+            
+        Returns:
+            list: The items in pop order (top first)
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items; the stack
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        data = self._data
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(data):
             raise IndexError("pop from empty stack")
-        return self._data.pop()
+        if n == 0:
+            return []
+        items = data[-n:]
+        items.reverse()
+        del data[-n:]
+        return items
+    
+    def peek_many(self, n):
+        """
+        Return the top n items without removing them.
+        
+        Args:
+            n (int): Number of items to return
+            
+        Returns:
+            list: The items top first
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items
+            
+        Time Complexity: O(n)
+        """
+        data = self._data
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(data):
+            raise IndexError("peek from empty stack")
+        return data[-1:-n - 1:-1]
+    
+    def clear(self):
+        """
+        Remove all items from the stack.
+        
+        Time Complexity: O(n)
+        """
+        del self._data[:]
     
     def peek(self):
         """
@@ -59,9 +185,10 @@ class ArrayStack:
             
         Time Complexity: O(1)
         """
-        if self.is_empty():
-            raise IndexError("peek from empty stack")
-        return self._data[-1]
+        try:
+            return self._data[-1]
+        except IndexError:
+            raise IndexError("peek from empty stack") from None
     
     def is_empty(self):
         """
@@ -85,20 +212,40 @@ class ArrayStack:
         """
         return len(self._data)
     
+    def __len__(self):
+        return len(self._data)
+    
+    def __bool__(self):
+        return len(self._data) > 0
+    
+    def __iter__(self):
+        """Iterate over the items from top to bottom without copying."""
+        return reversed(self._data)
+    
+    def __reversed__(self):
+        """Iterate over the items from bottom to top without copying."""
+        return iter(self._data)
+    
     def __str__(self):
-        """String representation of the stack."""
-        return f"ArrayStack({self._data})"
+        """String representation of the stack (bottom to top)."""
+        items = format_items(iter(self), len(self._data), self.repr_limit, False)
+        return f"ArrayStack({items})"
     
     def __repr__(self):
         """Developer representation of the stack."""
-        return f"ArrayStack({self._data})"
+        return self.__str__()
 
 
 class Node:
     """
     Node class for linked list implementation.
+    
+    Uses __slots__ so a node holds just its two references, with no
+    per-instance __dict__.
     """
     
+    __slots__ = ('data', 'next')
+    
     def __init__(self, data, next_node=None):
         """
         Initialize a node.
@@ -116,12 +263,35 @@ class LinkedListStack:
     Linked list-based stack implementation.
     
     Provides guaranteed O(1) time complexity for all operations.
+    
+    With pool_size > 0, popped nodes are kept on a free list (up to
+    pool_size of them) and reused by later pushes, which cuts allocator
+    and garbage collector traffic under push/pop churn.
     """
     
-    def __init__(self):
-        """Initialize an empty stack."""
+    repr_limit = 50  # Maximum number of items shown by __repr__
+    
+    def __init__(self, pool_size=0):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            pool_size (int): Maximum number of popped nodes kept for
+                reuse; 0 disables pooling (default: 0)
+        """
         self._head = None
         self._size = 0
+        self.pool_size = pool_size
+        self._free = None
+        self._free_count = 0
+    
+    def _recycle(self, node):
+        """Put a popped node on the free list if the pool has room."""
+        if self._free_count < self.pool_size:
+            node.data = None
+            node.next = self._free
+            self._free = node
+            self._free_count += 1
     
     def push(self, item):
         """
@@ -132,7 +302,14 @@ class LinkedListStack:
             
         Time Complexity: O(1)
         """
-        new_node = Node(item, self._head)
+        new_node = self._free
+        if new_node is None:
+            new_node = Node(item, self._head)
+        else:
+            self._free = new_node.next
+            self._free_count -= 1
+            new_node.data = item
+            new_node.next = self._head
         self._head = new_node
         self._size += 1
     
@@ -151,11 +328,116 @@ class LinkedListStack:
         if self.is_empty():
             raise IndexError("pop from empty stack")
         
-        data = self._head.data
-        self._head = self._head.next
+        node = self._head
+        data = node.data
+        self._head = node.next
         self._size -= 1
+        if self.pool_size:
+            self._recycle(node)
         return data
     
+    def push_many(self, items):
+        """
+        Push every item of an iterable, first item ending up lowest.
+        
+        The new nodes are linked into a chain first and spliced onto the
+        stack in one step, so a failing iterable leaves the stack unchanged.
+        
+        Args:
+            items: Iterable of items to push
+            
+        Time Complexity: O(k) for k items
+        """
+        head = self._head
+        count = 0
+        if self._free is None:
+            for item in items:
+                head = Node(item, head)
+                count += 1
+        else:
+            for item in items:
+                node = self._free
+                if node is None:
+                    node = Node(item, head)
+                else:
+                    self._free = node.next
+                    self._free_count -= 1
+                    node.data = item
+                    node.next = head
+                head = node
+                count += 1
+        self._head = head
+        self._size += count
+    
+    def pop_many(self, n):
+        """
+        Remove and return the top n items.
+        
+        Args:
+            n (int): Number of items to pop
+            
+        Returns:
+            list: The items in pop order (top first)
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items; the stack
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > self._size:
+            raise IndexError("pop from empty stack")
+        items = []
+        append = items.append
+        current = self._head
+        for _ in range(n):
+            append(current.data)
+            node = current
+            current = current.next
+            if self.pool_size:
+                self._recycle(node)
+        self._head = current
+        self._size -= n
+        return items
+    
+    def peek_many(self, n):
+        """
+        Return the top n items without removing them.
+        
+        Args:
+            n (int): Number of items to return
+            
+        Returns:
+            list: The items top first
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items
+            
+        Time Complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > self._size:
+            raise IndexError("peek from empty stack")
+        items = []
+        append = items.append
+        current = self._head
+        for _ in range(n):
+            append(current.data)
+            current = current.next
+        return items
+    
+    def clear(self):
+        """
+        Remove all items from the stack.
+        
+        Time Complexity: O(1)
+        """
+        self._head = None
+        self._size = 0
+    
     def peek(self):
         """
         Return the top item without removing it.
@@ -194,13 +476,33 @@ class LinkedListStack:
         """
         return self._size
     
-    def __str__(self):
-        """String representation of the stack."""
-        items = []
+    def __len__(self):
+        return self._size
+    
+    def __bool__(self):
+        return self._head is not None
+    
+    def __iter__(self):
+        """Iterate over the items from top to bottom without copying."""
         current = self._head
-        while current:
-            items.append(current.data)
+        while current is not None:
+            yield current.data
             current = current.next
+    
+    def __reversed__(self):
+        """
+        Iterate over the items from bottom to top.
+        
+        A singly linked list can only be walked from the top, so this
+        collects the items first and needs O(n) extra memory.
+        """
+        items = list(self)
+        items.reverse()
+        return iter(items)
+    
+    def __str__(self):
+        """String representation of the stack (top to bottom)."""
+        items = format_items(iter(self), self._size, self.repr_limit, True)
         return f"LinkedListStack({items})"
     
     def __repr__(self):
@@ -208,136 +510,3479 @@ class LinkedListStack:
         return self.__str__()
 
 
-# Utility functions for stack operations
-def is_balanced_parentheses(expression):
+class PersistentStack:
     """
-    Check if parentheses in an expression are balanced.
+    Immutable stack whose versions share structure.
     
-    Args:
-        expression (str): The expression to check
+    push() and pop() return new stacks that reuse the existing Nodes as
+    their tail, so every version stays valid, snapshot() is O(1), and
+    iterating never has to pop anything. The Nodes are never handed to a
+    LinkedListStack, so its node pool cannot recycle a shared cell.
+    """
+    
+    __slots__ = ('_head', '_size')
+    
+    def __init__(self, items=()):
+        """
+        Initialize a stack.
         
-    Returns:
-        bool: True if balanced, False otherwise
+        Args:
+            items: Optional iterable of initial items, bottom to top
+        """
+        head = None
+        size = 0
+        for item in items:
+            head = Node(item, head)
+            size += 1
+        object.__setattr__(self, '_head', head)
+        object.__setattr__(self, '_size', size)
+    
+    @classmethod
+    def _from_head(cls, head, size):
+        """Wrap an existing chain of Nodes without copying it."""
+        stack = object.__new__(cls)
+        object.__setattr__(stack, '_head', head)
+        object.__setattr__(stack, '_size', size)
+        return stack
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("PersistentStack is immutable")
+    
+    def push(self, item):
+        """
+        Return a new stack with item on top of this one.
         
-    Examples:
-        >>> is_balanced_parentheses("(())")
-        True
-        >>> is_balanced_parentheses("([)]")
-        False
-    """
-    stack = ArrayStack()
-    opening = "([{"
-    closing = ")]}"
-    pairs = {')': '(', ']': '[', '}': '{'}
+        Args:
+            item: The item to be added
+            
+        Returns:
+            PersistentStack: The new version
+            
+        Time Complexity: O(1)
+        """
+        return PersistentStack._from_head(Node(item, self._head), self._size + 1)
     
-    for char in expression:
-        if char in opening:
-            stack.push(char)
-        elif char in closing:
-            if stack.is_empty():
-                return False
-            if stack.pop() != pairs[char]:
-                return False
+    def pop(self):
+        """
+        Return the top item and the stack below it.
+        
+        Returns:
+            tuple: (top item, PersistentStack without it)
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        head = self._head
+        if head is None:
+            raise IndexError("pop from empty stack")
+        return head.data, PersistentStack._from_head(head.next, self._size - 1)
     
-    return stack.is_empty()
-
-
-def evaluate_postfix(expression):
-    """
-    Evaluate a postfix expression.
+    def peek(self):
+        """
+        Return the top item.
+        
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        if self._head is None:
+            raise IndexError("peek from empty stack")
+        return self._head.data
     
-    Args:
-        expression (str): Space-separated postfix expression
+    def snapshot(self):
+        """
+        Return a version that later pushes and pops cannot affect.
         
-    Returns:
-        float: Result of the evaluation
+        Versions are immutable, so this is the stack itself.
         
-    Examples:
-        >>> evaluate_postfix("3 4 + 2 *")
-        14.0
-        >>> evaluate_postfix("15 7 1 1 + − / 3 × 2 1 1 + + −")
-        5.0
-    """
-    stack = ArrayStack()
-    tokens = expression.split()
+        Time Complexity: O(1)
+        """
+        return self
     
-    for token in tokens:
-        if token in ['+', '-', '*', '/']:
-            if stack.size() < 2:
-                raise ValueError("Invalid postfix expression")
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
             
-            operand2 = stack.pop()
-            operand1 = stack.pop()
-            
-            if token == '+':
-                result = operand1 + operand2
-            elif token == '-':
-                result = operand1 - operand2
-            elif token == '*':
-                result = operand1 * operand2
-            elif token == '/':
-                if operand2 == 0:
-                    raise ValueError("Division by zero")
-                result = operand1 / operand2
-            
-            stack.push(result)
-        else:
-            try:
-                number = float(token)
-                stack.push(number)
-            except ValueError:
-                raise ValueError(f"Invalid token: {token}")
+        Time Complexity: O(1)
+        """
+        return self._head is None
     
-    if stack.size() != 1:
-        raise ValueError("Invalid postfix expression")
+    def size(self):
+        """
+        Get the number of items in the stack.
+        
+        Returns:
+            int: Number of items in the stack
+            
+        Time Complexity: O(1)
+        """
+        return self._size
+    
+    def __len__(self):
+        return self._size
+    
+    def __iter__(self):
+        """Iterate over the items from top to bottom."""
+        current = self._head
+        while current is not None:
+            yield current.data
+            current = current.next
     
-    return stack.pop()
+    def __str__(self):
+        """String representation of the stack."""
+        items = format_items(iter(self), self._size, ArrayStack.repr_limit, True)
+        return f"PersistentStack({items})"
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return self.__str__()
 
 
-def infix_to_postfix(expression):
+class TypedArrayStack:
     """
-    Convert infix expression to postfix notation.
+    Stack of machine numbers stored contiguously in an array.array.
     
-    Args:
-        expression (str): Infix expression with spaces between tokens
+    Each element takes only its C size (e.g. 8 bytes for 'd' or 'q')
+    instead of a pointer plus a boxed Python object, and the live region
+    can be exported as a memoryview without copying.
+    """
+    
+    def __init__(self, typecode='d', items=()):
+        """
+        Initialize a stack of the given element type.
         
-    Returns:
-        str: Postfix expression
+        Args:
+            typecode (str): array module type code (default: 'd', float)
+            items: Optional iterable of initial items, bottom to top
+        """
+        self._data = array(typecode, items)
+    
+    @property
+    def typecode(self):
+        """str: The array module type code of the elements."""
+        return self._data.typecode
+    
+    def push(self, item):
+        """
+        Add an item to the top of the stack.
         
-    Examples:
-        >>> infix_to_postfix("3 + 4 * 2")
-        "3 4 2 * +"
-        >>> infix_to_postfix("( 3 + 4 ) * 2")
-        "3 4 + 2 *"
+        Args:
+            item: A number representable by the stack's typecode
+            
+        Raises:
+            BufferError: If a memoryview of the stack is still alive
+            
+        Time Complexity: O(1) amortized
+        """
+        self._data.append(item)
+    
+    def push_many(self, items):
+        """
+        Push every item of an iterable, first item ending up lowest.
+        
+        Args:
+            items: Iterable (or array of the same typecode) of numbers
+            
+        Time Complexity: O(k) for k items
+        """
+        if isinstance(items, array) and items.typecode == self._data.typecode:
+            self._data += items
+        else:
+            self._data.extend(items)
+    
+    def pop(self):
+        """
+        Remove and return the top item from the stack.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        if not self._data:
+            raise IndexError("pop from empty stack")
+        return self._data.pop()
+    
+    def pop_many(self, n):
+        """
+        Remove and return the top n items.
+        
+        Args:
+            n (int): Number of items to pop
+            
+        Returns:
+            list: The items in pop order (top first)
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items; the stack
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        data = self._data
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(data):
+            raise IndexError("pop from empty stack")
+        if n == 0:
+            return []
+        items = data[-n:].tolist()
+        items.reverse()
+        del data[-n:]
+        return items
+    
+    def peek_many(self, n):
+        """
+        Return the top n items without removing them.
+        
+        Args:
+            n (int): Number of items to return
+            
+        Returns:
+            list: The items top first
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items
+            
+        Time Complexity: O(n)
+        """
+        data = self._data
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(data):
+            raise IndexError("peek from empty stack")
+        return data[-1:-n - 1:-1].tolist()
+    
+    def clear(self):
+        """
+        Remove all items from the stack.
+        
+        Raises:
+            BufferError: If a memoryview of the stack is still alive
+            
+        Time Complexity: O(1)
+        """
+        del self._data[:]
+    
+    def peek(self):
+        """
+        Return the top item without removing it.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        if not self._data:
+            raise IndexError("peek from empty stack")
+        return self._data[-1]
+    
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
+            
+        Time Complexity: O(1)
+        """
+        return len(self._data) == 0
+    
+    def size(self):
+        """
+        Get the number of items in the stack.
+        
+        Returns:
+            int: Number of items in the stack
+            
+        Time Complexity: O(1)
+        """
+        return len(self._data)
+    
+    def view(self):
+        """
+        Export the stack contents, bottom to top, without copying.
+        
+        The stack cannot grow or shrink while the view is alive; release
+        it (or use it in a with block) before pushing or popping again.
+        
+        Returns:
+            memoryview: Read-only view of the live elements
+            
+        Time Complexity: O(1)
+        """
+        return memoryview(self._data).toreadonly()
+    
+    def nbytes(self):
+        """
+        Get the memory used by the stored elements.
+        
+        Returns:
+            int: Size in bytes of the live region
+        """
+        return len(self._data) * self._data.itemsize
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __iter__(self):
+        """Iterate over the items from top to bottom without copying."""
+        return reversed(self._data)
+    
+    def __reversed__(self):
+        """Iterate over the items from bottom to top without copying."""
+        return iter(self._data)
+    
+    def __str__(self):
+        """String representation of the stack (bottom to top)."""
+        items = format_items(iter(self), len(self._data), ArrayStack.repr_limit, False)
+        return f"TypedArrayStack({self._data.typecode!r}, {items})"
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return self.__str__()
+
+
+def estimate_size(item):
+    """
+    Estimate the memory held by an item, including nested containers.
+    
+    Args:
+        item: Any object
+        
+    Returns:
+        int: Approximate size in bytes (shared objects are counted each
+        time they are referenced)
+    """
+    size = sys.getsizeof(item)
+    if isinstance(item, (tuple, list, set, frozenset)):
+        size += sum(estimate_size(element) for element in item)
+    elif isinstance(item, dict):
+        size += sum(estimate_size(key) + estimate_size(value)
+                    for key, value in item.items())
+    return size
+
+
+class BoundedStack:
+    """
+    Stack with a capped history that evicts its oldest (bottom) items.
+    
+    Items are kept in a deque, so evicting from the bottom is O(1). Limits
+    can be a maximum item count, a byte budget measured with a sizeof
+    estimate, or both. The newest item is always kept, even if it alone
+    exceeds the byte budget.
+    """
+    
+    def __init__(self, max_items=None, max_bytes=None, sizeof=estimate_size):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            max_items (int): Maximum number of items kept (default: no limit)
+            max_bytes (int): Byte budget for the items (default: no limit)
+            sizeof: Function estimating an item's size in bytes
+                (default: estimate_size)
+        """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = deque()
+        self._sizes = deque()
+        self.retained_bytes = 0
+        self.evicted_items = 0
+        self.evicted_bytes = 0
+    
+    def _evict(self):
+        """Drop bottom items until the limits are met."""
+        data = self._data
+        while len(data) > 1 and (
+                (self.max_items is not None and len(data) > self.max_items) or
+                (self.max_bytes is not None and self.retained_bytes > self.max_bytes)):
+            data.popleft()
+            size = self._sizes.popleft()
+            self.retained_bytes -= size
+            self.evicted_items += 1
+            self.evicted_bytes += size
+    
+    def push(self, item):
+        """
+        Add an item to the top, evicting the oldest items if over a limit.
+        
+        Args:
+            item: The item to be added to the stack
+            
+        Time Complexity: O(1) amortized
+        """
+        size = self._sizeof(item)
+        self._data.append(item)
+        self._sizes.append(size)
+        self.retained_bytes += size
+        self._evict()
+    
+    def push_many(self, items):
+        """
+        Push every item of an iterable, first item ending up lowest.
+        
+        Args:
+            items: Iterable of items to push
+            
+        Time Complexity: O(k) amortized for k items
+        """
+        for item in items:
+            self.push(item)
+    
+    def pop(self):
+        """
+        Remove and return the top item from the stack.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        if not self._data:
+            raise IndexError("pop from empty stack")
+        self.retained_bytes -= self._sizes.pop()
+        return self._data.pop()
+    
+    def pop_many(self, n):
+        """
+        Remove and return the top n items.
+        
+        Args:
+            n (int): Number of items to pop
+            
+        Returns:
+            list: The items in pop order (top first)
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items; the stack
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(self._data):
+            raise IndexError("pop from empty stack")
+        return [self.pop() for _ in range(n)]
+    
+    def peek(self):
+        """
+        Return the top item without removing it.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        if not self._data:
+            raise IndexError("peek from empty stack")
+        return self._data[-1]
+    
+    def peek_many(self, n):
+        """
+        Return the top n items without removing them.
+        
+        Args:
+            n (int): Number of items to return
+            
+        Returns:
+            list: The items top first
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items
+            
+        Time Complexity: O(n)
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n > len(self._data):
+            raise IndexError("peek from empty stack")
+        data = self._data
+        return [data[-i] for i in range(1, n + 1)]
+    
+    def clear(self):
+        """
+        Remove all items from the stack (not counted as evictions).
+        
+        Time Complexity: O(n)
+        """
+        self._data.clear()
+        self._sizes.clear()
+        self.retained_bytes = 0
+    
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
+            
+        Time Complexity: O(1)
+        """
+        return len(self._data) == 0
+    
+    def size(self):
+        """
+        Get the number of items in the stack.
+        
+        Returns:
+            int: Number of items in the stack
+            
+        Time Complexity: O(1)
+        """
+        return len(self._data)
+    
+    def stats(self):
+        """
+        Get the eviction metrics.
+        
+        Returns:
+            dict: items and bytes retained, items and bytes evicted
+        """
+        return {
+            'retained_items': len(self._data),
+            'retained_bytes': self.retained_bytes,
+            'evicted_items': self.evicted_items,
+            'evicted_bytes': self.evicted_bytes,
+        }
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __iter__(self):
+        """Iterate over the items from top to bottom without copying."""
+        return reversed(self._data)
+    
+    def __reversed__(self):
+        """Iterate over the items from bottom to top without copying."""
+        return iter(self._data)
+    
+    def __str__(self):
+        """String representation of the stack (bottom to top)."""
+        items = format_items(iter(self), len(self._data), ArrayStack.repr_limit, False)
+        return f"BoundedStack({items})"
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return self.__str__()
+
+
+class _Extreme:
+    """Sentinel that compares above (or below) every other value."""
+    
+    __slots__ = ('above',)
+    
+    def __init__(self, above):
+        self.above = above
+    
+    def __lt__(self, other):
+        return not self.above
+    
+    def __le__(self, other):
+        return not self.above
+    
+    def __gt__(self, other):
+        return self.above
+    
+    def __ge__(self, other):
+        return self.above
+    
+    def __repr__(self):
+        return "_ABOVE_ALL" if self.above else "_BELOW_ALL"
+
+
+_ABOVE_ALL = _Extreme(True)
+_BELOW_ALL = _Extreme(False)
+NO_IDENTITY = object()  # Default identity: fold only the items themselves
+
+# name: (combine, bottom aggregate when no identity is given)
+_AGGREGATE_PRESETS = {
+    'min': (min, _ABOVE_ALL),
+    'max': (max, _BELOW_ALL),
+    'sum': (operator.add, 0),
+}
+_AGGREGATE_PRESET_NAMES = {min: 'min', max: 'max', operator.add: 'sum'}
+
+
+class AggregateStack(ArrayStack):
+    """
+    Stack that keeps a running fold of its contents for O(1) queries.
+    
+    Next to each item it stores the aggregate of everything up to that
+    level, so the fold of the whole stack is always the top aggregate and
+    pop() just drops a level. Any associative combine function works;
+    the presets "min", "max" and "sum" (or the functions min, max and
+    operator.add) are computed inline without calling a function.
+    """
+    
+    def __init__(self, combine, identity=NO_IDENTITY):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            combine: Associative function of (aggregate, item), or the
+                preset name "min", "max" or "sum"
+            identity: Aggregate of an empty stack (default: 0 for "sum",
+                none otherwise, so aggregate() of an empty stack raises)
+        """
+        super().__init__()
+        preset = combine if isinstance(combine, str) else _AGGREGATE_PRESET_NAMES.get(combine)
+        if isinstance(combine, str) and combine not in _AGGREGATE_PRESETS:
+            raise ValueError(f"Unknown aggregate preset: {combine}")
+        bottom = NO_IDENTITY
+        if preset is not None:
+            combine, bottom = _AGGREGATE_PRESETS[preset]
+            if preset == 'sum' and identity is NO_IDENTITY:
+                identity = 0
+        if identity is not NO_IDENTITY:
+            bottom = identity
+        self.combine = combine
+        self._preset = preset
+        self._identity = identity
+        self._aggregates = [bottom]  # _aggregates[i + 1] folds _data[:i + 1]
+    
+    def push(self, item):
+        """
+        Add an item to the top of the stack.
+        
+        Args:
+            item: The item to be added to the stack
+            
+        Time Complexity: O(1) amortized, plus one combine call
+        """
+        self._data.append(item)
+        aggregates = self._aggregates
+        top = aggregates[-1]
+        preset = self._preset
+        if preset == 'min':
+            aggregates.append(item if item < top else top)
+        elif preset == 'max':
+            aggregates.append(item if item > top else top)
+        elif preset == 'sum':
+            aggregates.append(top + item)
+        elif top is NO_IDENTITY:
+            aggregates.append(item)
+        else:
+            aggregates.append(self.combine(top, item))
+    
+    def push_many(self, items):
+        """
+        Push every item of an iterable, first item ending up lowest.
+        
+        Args:
+            items: Iterable of items to push
+            
+        Time Complexity: O(k) amortized for k items
+        """
+        items = list(items)
+        if not items:
+            return
+        aggregates = self._aggregates
+        top = aggregates[-1]
+        preset = self._preset
+        if preset == 'min':
+            append = aggregates.append
+            for item in items:
+                if item < top:
+                    top = item
+                append(top)
+        elif preset == 'max':
+            append = aggregates.append
+            for item in items:
+                if item > top:
+                    top = item
+                append(top)
+        elif top is NO_IDENTITY:
+            aggregates.extend(accumulate(items, self.combine))
+        else:
+            aggregates.extend(islice(accumulate(items, self.combine, initial=top), 1, None))
+        self._data.extend(items)
+    
+    def pop(self):
+        """
+        Remove and return the top item from the stack.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1)
+        """
+        try:
+            item = self._data.pop()
+        except IndexError:
+            raise IndexError("pop from empty stack") from None
+        self._aggregates.pop()
+        return item
+    
+    def pop_many(self, n):
+        """
+        Remove and return the top n items.
+        
+        Args:
+            n (int): Number of items to pop
+            
+        Returns:
+            list: The items in pop order (top first)
+            
+        Raises:
+            IndexError: If the stack holds fewer than n items; the stack
+                is left unchanged
+            
+        Time Complexity: O(n)
+        """
+        items = super().pop_many(n)
+        del self._aggregates[len(self._data) + 1:]
+        return items
+    
+    def clear(self):
+        """
+        Remove all items from the stack.
+        
+        Time Complexity: O(n)
+        """
+        super().clear()
+        del self._aggregates[1:]
+    
+    def aggregate(self):
+        """
+        Get the fold of every item currently on the stack.
+        
+        Returns:
+            The combined value of the items, bottom to top (the identity
+            for an empty stack)
+            
+        Raises:
+            IndexError: If the stack is empty and has no identity
+            
+        Time Complexity: O(1)
+        """
+        if not self._data and self._identity is NO_IDENTITY and self._preset != 'sum':
+            raise IndexError("aggregate of empty stack")
+        return self._aggregates[-1]
+    
+    def __str__(self):
+        """String representation of the stack (bottom to top)."""
+        items = format_items(iter(self), len(self._data), self.repr_limit, False)
+        name = self._preset or getattr(self.combine, '__name__', repr(self.combine))
+        return f"AggregateStack({name!r}, {items})"
+
+
+class DiskBackedStack:
+    """
+    Stack that spills its older items to a temporary file.
+    
+    At most memory_items items are kept in memory, as two segments: the
+    top segment that push and pop work on, and the one below it. When the
+    top segment fills up, the lower one is written to the end of the file;
+    when the top segment runs empty, the lower one takes its place, read
+    back first through a memory map if it is on disk (the file is then
+    truncated). A segment only moves to or from disk after about
+    memory_items / 2 operations, however pushes and pops interleave.
+    
+    Segments are ArrayStacks written with pickle, or, with a typecode,
+    TypedArrayStacks written as raw array bytes.
+    """
+    
+    def __init__(self, memory_items=1000000, typecode=None, directory=None):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            memory_items (int): Memory budget as a number of items, at
+                least 2 (default: 1,000,000)
+            typecode (str): array module type code to store machine
+                numbers compactly (default: None, any picklable object)
+            directory (str): Where to create the spill file (default: the
+                system temporary directory)
+        """
+        if memory_items < 2:
+            raise ValueError("memory_items must be at least 2")
+        self._segment_items = memory_items // 2
+        self._typecode = typecode
+        self._directory = directory
+        self._hot = self._new_segment()
+        self._warm = None
+        self._file = None
+        self._segments = []  # (offset, nbytes, count) of each spilled segment
+        self._disk_end = 0
+        self.spilled_items = 0
+        self.spills = 0
+        self.loads = 0
+    
+    def _new_segment(self):
+        if self._typecode is None:
+            return ArrayStack()
+        return TypedArrayStack(self._typecode)
+    
+    def push(self, item):
+        """
+        Add an item to the top of the stack.
+        
+        Args:
+            item: The item to be added (a number fitting the typecode, if
+                one was given)
+            
+        Time Complexity: O(1) amortized
+        """
+        hot = self._hot
+        hot.push(item)
+        if hot.size() >= self._segment_items:
+            if self._warm is not None:
+                self._spill(self._warm)
+            self._warm = hot
+            self._hot = self._new_segment()
+    
+    def pop(self):
+        """
+        Remove and return the top item from the stack.
+        
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is empty
+            
+        Time Complexity: O(1) amortized
+        """
+        hot = self._hot
+        if hot.is_empty():
+            hot = self._warm
+            if hot is None:
+                hot = self._load("pop from empty stack")
+            self._hot, self._warm = hot, None
+        return hot.pop()
+    
+    def peek(self):
+        """
+        Return the top item without removing it.
+    
+        Returns:
+            The top item from the stack
+    
+        Raises:
+            IndexError: If the stack is empty
+    
+        Time Complexity: O(1) amortized
+        """
+        hot = self._hot
+        if not hot.is_empty():
+            return hot.peek()
+        # Read the lower segment in place: swapping it up would undo the
+        # last rotation and let the top segment outgrow the budget
+        if self._warm is None:
+            self._warm = self._load("peek from empty stack")
+        return self._warm.peek()
+    
+    def _spill(self, segment):
+        """Append a segment to the spill file."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="stack-", dir=self._directory,
+                                                buffering=0)
+        if self._typecode is None:
+            items = segment.peek_many(segment.size())
+            items.reverse()
+            data = pickle.dumps(items, protocol=5)
+        else:
+            data = segment.view()
+        with data if isinstance(data, memoryview) else memoryview(data) as view:
+            self._file.seek(self._disk_end)
+            written = 0
+            while written < view.nbytes:
+                written += self._file.write(view[written:])
+        self._segments.append((self._disk_end, written, segment.size()))
+        self._disk_end += written
+        self.spilled_items += segment.size()
+        self.spills += 1
+    
+    def _read_segment(self, offset, nbytes):
+        """Read a spilled segment's items, bottom to top, through a memory map."""
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(self._file.fileno(), nbytes + offset - start,
+                       access=mmap.ACCESS_READ, offset=start) as mapped:
+            with memoryview(mapped) as view:
+                data = view[offset - start:]
+                if self._typecode is None:
+                    items = pickle.loads(data)
+                else:
+                    items = array(self._typecode)
+                    items.frombytes(data)
+                data.release()
+        return items
+    
+    def _load(self, message):
+        """Read the last spilled segment back and truncate the file."""
+        if not self._segments:
+            raise IndexError(message)
+        offset, nbytes, count = self._segments.pop()
+        segment = self._new_segment()
+        segment.push_many(self._read_segment(offset, nbytes))
+        self._file.truncate(offset)
+        self._disk_end = offset
+        self.spilled_items -= count
+        self.loads += 1
+        return segment
+    
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
+            
+        Time Complexity: O(1)
+        """
+        return self.size() == 0
+    
+    def size(self):
+        """
+        Get the number of items in the stack, in memory and on disk.
+        
+        Returns:
+            int: Number of items in the stack
+            
+        Time Complexity: O(1)
+        """
+        warm = self._warm.size() if self._warm is not None else 0
+        return self._hot.size() + warm + self.spilled_items
+    
+    def memory_items(self):
+        """
+        Get the number of items currently held in memory.
+        
+        Returns:
+            int: Items in the in-memory segments
+        """
+        warm = self._warm.size() if self._warm is not None else 0
+        return self._hot.size() + warm
+    
+    def disk_bytes(self):
+        """
+        Get the size of the spilled data.
+        
+        Returns:
+            int: Bytes used in the spill file
+        """
+        return self._disk_end
+    
+    def clear(self):
+        """
+        Remove all items, in memory and on disk.
+        
+        Time Complexity: O(1)
+        """
+        self._hot = self._new_segment()
+        self._warm = None
+        self._segments = []
+        self._disk_end = 0
+        self.spilled_items = 0
+        if self._file is not None:
+            self._file.truncate(0)
+    
+    def close(self):
+        """Remove all items and delete the spill file."""
+        self.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self):
+        return self.size()
+    
+    def __bool__(self):
+        return self.size() > 0
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return (f"DiskBackedStack(size={self.size()}, memory_items={self.memory_items()}, "
+                f"spilled_segments={len(self._segments)})")
+
+
+class _Offer:
+    """An item offered for elimination; compared by identity."""
+    
+    __slots__ = ('item', 'taken')
+    
+    def __init__(self, item):
+        self.item = item
+        self.taken = False
+
+
+class ConcurrentStack:
+    """
+    Thread-safe stack for sharing work between threads.
+    
+    All operations run under one lock, so check-then-act sequences such as
+    "pop if not empty" are atomic. pop() can block until an item arrives,
+    and a bounded stack applies back-pressure by blocking push().
+    
+    With elimination=True, a push and a pop that find the lock busy try to
+    meet in a small elimination array and hand the item over directly,
+    which is a valid LIFO ordering and takes them off the contended lock.
+    """
+    
+    def __init__(self, maxsize=0, elimination=False, slots=4, spins=32):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            maxsize (int): Capacity, or 0 for unbounded (default: 0)
+            elimination (bool): Enable elimination backoff (default: False)
+            slots (int): Size of the elimination array (default: 4)
+            spins (int): Times a waiting push re-checks its offer before
+                falling back to the lock (default: 32)
+        """
+        self.maxsize = maxsize
+        self._data = []
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._slots = [deque() for _ in range(slots)] if elimination else None
+        self._spins = spins
+        self._eliminated_lock = threading.Lock()  # Kept off the main lock
+        self.eliminated = 0
+    
+    def _offer(self, item):
+        """Offer an item for elimination; return True if a pop took it."""
+        slot = random.choice(self._slots)
+        offer = _Offer(item)
+        slot.append(offer)
+        for _ in range(self._spins):
+            time.sleep(0)
+            if offer.taken:
+                return True
+        try:
+            slot.remove(offer)
+        except ValueError:
+            return True  # Taken between the last check and the removal
+        return False
+    
+    def _take(self):
+        """Take an offered item; return it wrapped in an _Offer or None."""
+        for slot in self._slots:
+            try:
+                offer = slot.popleft()
+            except IndexError:
+                continue
+            offer.taken = True
+            return offer
+        return None
+    
+    def _acquire(self, block, timeout):
+        """
+        Acquire the lock within the caller's time budget.
+        
+        Like queue.Queue, non-blocking calls still wait for the lock; they
+        only refuse to wait for an item or for space.
+        
+        Returns:
+            tuple: (acquired, seconds left of timeout or None)
+        """
+        if not block or timeout is None:
+            return self._lock.acquire(), None
+        deadline = time.monotonic() + timeout
+        acquired = self._lock.acquire(timeout=max(timeout, 0))
+        return acquired, deadline - time.monotonic()
+    
+    def push(self, item, block=True, timeout=None):
+        """
+        Add an item to the top of the stack.
+        
+        Args:
+            item: The item to be added to the stack
+            block (bool): Wait for space when the stack is full
+            timeout (float): Maximum seconds to wait, including for the
+                lock (default: forever)
+            
+        Raises:
+            IndexError: If the stack is still full (or, with a timeout,
+                the lock busy) when giving up
+            
+        Time Complexity: O(1) amortized, excluding waiting
+        """
+        if self._slots is None:
+            acquired, timeout = self._acquire(block, timeout)
+        elif self._lock.acquire(blocking=False):
+            acquired = True
+        else:
+            if self._offer(item):
+                with self._eliminated_lock:
+                    self.eliminated += 1
+                return
+            acquired, timeout = self._acquire(block, timeout)
+        if not acquired:
+            raise IndexError("push to full stack")
+        try:
+            if self.maxsize > 0 and len(self._data) >= self.maxsize:
+                if not block:
+                    raise IndexError("push to full stack")
+                if not self._not_full.wait_for(
+                        lambda: len(self._data) < self.maxsize, timeout):
+                    raise IndexError("push to full stack")
+            self._data.append(item)
+            self._not_empty.notify()
+        finally:
+            self._lock.release()
+    
+    def try_push(self, item):
+        """
+        Push an item only if there is room right now.
+        
+        Returns:
+            bool: True if the item was pushed
+        """
+        try:
+            self.push(item, block=False)
+        except IndexError:
+            return False
+        return True
+    
+    def pop(self, block=True, timeout=None):
+        """
+        Remove and return the top item, waiting for one if needed.
+        
+        Args:
+            block (bool): Wait for an item when the stack is empty
+            timeout (float): Maximum seconds to wait, including for the
+                lock (default: forever)
+            
+        Returns:
+            The top item from the stack
+            
+        Raises:
+            IndexError: If the stack is still empty (or, with a timeout,
+                the lock busy) when giving up
+            
+        Time Complexity: O(1), excluding waiting
+        """
+        if self._slots is None:
+            acquired, timeout = self._acquire(block, timeout)
+        elif self._lock.acquire(blocking=False):
+            acquired = True
+        else:
+            offer = self._take()
+            if offer is not None:
+                return offer.item
+            acquired, timeout = self._acquire(block, timeout)
+        if not acquired:
+            raise IndexError("pop from empty stack")
+        try:
+            if not self._data:
+                if not block:
+                    raise IndexError("pop from empty stack")
+                if not self._not_empty.wait_for(lambda: self._data, timeout):
+                    raise IndexError("pop from empty stack")
+            item = self._data.pop()
+            if self.maxsize > 0:
+                self._not_full.notify()
+            return item
+        finally:
+            self._lock.release()
+    
+    def try_pop(self, default=None):
+        """
+        Pop the top item if there is one, without waiting.
+        
+        Args:
+            default: Value returned when the stack is empty (default: None)
+            
+        Returns:
+            The top item, or default
+        """
+        try:
+            return self.pop(block=False)
+        except IndexError:
+            return default
+    
+    def peek(self):
+        """
+        Return the top item without removing it.
+        
+        Raises:
+            IndexError: If the stack is empty
+        """
+        with self._lock:
+            if not self._data:
+                raise IndexError("peek from empty stack")
+            return self._data[-1]
+    
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
+        """
+        with self._lock:
+            return not self._data
+    
+    def is_full(self):
+        """
+        Check if a bounded stack is at capacity.
+        
+        Returns:
+            bool: True if no more items fit, False otherwise
+        """
+        with self._lock:
+            return 0 < self.maxsize <= len(self._data)
+    
+    def size(self):
+        """
+        Get the number of items in the stack.
+        
+        Returns:
+            int: Number of items in the stack
+        """
+        with self._lock:
+            return len(self._data)
+    
+    def __str__(self):
+        """String representation of the stack."""
+        with self._lock:
+            items = format_items(reversed(self._data), len(self._data),
+                                  ArrayStack.repr_limit, False)
+        return f"ConcurrentStack({items})"
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return self.__str__()
+
+
+class AsyncStack:
+    """
+    asyncio LIFO work stack with awaitable pop and bounded push.
+    
+    Items live in an ArrayStack (or any stack class given as storage).
+    Waiting tasks park on futures instead of polling, and the common
+    no-waiter path never creates a future. join()/task_done() work like
+    asyncio.LifoQueue.
+    """
+    
+    def __init__(self, maxsize=0, storage=ArrayStack):
+        """
+        Initialize an empty stack.
+        
+        Args:
+            maxsize (int): Capacity, or 0 for unbounded (default: 0)
+            storage: Stack class holding the items (default: ArrayStack)
+        """
+        self.maxsize = maxsize
+        self._stack = storage()
+        self._getters = deque()
+        self._putters = deque()
+        self._unfinished_tasks = 0
+        self._finished = None
+    
+    @staticmethod
+    def _wakeup_next(waiters):
+        """Wake the oldest waiter that has not been cancelled."""
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+    
+    @staticmethod
+    async def _wait(waiters, wakeup_others):
+        """
+        Park the current task on a new future in waiters.
+        
+        If the task is cancelled after being woken, the wake-up is passed
+        on to the next waiter so that it is not lost.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            if wakeup_others():
+                AsyncStack._wakeup_next(waiters)
+            raise
+    
+    def is_full(self):
+        """
+        Check if a bounded stack is at capacity.
+        
+        Returns:
+            bool: True if no more items fit, False otherwise
+        """
+        return 0 < self.maxsize <= self._stack.size()
+    
+    def push_nowait(self, item):
+        """
+        Push an item without waiting.
+        
+        Raises:
+            IndexError: If the stack is full
+        """
+        if 0 < self.maxsize <= self._stack.size():
+            raise IndexError("push to full stack")
+        self._stack.push(item)
+        self._unfinished_tasks += 1
+        if self._finished is not None:
+            self._finished.clear()
+        if self._getters:
+            self._wakeup_next(self._getters)
+    
+    async def push(self, item):
+        """
+        Push an item, waiting for room if the stack is full.
+        
+        Args:
+            item: The item to be added to the stack
+        """
+        if self.maxsize > 0:
+            while self.is_full():
+                await self._wait(self._putters, lambda: not self.is_full())
+        # Inlined push_nowait() keeps the uncontended path short
+        self._stack.push(item)
+        self._unfinished_tasks += 1
+        if self._finished is not None:
+            self._finished.clear()
+        if self._getters:
+            self._wakeup_next(self._getters)
+    
+    def pop_nowait(self):
+        """
+        Remove and return the top item without waiting.
+        
+        Raises:
+            IndexError: If the stack is empty
+        """
+        item = self._stack.pop()
+        if self._putters:
+            self._wakeup_next(self._putters)
+        return item
+    
+    async def pop(self):
+        """
+        Remove and return the top item, waiting until one is available.
+        
+        Returns:
+            The top item from the stack
+        """
+        stack = self._stack
+        while stack.is_empty():
+            await self._wait(self._getters, lambda: not stack.is_empty())
+        item = stack.pop()
+        if self._putters:
+            self._wakeup_next(self._putters)
+        return item
+    
+    def task_done(self):
+        """
+        Mark a popped item as processed.
+        
+        Raises:
+            ValueError: If called more times than items were pushed
+        """
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0 and self._finished is not None:
+            self._finished.set()
+    
+    async def join(self):
+        """Wait until every pushed item has been marked with task_done()."""
+        if self._unfinished_tasks > 0:
+            if self._finished is None:
+                self._finished = asyncio.Event()
+            self._finished.clear()
+            await self._finished.wait()
+    
+    def is_empty(self):
+        """
+        Check if the stack is empty.
+        
+        Returns:
+            bool: True if stack is empty, False otherwise
+        """
+        return self._stack.is_empty()
+    
+    def size(self):
+        """
+        Get the number of items in the stack.
+        
+        Returns:
+            int: Number of items in the stack
+        """
+        return self._stack.size()
+    
+    def __repr__(self):
+        """Developer representation of the stack."""
+        return (f"AsyncStack(size={self._stack.size()}, "
+                f"getters={len(self._getters)}, putters={len(self._putters)})")
+
+
+# Snapshots: dump() and load() stream a stack's items bottom to top as
+# frames of either raw array bytes (typed stacks) or pickled batches whose
+# buffers travel out of band (everything else)
+
+_SNAPSHOT_MAGIC = b"STKS"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sBQ")  # magic, version, header length
+_FRAME_HEADER = struct.Struct("<QQI")  # items, payload bytes, buffer count
+
+
+def _batches(items, batch_size):
+    """Yield lists of up to batch_size items from an iterable."""
+    if isinstance(items, list):
+        for start in range(0, len(items), batch_size):
+            yield items[start:start + batch_size]
+        return
+    iterator = iter(items)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+
+def _bottom_up(stack):
+    """Collect the items of a stack that can only be walked from the top."""
+    items = list(stack)
+    items.reverse()
+    return items
+
+
+# Each codec returns (config, typecode, count, chunks) for a stack, or
+# rebuilds a stack from those; typecode is None for pickled chunks
+
+def _array_stack_state(stack, batch_size):
+    return {}, None, len(stack._data), _batches(stack._data, batch_size)
+
+
+def _array_stack_restore(config, typecode, chunks):
+    stack = ArrayStack()
+    for chunk in chunks:
+        stack.push_many(chunk)
+    return stack
+
+
+def _linked_list_stack_state(stack, batch_size):
+    items = _bottom_up(stack)
+    return {'pool_size': stack.pool_size}, None, len(items), _batches(items, batch_size)
+
+
+def _linked_list_stack_restore(config, typecode, chunks):
+    stack = LinkedListStack(**config)
+    for chunk in chunks:
+        stack.push_many(chunk)
+    return stack
+
+
+def _persistent_stack_state(stack, batch_size):
+    items = _bottom_up(stack)
+    return {}, None, len(items), _batches(items, batch_size)
+
+
+def _persistent_stack_restore(config, typecode, chunks):
+    return PersistentStack(chain.from_iterable(chunks))
+
+
+def _typed_array_stack_state(stack, batch_size):
+    return {}, stack.typecode, stack.size(), [stack._data]
+
+
+def _typed_array_stack_restore(config, typecode, chunks):
+    stack = TypedArrayStack(typecode)
+    for chunk in chunks:
+        if stack._data:
+            stack._data.extend(chunk)
+        else:
+            stack._data = chunk  # Adopt the first frame without copying
+    return stack
+
+
+def _bounded_stack_state(stack, batch_size):
+    config = {'max_items': stack.max_items, 'max_bytes': stack.max_bytes,
+              'sizeof': stack._sizeof}
+    return config, None, len(stack._data), _batches(stack._data, batch_size)
+
+
+def _bounded_stack_restore(config, typecode, chunks):
+    stack = BoundedStack(**config)
+    for chunk in chunks:
+        stack.push_many(chunk)
+    return stack
+
+
+def _aggregate_stack_state(stack, batch_size):
+    config = {'combine': stack._preset or stack.combine}
+    if stack._identity is not NO_IDENTITY:
+        config['identity'] = stack._identity
+    return config, None, len(stack._data), _batches(stack._data, batch_size)
+
+
+def _aggregate_stack_restore(config, typecode, chunks):
+    stack = AggregateStack(**config)
+    for chunk in chunks:
+        stack.push_many(chunk)
+    return stack
+
+
+def _disk_backed_stack_state(stack, batch_size):
+    def chunks():
+        for offset, nbytes, count in stack._segments:
+            yield stack._read_segment(offset, nbytes)
+        for segment in (stack._warm, stack._hot):
+            if segment is not None:
+                yield segment._data
+
+    config = {'memory_items': stack._segment_items * 2, 'typecode': stack._typecode,
+              'directory': stack._directory}
+    if stack._typecode is not None:
+        return config, stack._typecode, stack.size(), chunks()
+    batches = chain.from_iterable(_batches(chunk, batch_size) for chunk in chunks())
+    return config, None, stack.size(), batches
+
+
+def _disk_backed_stack_restore(config, typecode, chunks):
+    stack = DiskBackedStack(**config)
+    push = stack.push
+    for chunk in chunks:
+        for item in chunk:
+            push(item)
+    return stack
+
+
+def _concurrent_stack_state(stack, batch_size):
+    with stack._lock:
+        items = list(stack._data)
+    config = {'maxsize': stack.maxsize, 'elimination': stack._slots is not None,
+              'slots': len(stack._slots or ()) or 4, 'spins': stack._spins}
+    return config, None, len(items), _batches(items, batch_size)
+
+
+def _concurrent_stack_restore(config, typecode, chunks):
+    stack = ConcurrentStack(**config)
+    for chunk in chunks:
+        stack._data.extend(chunk)
+    return stack
+
+
+def _async_stack_state(stack, batch_size):
+    storage = _snapshot_class(type(stack._stack))
+    state = _SNAPSHOT_CODECS[storage][0]
+    storage_config, typecode, count, chunks = state(stack._stack, batch_size)
+    config = {'maxsize': stack.maxsize, 'storage': storage,
+              'storage_config': storage_config}
+    return config, typecode, count, chunks
+
+
+def _async_stack_restore(config, typecode, chunks):
+    stack = AsyncStack(config['maxsize'], config['storage'])
+    restore = _SNAPSHOT_CODECS[_snapshot_class(config['storage'])][1]
+    stack._stack = restore(config['storage_config'], typecode, chunks)
+    stack._unfinished_tasks = stack._stack.size()
+    return stack
+
+
+_SNAPSHOT_CODECS = {
+    ArrayStack: (_array_stack_state, _array_stack_restore),
+    LinkedListStack: (_linked_list_stack_state, _linked_list_stack_restore),
+    PersistentStack: (_persistent_stack_state, _persistent_stack_restore),
+    TypedArrayStack: (_typed_array_stack_state, _typed_array_stack_restore),
+    BoundedStack: (_bounded_stack_state, _bounded_stack_restore),
+    AggregateStack: (_aggregate_stack_state, _aggregate_stack_restore),
+    DiskBackedStack: (_disk_backed_stack_state, _disk_backed_stack_restore),
+    ConcurrentStack: (_concurrent_stack_state, _concurrent_stack_restore),
+    AsyncStack: (_async_stack_state, _async_stack_restore),
+}
+_SNAPSHOT_CLASSES = {cls.__name__: cls for cls in _SNAPSHOT_CODECS}
+
+
+def _snapshot_class(stack_class):
+    """Find the stack class, or its nearest base, that has a codec."""
+    for cls in stack_class.__mro__:
+        if cls in _SNAPSHOT_CODECS:
+            return cls
+    raise TypeError(f"Cannot snapshot {stack_class.__name__} objects")
+
+
+def _write_all(fileobj, data):
+    """Write a whole buffer, even to a raw file that writes partially."""
+    with memoryview(data) as view, view.cast('B') as raw:
+        written = 0
+        while written < raw.nbytes:
+            written += fileobj.write(raw[written:])
+
+
+def _read_into(fileobj, view):
+    """Fill a writable byte view from a file."""
+    filled = 0
+    while filled < view.nbytes:
+        count = fileobj.readinto(view[filled:])
+        if not count:
+            raise ValueError("Truncated stack snapshot")
+        filled += count
+
+
+def _read_exact(fileobj, nbytes):
+    """Read exactly nbytes into a new bytearray."""
+    data = bytearray(nbytes)
+    _read_into(fileobj, memoryview(data))
+    return data
+
+
+def dump(stack, fileobj, batch_size=65536):
+    """
+    Write a snapshot of a stack to a binary file.
+    
+    Items are streamed bottom to top without recursion, so chains of any
+    depth work. Typed stacks (TypedArrayStack, or DiskBackedStack with a
+    typecode) are written as raw array bytes; other stacks as pickled
+    batches of batch_size items, with large buffers (bytes-like objects,
+    NumPy arrays) written out of band instead of copied into the pickle.
+    Subclasses are saved as their nearest stack class.
+    
+    Args:
+        stack: A stack from this module
+        fileobj: Binary file object opened for writing
+        batch_size (int): Items per pickled batch (default: 65536)
+        
+    Raises:
+        TypeError: If the object is not a stack from this module, or its
+            settings (e.g. a sizeof or combine function) can't be pickled;
+            nothing is written then
+        
+    Time Complexity: O(n); extra memory O(batch_size), or O(n) references
+        for stacks walked from the top (LinkedListStack, PersistentStack)
+        or copied under a lock (ConcurrentStack)
+    """
+    stack_class = _snapshot_class(type(stack))
+    state = _SNAPSHOT_CODECS[stack_class][0]
+    config, typecode, count, chunks = state(stack, batch_size)
+    # Settings such as a lambda sizeof or combine fail here, before any write
+    try:
+        header = pickle.dumps((stack_class.__name__, config, typecode, count), protocol=5)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise TypeError(f"Cannot snapshot the settings of this {stack_class.__name__}: {e}") from e
+    _write_all(fileobj, _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, len(header)))
+    _write_all(fileobj, header)
+    
+    for chunk in chunks:
+        if typecode is not None:
+            with memoryview(chunk) as view:
+                if len(view):
+                    _write_all(fileobj, _FRAME_HEADER.pack(len(view), view.nbytes, 0))
+                    _write_all(fileobj, view)
+            continue
+        if not chunk:
+            continue
+        buffers = []
+        payload = pickle.dumps(chunk, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        _write_all(fileobj, _FRAME_HEADER.pack(len(chunk), len(payload), len(raws)) +
+                   struct.pack(f"<{len(raws)}Q", *[raw.nbytes for raw in raws]))
+        _write_all(fileobj, payload)
+        for raw, buffer in zip(raws, buffers):
+            _write_all(fileobj, raw)
+            raw.release()
+            buffer.release()
+
+
+def _read_frames(fileobj, typecode, count):
+    """Yield the item chunks of a snapshot until count items are read."""
+    remaining = count
+    while remaining:
+        items, nbytes, buffer_count = _FRAME_HEADER.unpack(
+            _read_exact(fileobj, _FRAME_HEADER.size))
+        if not 0 < items <= remaining:
+            raise ValueError("Corrupt stack snapshot")
+        if typecode is not None:
+            chunk = array(typecode, bytes(array(typecode).itemsize)) * items
+            with memoryview(chunk) as view, view.cast('B') as raw:
+                if raw.nbytes != nbytes or buffer_count:
+                    raise ValueError("Corrupt stack snapshot")
+                _read_into(fileobj, raw)
+        else:
+            lengths = struct.unpack(f"<{buffer_count}Q",
+                                    _read_exact(fileobj, 8 * buffer_count))
+            payload = _read_exact(fileobj, nbytes)
+            buffers = [_read_exact(fileobj, length) for length in lengths]
+            chunk = pickle.loads(payload, buffers=buffers)
+            if len(chunk) != items:
+                raise ValueError("Corrupt stack snapshot")
+        remaining -= items
+        yield chunk
+
+
+def load(fileobj, disable_gc=False):
+    """
+    Read a stack written by dump().
+    
+    Snapshots contain pickled data, so only load files you trust.
+    
+    Args:
+        fileobj: Binary file object opened for reading, positioned at the
+            start of a snapshot
+        disable_gc (bool): Pause the process-wide cyclic garbage collector
+            while loading, which avoids rescanning millions of new objects
+            on large linked stacks (default: False)
+        
+    Returns:
+        A new stack of the dumped class with the same items and settings
+        
+    Raises:
+        ValueError: If the file is not a valid or complete snapshot
+        
+    Time Complexity: O(n)
+    """
+    magic, version, length = _SNAPSHOT_HEADER.unpack(
+        _read_exact(fileobj, _SNAPSHOT_HEADER.size))
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError("Not a stack snapshot")
+    if version != _SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported stack snapshot version: {version}")
+    name, config, typecode, count = pickle.loads(_read_exact(fileobj, length))
+    if name not in _SNAPSHOT_CLASSES:
+        raise ValueError(f"Unknown stack class in snapshot: {name}")
+    restore = _SNAPSHOT_CODECS[_SNAPSHOT_CLASSES[name]][1]
+    if not disable_gc:
+        return restore(config, typecode, _read_frames(fileobj, typecode, count))
+    # Nothing being loaded can be garbage yet, so the collections that
+    # millions of new objects trigger would only rescan them
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return restore(config, typecode, _read_frames(fileobj, typecode, count))
+    finally:
+        if collecting:
+            gc.enable()
+
+
+# Utility functions for stack operations
+def is_balanced_parentheses(expression):
+    """
+    Check if parentheses in an expression are balanced.
+    
+    Args:
+        expression (str): The expression to check
+        
+    Returns:
+        bool: True if balanced, False otherwise
+        
+    Examples:
+        >>> is_balanced_parentheses("(())")
+        True
+        >>> is_balanced_parentheses("([)]")
+        False
+    """
+    stack = ArrayStack()
+    opening = "([{"
+    closing = ")]}"
+    pairs = {')': '(', ']': '[', '}': '{'}
+    
+    for char in expression:
+        if char in opening:
+            stack.push(char)
+        elif char in closing:
+            if stack.is_empty():
+                return False
+            if stack.pop() != pairs[char]:
+                return False
+    
+    return stack.is_empty()
+
+
+_BRACKET_PAIRS = {ord(')'): ord('('), ord(']'): ord('['), ord('}'): ord('{')}
+_BRACKET_BYTES = b"()[]{}"
+_NON_BRACKET_BYTES = bytes(b for b in range(256) if b not in _BRACKET_BYTES)
+_NON_BRACKET_STR = re.compile(r"[^()\[\]{}]+")
+_BRACKET_PATTERN = re.compile(r"[()\[\]{}]")
+_BRACKET_PATTERN_BYTES = re.compile(rb"[()\[\]{}]")
+_BRACKET_WINDOW = 1 << 16  # Bytes copied at a time from buffers without translate()
+
+
+class BracketValidator:
+    """
+    Incremental bracket checker for inputs that arrive in chunks.
+    
+    State is kept between calls to feed(), and the open brackets are stored
+    as one byte each in a bytearray, so memory grows with nesting depth
+    only. Offsets are counted in the units of the chunks: bytes for
+    bytes-like input, characters (not UTF-8 bytes) for str input.
+    """
+    
+    def __init__(self):
+        """Initialize a validator with no input consumed."""
+        self._stack = bytearray()
+        self._offset = 0
+        self.error_offset = None
+    
+    def feed(self, chunk):
+        """
+        Consume the next chunk of input.
+        
+        Args:
+            chunk (str or bytes-like): The next piece of the input
+            
+        Returns:
+            bool: False once a mismatch has been found, True otherwise
+            
+        Time Complexity: O(len(chunk))
+        """
+        if self.error_offset is not None:
+            return False
+        
+        if isinstance(chunk, str):
+            return self._consume(chunk, _NON_BRACKET_STR.sub("", chunk).encode("ascii"))
+        if isinstance(chunk, (bytes, bytearray)):
+            return self._consume(chunk, chunk.translate(None, _NON_BRACKET_BYTES))
+        
+        # memoryview, mmap and other buffers have no translate(), so filter
+        # them through small windows instead of copying the whole chunk
+        with memoryview(chunk) as raw, raw.cast('B') as view:
+            for start in range(0, len(view), _BRACKET_WINDOW):
+                window = bytes(view[start:start + _BRACKET_WINDOW])
+                if not self._consume(window, window.translate(None, _NON_BRACKET_BYTES)):
+                    return False
+        return True
+    
+    def _consume(self, chunk, brackets):
+        """Match the brackets filtered out of chunk, then advance past it."""
+        stack = self._stack
+        push = stack.append
+        pop = stack.pop
+        pairs = _BRACKET_PAIRS
+        for index, code in enumerate(brackets):
+            expected = pairs.get(code)
+            if expected is None:
+                push(code)
+            elif not stack or pop() != expected:
+                self.error_offset = self._offset + self._locate(chunk, index)
+                return False
+        
+        self._offset += len(chunk)
+        return True
+    
+    @staticmethod
+    def _locate(chunk, index):
+        """Return the position in chunk of its index-th bracket."""
+        pattern = _BRACKET_PATTERN if isinstance(chunk, str) else _BRACKET_PATTERN_BYTES
+        for count, match in enumerate(pattern.finditer(chunk)):
+            if count == index:
+                return match.start()
+        raise AssertionError("bracket index out of range")
+    
+    def close(self):
+        """
+        Finish the input.
+        
+        Unclosed brackets are reported at the end-of-input offset.
+        
+        Returns:
+            bool: True if the whole input was balanced
+        """
+        if self.error_offset is None and self._stack:
+            self.error_offset = self._offset
+        return self.error_offset is None
+    
+    @property
+    def depth(self):
+        """int: Number of currently open brackets."""
+        return len(self._stack)
+    
+    @property
+    def offset(self):
+        """int: Bytes (or, for str chunks, characters) consumed so far."""
+        return self._offset
+
+
+def check_balanced_stream(source, chunk_size=1 << 20):
+    """
+    Check bracket balance of a large input without loading it whole.
+    
+    Args:
+        source: A str or bytes-like object, a file object or mmap (anything
+            with read()), or an iterable of str/bytes chunks
+        chunk_size (int): Read size for file-like sources (default: 1 MiB)
+        
+    Returns:
+        tuple: (balanced, error_offset) where error_offset is the offset of
+        the first mismatched closing bracket, the end offset if brackets
+        were left open, or None if balanced. Offsets are character indexes
+        for str input and byte offsets otherwise
+        
+    Examples:
+        >>> check_balanced_stream([b"{[(", b")]}"])
+        (True, None)
+        >>> check_balanced_stream("ab(]")
+        (False, 3)
+    """
+    validator = BracketValidator()
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        chunks = (source,)
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        chunks = source
+    
+    for chunk in chunks:
+        if not validator.feed(chunk):
+            break
+    balanced = validator.close()
+    return balanced, validator.error_offset
+
+
+class Token(namedtuple('Token', 'kind text value')):
+    """
+    One lexical token of an expression.
+    
+    Operator and parenthesis tokens are shared instances, so only numbers
+    and names allocate while scanning.
+    
+    Attributes:
+        kind (str): 'number', 'name', 'operator', 'lparen' or 'rparen'
+        text (str): Canonical spelling ('×' becomes '*', '**' becomes '^')
+        value: float for numbers, the canonical text otherwise
+    """
+    
+    __slots__ = ()
+
+
+_new_token = tuple.__new__  # Skips the Python-level namedtuple __new__
+
+_NUMBER = r"(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?(?![\w.])"
+# One capture per token, so findall() does the scanning in C. A number
+# that runs into letters ("2x") falls through to [\w.]+ and is rejected.
+# In infix, a sign is always an operator (unary minus is resolved by the
+# parser); in postfix, a sign right before a number starts a literal.
+_INFIX_TOKEN_PATTERN = re.compile(rf"\s*({_NUMBER}|\*\*|[\w.]+|\S)")
+_POSTFIX_TOKEN_PATTERN = re.compile(rf"\s*((?:(?<!\S)[-+−])?{_NUMBER}|\*\*|[\w.]+|\S)")
+_NUMBER_START = frozenset("0123456789.+-−")
+
+_FIXED_TOKENS = {'(': Token('lparen', '(', '('), ')': Token('rparen', ')', ')')}
+for _symbol in "+-*/^":
+    _FIXED_TOKENS[_symbol] = Token('operator', _symbol, _symbol)
+for _spelling, _symbol in [('**', '^'), ('−', '-'), ('×', '*'), ('÷', '/')]:
+    _FIXED_TOKENS[_spelling] = _FIXED_TOKENS[_symbol]
+del _spelling, _symbol
+
+
+def _operand_token(text):
+    """
+    Make the token for a scanned word that is not an operator or parenthesis.
+    
+    Raises:
+        ValueError: If the word is neither a number nor an identifier
+    """
+    if text[0] in _NUMBER_START:
+        if text[0] == '−':
+            text = '-' + text[1:]
+        try:
+            return _new_token(Token, ('number', text, float(text)))
+        except ValueError:
+            raise ValueError(f"Invalid token: {text}") from None
+    if text.isidentifier():
+        return _new_token(Token, ('name', text, text))
+    raise ValueError(f"Invalid token: {text}")
+
+
+def tokenize(expression, notation="infix"):
+    """
+    Split an expression into tokens in a single left-to-right scan.
+    
+    Spaces between tokens are optional. Numbers may use decimals and
+    scientific notation, names are identifiers, and the operators are
+    + - * / ^ plus the spellings ** − × ÷. In postfix notation a sign
+    directly before a number (after a space or at the start) is part of
+    the number, since postfix has no unary operators.
+    
+    Args:
+        expression (str): The expression text
+        notation (str): "infix" or "postfix" (default: "infix")
+        
+    Returns:
+        list: Token objects in source order
+        
+    Raises:
+        ValueError: On a character or word that is not a valid token
+        
+    Examples:
+        >>> [token.text for token in tokenize("2*-x**2")]
+        ['2', '*', '-', 'x', '^', '2']
+        
+    Time Complexity: O(n) where n is the length of the expression
+    """
+    fixed = _FIXED_TOKENS
+    if notation == "infix":
+        return [fixed.get(text) or _operand_token(text)
+                for text in _INFIX_TOKEN_PATTERN.findall(expression)]
+    if notation != "postfix":
+        raise ValueError(f"Unknown notation: {notation}")
+    
+    return _scan_postfix(expression)
+
+
+def _scan_postfix(source):
+    """
+    Scan postfix source into tokens; see tokenize().
+    
+    Postfix is usually space-separated already, so split() does most of
+    the work in C and only words holding several tokens (like "4+") go
+    through the scanner.
+    """
+    fixed = _FIXED_TOKENS
+    number_start = _NUMBER_START
+    scanned = []
+    append = scanned.append
+    for word in source.split():
+        token = fixed.get(word)
+        if token is None:
+            first = word[0]
+            try:
+                if first in number_start and first != '−':
+                    token = _new_token(Token, ('number', word, float(word)))
+                elif word.isidentifier():
+                    token = _new_token(Token, ('name', word, word))
+            except ValueError:
+                pass
+            if token is None:
+                scanned.extend([fixed.get(text) or _operand_token(text)
+                                for text in _POSTFIX_TOKEN_PATTERN.findall(word)])
+                continue
+        append(token)
+    return scanned
+
+
+def evaluate_postfix(expression, mode="float"):
+    """
+    Evaluate a postfix expression.
+    
+    The expression is compiled once and cached (see compile_expression),
+    so evaluating the same formula repeatedly only pays for execution.
+    
+    Args:
+        expression (str): Postfix expression; operators may follow an
+            operand without a space
+        mode: Number type: "float", "int" (floor division), "decimal",
+            "fraction", or a NumericMode such as int_mode("true") or
+            decimal_mode(context) (default: "float")
+        
+    Returns:
+        Result of the evaluation: a float, or the number type of the mode
+        
+    Examples:
+        >>> evaluate_postfix("3 4 + 2 *")
+        14.0
+        >>> evaluate_postfix("15 7 1 1 + − / 3 × 2 1 1 + + −")
+        5.0
+        >>> evaluate_postfix("7 2 /", mode="int")
+        3
+        >>> evaluate_postfix("1 3 / 3 *", mode="fraction")
+        Fraction(1, 1)
+    """
+    return expression_cache.get(expression, "postfix", mode).evaluate()
+
+
+# Binding strength of infix operators; 'neg' is unary minus, which binds
+# tighter than * and / but looser than ^ (so -2^2 is -4)
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, 'neg': 3, '^': 4}
+_NEGATE = Token('operator', '-', 'neg')
+_ZERO = Token('number', '0', 0.0)
+
+
+def _infix_tokens(expression):
+    """
+    Convert an infix expression to a list of tokens in postfix order.
+    
+    Unary minus is emitted as "0 x -" so the postfix form only needs
+    binary operators; unary plus is dropped.
+    
+    Raises:
+        ValueError: On an invalid token, a missing operand or operator,
+            or mismatched parentheses
+    """
+    # Operator stack as a plain list: this runs once per token, and the
+    # parser checks emptiness itself before every pop.
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    output = []
+    emit = output.append
+    precedence = _PRECEDENCE
+    lparen = _FIXED_TOKENS['(']
+    minus = _FIXED_TOKENS['-']
+    expect_operand = True
+    
+    # Scanning is fused into the parser loop, so each token is handled once
+    fixed = _FIXED_TOKENS
+    for text in _INFIX_TOKEN_PATTERN.findall(expression):
+        token = fixed.get(text)
+        if token is None:
+            token = _operand_token(text)
+            if not expect_operand:
+                raise ValueError("Invalid infix expression")
+            emit(token)
+            expect_operand = False
+        elif token.kind == 'operator':
+            op = token.value
+            if expect_operand:
+                if op == '-':
+                    emit(_ZERO)
+                    push(_NEGATE)
+                elif op != '+':
+                    raise ValueError("Invalid infix expression")
+                continue
+            rank = precedence[op]
+            right_associative = op == '^'
+            while stack:
+                top = stack[-1]
+                if top is lparen:
+                    break
+                top_rank = precedence[top.value]
+                if top_rank < rank or (top_rank == rank and right_associative):
+                    break
+                pop()
+                emit(minus if top is _NEGATE else top)
+            push(token)
+            expect_operand = True
+        elif token is lparen:
+            if not expect_operand:
+                raise ValueError("Invalid infix expression")
+            push(token)
+        else:
+            if expect_operand:
+                raise ValueError("Invalid infix expression")
+            while stack and stack[-1] is not lparen:
+                top = pop()
+                emit(minus if top is _NEGATE else top)
+            if not stack:
+                raise ValueError("Mismatched parentheses")
+            pop()  # Remove the '('
+    
+    if expect_operand:
+        raise ValueError("Invalid infix expression")
+    while stack:
+        top = pop()
+        if top is lparen:
+            raise ValueError("Mismatched parentheses")
+        emit(minus if top is _NEGATE else top)
+    return output
+
+
+def infix_to_postfix(expression):
+    """
+    Convert infix expression to postfix notation.
+    
+    Spaces are optional. Supports unary minus, scientific notation and
+    right-associative ^ (also written **); see tokenize().
+    
+    Args:
+        expression (str): Infix expression
+        
+    Returns:
+        str: Postfix expression with space-separated tokens
+        
+    Raises:
+        ValueError: On an invalid token, a missing operand or operator,
+            or mismatched parentheses
+        
+    Examples:
+        >>> infix_to_postfix("3 + 4 * 2")
+        "3 4 2 * +"
+        >>> infix_to_postfix("(3+4)*2")
+        "3 4 + 2 *"
+        >>> infix_to_postfix("-2^2")
+        "0 2 2 ^ -"
+    """
+    return ' '.join([token.text for token in _infix_tokens(expression)])
+
+
+def evaluate_infix(expression, variables=None):
+    """
+    Evaluate an infix expression in one pass, without building postfix.
+    
+    Uses the two-stack shunting-yard algorithm: operands go on one stack
+    and operators on another, and each operator is applied as soon as it
+    is popped. Errors found while evaluating (division by zero, unbound
+    variables) are only raised once the whole expression has parsed, so
+    results and errors match compile_expression(expression, "infix").
+    
+    Args:
+        expression (str): Infix expression (see infix_to_postfix)
+        variables (dict): Values for variable names (default: None)
+        
+    Returns:
+        float: Result of the evaluation
+        
+    Raises:
+        ValueError: On an invalid token, a malformed expression, division
+            by zero or an unbound variable
+        
+    Examples:
+        >>> evaluate_infix("(3+4)*2")
+        14.0
+        >>> evaluate_infix("-x^2", {'x': 3})
+        -9.0
+        
+    Time Complexity: O(n) where n is the length of the expression
+    """
+    operands = ArrayStack()
+    operators = ArrayStack()
+    push_operand = operands.push
+    pop_operand = operands.pop
+    push_operator = operators.push
+    pop_operator = operators.pop
+    peek_operator = operators.peek
+    functions = _OPERATORS
+    precedence = _PRECEDENCE
+    fixed = _FIXED_TOKENS
+    lparen = fixed['(']
+    error = None
+    expect_operand = True
+    
+    # Bottom marker: it and '(' rank below every operator, so the loops
+    # below stop on them without checking for an empty stack
+    push_operator(None)
+    
+    def apply(op):
+        nonlocal error
+        operand2 = pop_operand()
+        operand1 = pop_operand()
+        try:
+            push_operand(functions['-' if op == 'neg' else op](operand1, operand2))
+            return
+        except ZeroDivisionError:
+            failure = ValueError("Division by zero")
+        except (ValueError, OverflowError) as e:
+            failure = _math_error(e)
+        if error is None:
+            error = failure
+        push_operand(math.nan)
+    
+    for text in _INFIX_TOKEN_PATTERN.findall(expression):
+        token = fixed.get(text)
+        if token is None:
+            kind, _, value = _operand_token(text)
+            if not expect_operand:
+                raise ValueError("Invalid infix expression")
+            if kind == 'name':
+                if variables is not None and value in variables:
+                    value = float(variables[value])
+                else:
+                    if error is None:
+                        error = ValueError(f"Invalid token: {value}")
+                    value = math.nan
+            push_operand(value)
+            expect_operand = False
+        elif token.kind == 'operator':
+            op = token.value
+            if expect_operand:
+                if op == '-':
+                    push_operand(0.0)
+                    push_operator('neg')
+                elif op != '+':
+                    raise ValueError("Invalid infix expression")
+                continue
+            rank = precedence[op]
+            right_associative = op == '^'
+            while True:
+                top_rank = precedence.get(peek_operator(), 0)
+                if top_rank < rank or (top_rank == rank and right_associative):
+                    break
+                apply(pop_operator())
+            push_operator(op)
+            expect_operand = True
+        elif token is lparen:
+            if not expect_operand:
+                raise ValueError("Invalid infix expression")
+            push_operator('(')
+        else:
+            if expect_operand:
+                raise ValueError("Invalid infix expression")
+            top = pop_operator()
+            while top != '(':
+                if top is None:
+                    raise ValueError("Mismatched parentheses")
+                apply(top)
+                top = pop_operator()
+    
+    if expect_operand:
+        raise ValueError("Invalid infix expression")
+    top = pop_operator()
+    while top is not None:
+        if top == '(':
+            raise ValueError("Mismatched parentheses")
+        apply(top)
+        top = pop_operator()
+    
+    if error is not None:
+        raise error
+    return pop_operand()
+
+
+# Compiled expressions
+_PUSH_CONST = 0
+_LOAD_VAR = 1
+_BINARY_OP = 2
+
+_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '^': math.pow,  # Raises instead of returning complex numbers
+}
+# Every spelling of an operator, for compiling space-separated postfix
+_POSTFIX_OPERATORS = {spelling: _OPERATORS[token.value]
+                      for spelling, token in _FIXED_TOKENS.items()
+                      if token.kind == 'operator'}
+
+
+class NumericMode:
+    """
+    Number type that compiled expressions compute with.
+    
+    A mode turns number tokens and variable values into numbers and maps
+    each operator to a function. Use the module presets FLOAT_MODE and
+    FRACTION_MODE, or int_mode() and decimal_mode(); evaluate_postfix and
+    compile_expression also accept the names "float", "int", "decimal"
+    and "fraction".
+    """
+    
+    __slots__ = ('name', 'number', 'convert', 'operators')
+    
+    def __init__(self, name, number, convert, operators):
+        """
+        Initialize a numeric mode.
+        
+        Args:
+            name (str): Label shown in repr()
+            number: Function turning a number token's text into a value;
+                raises ValueError if the text is not valid in this mode
+            convert: Function turning a variable's value into a value
+            operators (dict): Maps '+', '-', '*', '/' and '^' to functions
+        """
+        self.name = name
+        self.number = number
+        self.convert = convert
+        self.operators = operators
+    
+    def __repr__(self):
+        return f"NumericMode({self.name!r})"
+
+
+def _to_int(value):
+    """Convert a variable to int without silently truncating."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value)
+    raise ValueError(f"Not an integer: {value!r}")
+
+
+def _exact(value):
+    """Convert a variable to Fraction; floats by their shortest repr."""
+    return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+
+
+def _to_decimal(value):
+    """Convert a variable to Decimal; floats by their shortest repr."""
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+
+def _int_power(base, exponent):
+    if exponent < 0:
+        raise ValueError("negative exponent in int mode")
+    return base ** exponent
+
+
+def _fraction_power(base, exponent):
+    if exponent.denominator != 1:
+        raise ValueError("non-integer exponent in exact mode")
+    return base ** exponent.numerator
+
+
+def _whole(value):
+    """Return a Fraction as an int when it has no fractional part."""
+    return value.numerator if value.denominator == 1 else value
+
+
+def _exact_divide(dividend, divisor):
+    """Divide exactly: an int if it divides evenly, else a Fraction."""
+    if type(dividend) is int and type(divisor) is int:
+        quotient, remainder = divmod(dividend, divisor)
+        if remainder == 0:
+            return quotient
+        return Fraction(dividend, divisor)
+    return _whole(Fraction(dividend) / divisor)
+
+
+def _exact_power(base, exponent):
+    if type(base) is int and type(exponent) is int and exponent >= 0:
+        return base ** exponent
+    return _whole(_fraction_power(Fraction(base), Fraction(exponent)))
+
+
+FLOAT_MODE = NumericMode('float', float, float, _OPERATORS)
+
+FRACTION_MODE = NumericMode('fraction', Fraction, _exact, {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '^': _fraction_power,
+})
+
+_INT_FLOOR_MODE = NumericMode('int', int, _to_int, {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+    '^': _int_power,
+})
+
+_INT_TRUE_MODE = NumericMode('int/true', int, _to_int, {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _exact_divide,
+    '^': _exact_power,
+})
+
+
+def int_mode(division="floor"):
+    """
+    Get the exact integer mode.
+    
+    Number tokens must be integers. Results stay exact at any size.
+    
+    Args:
+        division (str): "floor" to divide with // (ints throughout), or
+            "true" for exact division whose result is an int when it
+            divides evenly and a Fraction otherwise (default: "floor")
+            
+    Returns:
+        NumericMode: The mode
+    """
+    if division == "floor":
+        return _INT_FLOOR_MODE
+    if division == "true":
+        return _INT_TRUE_MODE
+    raise ValueError(f"Unknown division policy: {division}")
+
+
+def decimal_mode(context=None):
+    """
+    Get a Decimal mode, for money and other base-10 arithmetic.
+    
+    Number tokens are converted exactly; each operation then rounds and
+    signals according to the context.
+    
+    Args:
+        context (decimal.Context): Context for every operation (default:
+            None, the current thread's context at evaluation time)
+            
+    Returns:
+        NumericMode: The mode, the same object for contexts with the same
+        settings so compiled programs stay cached
+    """
+    if context is None:
+        return _DECIMAL_MODE
+    key = (context.prec, context.rounding, context.Emin, context.Emax,
+           context.capitals, context.clamp,
+           frozenset(signal for signal, enabled in context.traps.items() if enabled))
+    mode = _DECIMAL_CONTEXT_MODES.get(key)
+    if mode is None:
+        # Bind a copy, so later changes to the caller's context don't
+        # alter the shared mode
+        context = context.copy()
+        mode = _DECIMAL_CONTEXT_MODES.setdefault(key, NumericMode('decimal', Decimal, _to_decimal, {
+            '+': context.add,
+            '-': context.subtract,
+            '*': context.multiply,
+            '/': context.divide,
+            '^': context.power,
+        }))
+    return mode
+
+
+_DECIMAL_CONTEXT_MODES = {}  # Context settings -> NumericMode
+
+
+_DECIMAL_MODE = NumericMode('decimal', Decimal, _to_decimal, {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '^': operator.pow,
+})
+
+_NUMERIC_MODES = {
+    'float': FLOAT_MODE,
+    'int': _INT_FLOOR_MODE,
+    'decimal': _DECIMAL_MODE,
+    'fraction': FRACTION_MODE,
+}
+
+
+def _math_error(error):
+    """Turn an arithmetic failure other than division by zero into ValueError."""
+    # Decimal signals carry no message, so name the signal instead
+    detail = type(error).__name__ if isinstance(error, DecimalException) else error
+    return ValueError(f"Math error: {detail}")
+
+
+def _numeric_mode(mode):
+    """Resolve a mode name or NumericMode."""
+    if isinstance(mode, NumericMode):
+        return mode
+    try:
+        return _NUMERIC_MODES[mode]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown numeric mode: {mode!r}") from None
+
+
+class CompiledExpression:
+    """
+    Immutable, pre-parsed postfix program.
+    
+    Numbers are converted (to floats by default, see NumericMode) and
+    operators are resolved to functions at compile time, and the operand
+    stack depth is validated up front, so evaluate() only has to execute
+    the opcode table.
+    """
+    
+    __slots__ = ('_source', '_code', '_max_depth', '_variables', '_mode')
+    
+    def __init__(self, source, code, max_depth, variables, mode=FLOAT_MODE):
+        """
+        Initialize a compiled expression. Use compile_expression() instead.
+        
+        Args:
+            source (str): The postfix source text
+            code (tuple): Tuple of (opcode, argument) pairs
+            max_depth (int): Maximum operand stack depth reached
+            variables (tuple): Names of the variables referenced
+            mode (NumericMode): Number type of the program (default: float)
+        """
+        object.__setattr__(self, '_source', source)
+        object.__setattr__(self, '_code', code)
+        object.__setattr__(self, '_max_depth', max_depth)
+        object.__setattr__(self, '_variables', variables)
+        object.__setattr__(self, '_mode', mode)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledExpression is immutable")
+    
+    @property
+    def source(self):
+        """str: The postfix source the program was compiled from."""
+        return self._source
+    
+    @property
+    def max_depth(self):
+        """int: Maximum operand stack depth needed to evaluate."""
+        return self._max_depth
+    
+    @property
+    def variables(self):
+        """tuple: Variable names referenced by the expression."""
+        return self._variables
+    
+    @property
+    def mode(self):
+        """NumericMode: Number type the program computes with."""
+        return self._mode
+    
+    def evaluate(self, variables=None):
+        """
+        Execute the compiled program.
+        
+        Args:
+            variables (dict): Values for variable tokens (default: None)
+            
+        Returns:
+            Result of the evaluation: a float, or the number type of the
+            program's numeric mode
+            
+        Raises:
+            ValueError: On division by zero, a math error or an unbound
+                variable
+            
+        Time Complexity: O(n) where n is the number of tokens
+        """
+        # Depth was validated at compile time, so a plain list is safe here
+        # without the per-operation emptiness checks of ArrayStack.
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        convert = self._mode.convert
+        for opcode, arg in self._code:
+            if opcode == _PUSH_CONST:
+                push(arg)
+            elif opcode == _BINARY_OP:
+                operand2 = pop()
+                try:
+                    stack[-1] = arg(stack[-1], operand2)
+                except ZeroDivisionError:
+                    raise ValueError("Division by zero") from None
+                except (ValueError, ArithmeticError) as e:
+                    raise _math_error(e) from None
+            else:
+                if variables is None or arg not in variables:
+                    raise ValueError(f"Invalid token: {arg}")
+                push(convert(variables[arg]))
+        return stack[0]
+    
+    def evaluate_batch(self, columns, errors="raise"):
+        """
+        Evaluate the program over whole columns with NumPy array operations.
+        
+        The operand stack holds arrays instead of scalars, so each operator
+        runs once per column rather than once per row.
+        
+        Args:
+            columns (dict): Maps variable names to equal-length arrays
+            errors (str): "raise" to fail on any division by zero or
+                math error (a power the scalar evaluator rejects), or
+                "mask" to return NaN for those rows plus an error mask
+                
+        Returns:
+            numpy.ndarray: Results, or (results, error_mask) when
+            errors="mask"
+            
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: On division by zero, a math error or an unbound
+                variable
+            
+        Time Complexity: O(n * r) where r is the number of rows
+        """
+        if np is None:
+            raise ImportError("evaluate_batch requires NumPy")
+        if self._mode is not FLOAT_MODE:
+            raise ValueError("evaluate_batch only supports the float mode")
+        if errors not in ("raise", "mask"):
+            raise ValueError(f"Unknown errors mode: {errors}")
+        
+        arrays = {}
+        for name in self._variables:
+            if name not in columns:
+                raise ValueError(f"Invalid token: {name}")
+            arrays[name] = np.asarray(columns[name], dtype=float)
+        shape = np.broadcast_shapes(*(a.shape for a in arrays.values()))
+        invalid = np.zeros(shape, dtype=bool)
+        
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for opcode, arg in self._code:
+                if opcode == _PUSH_CONST:
+                    push(arg)
+                elif opcode == _BINARY_OP:
+                    operand2 = pop()
+                    if arg is operator.truediv:
+                        zero = np.equal(operand2, 0)
+                        if zero.any():
+                            if errors == "raise":
+                                raise ValueError("Division by zero")
+                            invalid |= zero
+                            operand2 = np.where(zero, np.nan, operand2)
+                    operand1 = np.asarray(stack[-1])
+                    if arg is not math.pow:
+                        stack[-1] = arg(operand1, operand2)
+                        continue
+                    # math.pow raises where np.power returns NaN or inf
+                    result = np.power(operand1, operand2)
+                    failed = np.isfinite(operand1) & np.isfinite(operand2) & ~np.isfinite(result)
+                    if failed.any():
+                        if errors == "raise":
+                            raise ValueError("Math error")
+                        invalid |= failed
+                    stack[-1] = result
+                else:
+                    push(arrays[arg])
+        
+        result = np.array(np.broadcast_to(stack[0], shape), dtype=float)
+        if errors == "mask":
+            result[invalid] = np.nan
+            return result, invalid
+        return result
+    
+    def __repr__(self):
+        """Developer representation of the compiled expression."""
+        return f"CompiledExpression({self._source!r})"
+
+
+def _compile_postfix(source):
+    """
+    Compile a postfix string into a CompiledExpression.
+    
+    Space-separated input, where every word is one number, name or
+    operator, is compiled straight from split(); anything else (operators
+    touching operands, the − glyph in a literal) goes through the scanner.
+    
+    Raises:
+        ValueError: If the expression is malformed or has an invalid token
+    """
+    code = []
+    append = code.append
+    variables = []
+    depth = 0
+    max_depth = 0
+    operators = _POSTFIX_OPERATORS
+    number_start = _NUMBER_START
+    
+    for word in source.split():
+        function = operators.get(word)
+        if function is not None:
+            if depth < 2:
+                raise ValueError("Invalid postfix expression")
+            append((_BINARY_OP, function))
+            depth -= 1
+            continue
+        
+        first = word[0]
+        try:
+            if first in number_start and first != '−':
+                append((_PUSH_CONST, float(word)))
+            elif word.isidentifier():
+                append((_LOAD_VAR, word))
+                if word not in variables:
+                    variables.append(word)
+            else:
+                return _compile_tokens(source, _scan_postfix(source))
+        except ValueError:
+            return _compile_tokens(source, _scan_postfix(source))
+        depth += 1
+        if depth > max_depth:
+            max_depth = depth
+    
+    if depth != 1:
+        raise ValueError("Invalid postfix expression")
+    
+    return CompiledExpression(source, tuple(code), max_depth, tuple(variables))
+
+
+def _compile_tokens(source, tokens, mode=FLOAT_MODE):
+    """
+    Compile (kind, text, value) tokens in postfix order.
+    
+    Args:
+        source (str): Postfix text the tokens spell
+        tokens (list): Tokens from _scan_postfix() or the infix parser
+        mode (NumericMode): Number type to compile for (default: float)
+    
+    Raises:
+        ValueError: If the expression is malformed or has an invalid token
+    """
+    code = []
+    variables = []
+    depth = 0
+    max_depth = 0
+    operators = mode.operators
+    
+    for kind, text, value in tokens:
+        if kind == 'number':
+            if mode is not FLOAT_MODE:
+                try:
+                    value = mode.number(text)
+                except (ValueError, ArithmeticError):
+                    raise ValueError(f"Invalid token: {text}") from None
+            code.append((_PUSH_CONST, value))
+        elif kind == 'operator':
+            if depth < 2:
+                raise ValueError("Invalid postfix expression")
+            code.append((_BINARY_OP, operators[value]))
+            depth -= 1
+            continue
+        elif kind == 'name':
+            code.append((_LOAD_VAR, value))
+            if value not in variables:
+                variables.append(value)
+        else:
+            raise ValueError(f"Invalid token: {text}")
+        depth += 1
+        if depth > max_depth:
+            max_depth = depth
+    
+    if depth != 1:
+        raise ValueError("Invalid postfix expression")
+    
+    return CompiledExpression(source, tuple(code), max_depth, tuple(variables), mode)
+
+
+class ExpressionCache:
+    """
+    LRU-bounded cache of compiled expressions keyed on their source text.
+    
+    Tracks hit, miss and eviction counts so the cache size can be tuned.
+    Lookups and updates are locked, so one cache can be shared between
+    threads.
+    """
+    
+    def __init__(self, maxsize=4096):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            maxsize (int): Maximum number of programs kept (default: 4096)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._programs = OrderedDict()
+        self._lock = threading.Lock()  # Shared by every evaluating thread
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, expression, notation="postfix", mode="float"):
+        """
+        Return the compiled program for an expression, compiling on a miss.
+        
+        Args:
+            expression (str): Source text of the expression
+            notation (str): "postfix" or "infix" (default: "postfix")
+            mode: NumericMode or mode name (default: "float")
+            
+        Returns:
+            CompiledExpression: The compiled program
+            
+        Time Complexity: O(1) on a hit, O(n) on a miss
+        """
+        key = (notation, expression, mode)
+        programs = self._programs
+        with self._lock:
+            program = programs.get(key)
+            if program is not None:
+                self.hits += 1
+                programs.move_to_end(key)
+                return program
+            self.misses += 1
+        
+        # Compile outside the lock; a racing thread may compile it too
+        numeric = _numeric_mode(mode)
+        if notation == "postfix":
+            if numeric is FLOAT_MODE:
+                program = _compile_postfix(expression)
+            else:
+                program = _compile_tokens(expression, _scan_postfix(expression), numeric)
+        elif notation == "infix":
+            tokens = _infix_tokens(expression)
+            source = ' '.join([token.text for token in tokens])
+            program = _compile_tokens(source, tokens, numeric)
+        else:
+            raise ValueError(f"Unknown notation: {notation}")
+        
+        with self._lock:
+            programs[key] = program
+            if len(programs) > self.maxsize:
+                programs.popitem(last=False)
+                self.evictions += 1
+        return program
+    
+    def clear(self):
+        """Remove all cached programs and reset the counters."""
+        with self._lock:
+            self._programs.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def stats(self):
+        """
+        Get the cache counters.
+        
+        Returns:
+            dict: hits, misses, evictions, size and maxsize
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._programs),
+            'maxsize': self.maxsize,
+        }
+    
+    def __len__(self):
+        return len(self._programs)
+
+
+expression_cache = ExpressionCache()
+
+
+def compile_expression(expression, notation="postfix", cache=None, mode="float"):
+    """
+    Compile an infix or postfix expression into a reusable program.
+    
+    Args:
+        expression (str): Infix or postfix expression
+        notation (str): "postfix" or "infix" (default: "postfix")
+        cache (ExpressionCache): Cache to use (default: expression_cache)
+        mode: NumericMode, or "float", "int", "decimal" or "fraction"
+            (default: "float")
+        
+    Returns:
+        CompiledExpression: The compiled program
+        
+    Examples:
+        >>> compile_expression("( 3 + 4 ) * 2", notation="infix").evaluate()
+        14.0
+        >>> compile_expression("A B *").evaluate({'A': 3, 'B': 4})
+        12.0
+        >>> compile_expression("0.1 0.2 +", mode="decimal").evaluate()
+        Decimal('0.3')
+    """
+    if cache is None:
+        cache = expression_cache
+    return cache.get(expression, notation, mode)
+
+
+def evaluate_postfix_batch(expression, columns, errors="raise"):
+    """
+    Evaluate a postfix expression with variables over NumPy columns.
+    
+    Args:
+        expression (str): Postfix expression
+        columns (dict): Maps variable names to equal-length arrays
+        errors (str): "raise" or "mask" (see CompiledExpression.evaluate_batch)
+        
+    Returns:
+        numpy.ndarray: Results, or (results, error_mask) when errors="mask"
+        
+    Examples:
+        >>> evaluate_postfix_batch("P Q *", {'P': [1, 2], 'Q': [3, 4]})
+        array([3., 8.])
+    """
+    return compile_expression(expression).evaluate_batch(columns, errors)
+
+
+def _evaluate_chunk(expressions, notation, variables):
+    """Evaluate a list of expressions, keeping errors in place (pool worker)."""
+    results = []
+    append = results.append
+    for expression in expressions:
+        try:
+            if notation == "infix":
+                append(evaluate_infix(expression, variables))
+            else:
+                append(compile_expression(expression).evaluate(variables))
+        except (ValueError, TypeError, ArithmeticError) as e:
+            append(e)
+    return results
+
+
+def _auto_chunksize(count, workers):
+    """
+    Pick how many expressions to send to a worker at a time.
+    
+    Aims for about four chunks per worker, so one slow chunk does not hold
+    up the batch, but never fewer than 256 expressions, so pickling and
+    inter-process messaging are amortized over enough work.
+    """
+    return max(256, -(-count // (workers * 4)))
+
+
+def evaluate_many(expressions, variables=None, notation="infix", workers=None,
+                  chunksize=None, executor=None):
     """
-    precedence = {'+': 1, '-': 1, '*': 2, '/': 2}
+    Evaluate a batch of independent expressions across worker processes.
+    
+    The batch is cut into chunks that are evaluated by a
+    ProcessPoolExecutor (or any Executor passed in, such as an
+    InterpreterPoolExecutor on Python 3.14+, or a pool reused across
+    batches). Batches that fit in one chunk, or workers=1, are evaluated
+    in this process.
+    
+    Args:
+        expressions: Iterable of expression strings
+        variables (dict): Variable values shared by every expression
+            (default: None)
+        notation (str): "infix" or "postfix" (default: "infix")
+        workers (int): Worker processes (default: os.cpu_count())
+        chunksize (int): Expressions per task (default: chosen from the
+            batch size and workers)
+        executor: concurrent.futures.Executor to use instead of starting
+            a process pool for this call
+        
+    Returns:
+        list: One entry per expression, in input order: the float result,
+        or the ValueError, TypeError or ArithmeticError (such as an
+        OverflowError from a huge int variable) raised for that expression
+        
+    Examples:
+        >>> evaluate_many(["1+2", "1/0", "2*x"], {'x': 4}, workers=2)
+        [3.0, ValueError('Division by zero'), 8.0]
+        
+    Time Complexity: O(n) total work, spread over the workers
+    """
+    if notation not in ("infix", "postfix"):
+        raise ValueError(f"Unknown notation: {notation}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    expressions = list(expressions)
+    if chunksize is None:
+        chunksize = _auto_chunksize(len(expressions), workers)
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    
+    if executor is None and (workers == 1 or len(expressions) <= chunksize):
+        return _evaluate_chunk(expressions, notation, variables)
+    
+    chunks = [expressions[i:i + chunksize]
+              for i in range(0, len(expressions), chunksize)]
+    tasks = (_evaluate_chunk, chunks, repeat(notation), repeat(variables))
+    if executor is None:
+        with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+            parts = list(pool.map(*tasks))
+    else:
+        parts = list(executor.map(*tasks))
+    
+    # map() yields chunk results in submission order
+    results = []
+    for part in parts:
+        results.extend(part)
+    return results
+
+
+# Monotonic stack kernels: for each element, the nearest element on one
+# side with a strictly greater (or smaller) value. Sequences run the
+# classic one-pass stack algorithm. NumPy arrays are cut into chunks:
+# inside a chunk, answers are found with vectorized pointer jumping, and
+# answers that lie before the chunk come from a stack carried across
+# chunks.
+
+_MONOTONIC_CHUNK = 16384
+_JUMP_ROUNDS = 8  # Pointer-jumping rounds before switching to binary lifting
+
+
+def _is_numeric_array(values):
+    """Check whether values can take the vectorized NumPy path."""
+    return np is not None and isinstance(values, np.ndarray) and values.dtype.kind in "biuf"
+
+
+def _carry_typecode(dtype):
+    """Pick an array module type code that can hold values of a NumPy dtype."""
+    if dtype.char in "bBhHiIlLqQfd":
+        return dtype.char
+    return 'B' if dtype.kind == 'b' else 'd'
+
+
+def _nearest_in_sequence(values, beyond, reverse):
+    """Nearest-beyond indices of a sequence, with one ArrayStack pass."""
+    n = len(values)
+    result = [-1] * n
     stack = ArrayStack()
-    output = []
-    tokens = expression.split()
-    
-    for token in tokens:
-        if token.replace('.', '').replace('-', '').isdigit() or token.isalpha():
-            # Number (including negative numbers and decimals) or variable
-            output.append(token)
-        elif token == '(':
-            stack.push(token)
-        elif token == ')':
-            while not stack.is_empty() and stack.peek() != '(':
-                output.append(stack.pop())
-            if not stack.is_empty():
-                stack.pop()  # Remove the '('
-        elif token in precedence:
-            while (not stack.is_empty() and 
-                   stack.peek() != '(' and 
-                   stack.peek() in precedence and
-                   precedence[stack.peek()] >= precedence[token]):
-                output.append(stack.pop())
-            stack.push(token)
-    
-    while not stack.is_empty():
-        output.append(stack.pop())
-    
-    return ' '.join(output)
+    push = stack.push
+    pop = stack.pop
+    top = -1  # The top index lives in a local; the -1 pushed first ends every scan
+    for i in (range(n - 1, -1, -1) if reverse else range(n)):
+        value = values[i]
+        while top >= 0 and not beyond(values[top], value):
+            top = pop()
+        result[i] = top
+        push(top)
+        top = i
+    return result
+
+
+def _previous_in_chunk(chunk, beyond, extreme):
+    """
+    Index of the nearest earlier element beyond each one, within a chunk.
+    
+    Each pointer p[i] only ever skips elements that are not beyond
+    chunk[i], so following p[p[i]] is safe and resolves most elements in
+    a few rounds. Long runs (such as a descending ramp followed by a rise)
+    would take many rounds, so the stragglers finish with a binary search
+    over a sparse table of window extremes.
+    
+    Returns:
+        numpy.ndarray: Local indices, -1 where no earlier element is beyond
+    """
+    n = len(chunk)
+    pointers = np.arange(-1, n - 1)
+    # An element at least as extreme as everything before it has no answer
+    records = ~beyond(extreme.accumulate(chunk), chunk)
+    pointers[records] = -1
+    active = np.flatnonzero(~records)
+    
+    for _ in range(_JUMP_ROUNDS):
+        if not active.size:
+            return pointers
+        targets = pointers[active]
+        jump = ~beyond(chunk[targets], chunk[active])
+        active = active[jump]
+        targets = pointers[targets[jump]]
+        pointers[active] = targets
+        active = active[targets >= 0]
+    if not active.size:
+        return pointers
+    
+    # tables[k][j] is the extreme of chunk[j:j + 2**k]
+    tables = [chunk]
+    width = 1
+    while 2 * width <= n:
+        table = tables[-1]
+        tables.append(extreme(table[:-width], table[width:]))
+        width *= 2
+    positions = pointers[active]
+    targets = chunk[active]
+    for level in range(len(tables) - 1, -1, -1):
+        width = 1 << level
+        starts = positions - (width - 1)
+        skip = (starts >= 0) & ~beyond(tables[level][np.maximum(starts, 0)], targets)
+        positions -= width * skip
+    pointers[active] = positions
+    return pointers
+
+
+def _count_beyond(carried, targets, greater):
+    """Count the carried values (strictly monotonic) beyond each target."""
+    if greater:
+        return len(carried) - np.searchsorted(carried[::-1], targets, side='right')
+    return np.searchsorted(carried, targets, side='left')
+
+
+def _nearest_in_array(values, greater, reverse, chunk_size, out):
+    """Nearest-beyond indices of a 1-D NumPy array, chunk by chunk."""
+    n = len(values)
+    if out is None:
+        out = np.empty(n, dtype=np.int64)
+    beyond, extreme = (np.greater, np.maximum) if greater else (np.less, np.minimum)
+    typecode = _carry_typecode(values.dtype)
+    carried_dtype = np.dtype(typecode)
+    # Elements of earlier chunks that later elements can still see, bottom
+    # to top, in pass order; their values are strictly monotonic
+    carried = TypedArrayStack('q')
+    carried_values = TypedArrayStack(typecode)
+    
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        if reverse:
+            chunk = np.asarray(values[n - stop:n - start])[::-1]
+        else:
+            chunk = np.asarray(values[start:stop])
+        local = _previous_in_chunk(chunk, beyond, extreme)
+        result = np.where(local >= 0, local + start, -1)
+        
+        indices = np.frombuffer(carried._data, dtype=np.int64)
+        ordered = np.frombuffer(carried_values._data, dtype=carried_dtype)
+        unresolved = np.flatnonzero(local < 0)
+        if len(indices) and unresolved.size:
+            count = _count_beyond(ordered, chunk[unresolved], greater)
+            result[unresolved] = np.where(count > 0, indices[np.maximum(count - 1, 0)], -1)
+        # Carried elements not beyond the chunk's extreme are hidden for good
+        keep = int(_count_beyond(ordered, extreme.reduce(chunk), greater))
+        del indices, ordered  # Release the buffers before the stacks change size
+        carried.pop_many(len(carried) - keep)
+        carried_values.pop_many(len(carried_values) - keep)
+        
+        after = extreme.accumulate(chunk[::-1])[::-1]
+        survivors = np.flatnonzero(np.append(beyond(chunk[:-1], after[1:]), True))
+        carried.push_many(array('q', (survivors + start).astype(np.int64).tobytes()))
+        carried_values.push_many(array(typecode, chunk[survivors].astype(carried_dtype).tobytes()))
+        
+        if reverse:
+            out[n - stop:n - start] = np.where(result >= 0, n - 1 - result, -1)[::-1]
+        else:
+            out[start:stop] = result
+    return out
+
+
+def _nearest(values, greater, reverse, chunk_size, out):
+    """Dispatch a nearest-beyond query to the sequence or NumPy kernel."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if _is_numeric_array(values):
+        if values.ndim != 1:
+            raise ValueError("values must be one-dimensional")
+        return _nearest_in_array(values, greater, reverse, chunk_size, out)
+    result = _nearest_in_sequence(values, operator.gt if greater else operator.lt, reverse)
+    if out is not None:
+        out[:] = result
+        return out
+    return result
+
+
+def next_greater(values, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Find the next element strictly greater than each element.
+    
+    Args:
+        values: Sequence of comparable values, or a one-dimensional
+            numeric NumPy array (an np.memmap works too)
+        chunk_size (int): Array elements processed at a time; working
+            memory is O(chunk_size) plus the carried stack
+            (default: 16384)
+        out: Optional int64 array receiving the result, such as a memmap
+            for arrays too big for memory
+        
+    Returns:
+        list or numpy.ndarray: Index of the next greater element for each
+        element, or -1; a list for sequences, int64 for NumPy arrays
+        
+    Examples:
+        >>> next_greater([2, 1, 3, 3, 0])
+        [2, 2, -1, -1, -1]
+        
+    Time Complexity: O(n) for sequences; O(n log chunk_size) vectorized
+        in the worst case for arrays
+    """
+    return _nearest(values, True, True, chunk_size, out)
+
+
+def next_smaller(values, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Find the next element strictly smaller than each element.
+    
+    Args:
+        values: Sequence of comparable values, or a 1-D numeric NumPy array
+        chunk_size (int): Array elements processed at a time (default: 16384)
+        out: Optional int64 array receiving the result
+        
+    Returns:
+        list or numpy.ndarray: Index of the next smaller element, or -1
+        
+    Examples:
+        >>> next_smaller([2, 1, 3, 3, 0])
+        [1, 4, 4, 4, -1]
+    """
+    return _nearest(values, False, True, chunk_size, out)
+
+
+def previous_greater(values, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Find the previous element strictly greater than each element.
+    
+    Args:
+        values: Sequence of comparable values, or a 1-D numeric NumPy array
+        chunk_size (int): Array elements processed at a time (default: 16384)
+        out: Optional int64 array receiving the result
+        
+    Returns:
+        list or numpy.ndarray: Index of the previous greater element, or -1
+        
+    Examples:
+        >>> previous_greater([3, 1, 2, 5, 4])
+        [-1, 0, 0, -1, 3]
+    """
+    return _nearest(values, True, False, chunk_size, out)
+
+
+def previous_smaller(values, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Find the previous element strictly smaller (less) than each element.
+    
+    Args:
+        values: Sequence of comparable values, or a 1-D numeric NumPy array
+        chunk_size (int): Array elements processed at a time (default: 16384)
+        out: Optional int64 array receiving the result
+        
+    Returns:
+        list or numpy.ndarray: Index of the previous smaller element, or -1
+        
+    Examples:
+        >>> previous_smaller([3, 1, 2, 5, 4])
+        [-1, -1, 1, 2, 2]
+    """
+    return _nearest(values, False, False, chunk_size, out)
+
+
+def stock_span(prices, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Compute the stock span of each day.
+    
+    The span is the number of consecutive days, ending with that day,
+    whose price is at most that day's price.
+    
+    Args:
+        prices: Sequence of prices, or a 1-D numeric NumPy array
+        chunk_size (int): Array elements processed at a time (default: 16384)
+        out: Optional int64 array receiving the result
+        
+    Returns:
+        list or numpy.ndarray: The span of each day
+        
+    Examples:
+        >>> stock_span([100, 80, 60, 70, 60, 75, 85])
+        [1, 1, 1, 2, 1, 4, 6]
+    """
+    spans = previous_greater(prices, chunk_size, out)
+    if isinstance(spans, list):
+        return [i - previous for i, previous in enumerate(spans)]
+    for start in range(0, len(spans), chunk_size):
+        stop = min(start + chunk_size, len(spans))
+        spans[start:stop] = np.arange(start, stop) - spans[start:stop]
+    return spans
+
+
+def largest_rectangle(heights, chunk_size=_MONOTONIC_CHUNK):
+    """
+    Find the largest rectangle under a histogram.
+    
+    Each bar extends left and right until the first strictly lower bar,
+    which the previous/next smaller kernels give for every bar at once.
+    
+    Args:
+        heights: Sequence of bar heights, or a 1-D numeric NumPy array
+        chunk_size (int): Array elements processed at a time (default: 16384)
+        
+    Returns:
+        tuple: (area, start, end) of the first largest rectangle, which
+        spans heights[start:end]; (0, 0, 0) for no bars
+        
+    Examples:
+        >>> largest_rectangle([2, 1, 5, 6, 2, 3])
+        (10, 2, 4)
+    """
+    n = len(heights)
+    if n == 0:
+        return 0, 0, 0
+    left = previous_smaller(heights, chunk_size)
+    right = next_smaller(heights, chunk_size)
+    best = None
+    if isinstance(left, list):
+        for i in range(n):
+            end = right[i] if right[i] >= 0 else n
+            area = heights[i] * (end - left[i] - 1)
+            if best is None or area > best[0]:
+                best = (area, left[i] + 1, end)
+        return best
+    
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        ends = np.where(right[start:stop] >= 0, right[start:stop], n)
+        areas = np.asarray(heights[start:stop]) * (ends - left[start:stop] - 1)
+        i = int(areas.argmax())
+        if best is None or areas[i] > best[0]:
+            best = (areas[i].item(), int(left[start + i]) + 1, int(ends[i]))
+    return best
+
+
+def _window_argmax(segment, window):
+    """
+    Index of the maximum of every full window of an array segment.
+    
+    Uses the van Herk/Gil-Werman split into window-sized blocks: a window
+    is a suffix of one block plus a prefix of the next, so its maximum is
+    the larger of two precomputed block maxima. Ties go to the rightmost
+    index.
+    """
+    length = len(segment)
+    blocks = -(-length // window)
+    padded = np.empty(blocks * window, dtype=segment.dtype)
+    padded[:length] = segment
+    padded[length:] = segment[-1]  # No full window reads the padding
+    grid = padded.reshape(blocks, window)
+    positions = np.arange(blocks * window).reshape(blocks, window)
+    
+    # The rightmost maximum of a block prefix is its last record
+    records = grid == np.maximum.accumulate(grid, axis=1)
+    prefix = np.maximum.accumulate(np.where(records, positions, -1), axis=1).ravel()
+    # The rightmost maximum of a block suffix is its first strict record
+    after = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1]
+    records[:, :-1] = grid[:, :-1] > after[:, 1:]
+    records[:, -1] = True
+    suffix = np.where(records, positions, blocks * window)
+    suffix = np.minimum.accumulate(suffix[:, ::-1], axis=1)[:, ::-1].ravel()
+    
+    starts = np.arange(length - window + 1)
+    left = suffix[starts]
+    right = prefix[starts + window - 1]
+    return np.where(padded[right] >= padded[left], right, left)
+
+
+def sliding_window_max(values, window, chunk_size=_MONOTONIC_CHUNK, out=None):
+    """
+    Find the maximum of every window of consecutive elements.
+    
+    Sequences use a monotonic deque of candidate indices; NumPy arrays
+    use block prefix/suffix maxima, a chunk of windows at a time.
+    
+    Args:
+        values: Sequence of comparable values, or a 1-D numeric NumPy array
+        window (int): Window length
+        chunk_size (int): Windows of an array processed at a time
+            (default: 16384)
+        out: Optional int64 array receiving the result
+        
+    Returns:
+        list or numpy.ndarray: For each of the len(values) - window + 1
+        windows, the index of its maximum (the rightmost one on ties)
+        
+    Raises:
+        ValueError: If window or chunk_size is less than 1
+        
+    Examples:
+        >>> sliding_window_max([1, 3, -1, -3, 5, 3, 6, 7], 3)
+        [1, 1, 4, 4, 6, 7]
+        
+    Time Complexity: O(n)
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    count = max(len(values) - window + 1, 0)
+    if _is_numeric_array(values):
+        if values.ndim != 1:
+            raise ValueError("values must be one-dimensional")
+        if out is None:
+            out = np.empty(count, dtype=np.int64)
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            segment = np.asarray(values[start:stop + window - 1])
+            out[start:stop] = _window_argmax(segment, window) + start
+        return out
+    
+    result = []
+    candidates = deque()  # Indices of decreasing values; the front is the maximum
+    for i, value in enumerate(values):
+        while candidates and values[candidates[-1]] <= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1:
+            result.append(candidates[0])
+    if out is not None:
+        out[:] = result
+        return out
+    return result
 
 
 # Default stack implementation (using ArrayStack for simplicity)
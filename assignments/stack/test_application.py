@@ -0,0 +1,295 @@
+"""
+Unit tests for stack applications.
+
+This module tests the application classes built on top of the stack
+implementations, such as the undo/redo text editor.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import gc
+import json
+import sys
+
+from application import CallTrace, FunctionCallSimulator, TextBuffer, TextEditor
+
+
+def test_text_buffer():
+    """Test inserting and deleting anywhere in the chunked buffer."""
+    buffer = TextBuffer()
+    buffer.insert(0, "Hello")
+    buffer.insert(5, "World")
+    buffer.insert(5, ", ")
+    assert buffer.text() == "Hello, World"
+    assert len(buffer) == 12
+
+    assert buffer.delete(10, 2) == "ld"
+    assert buffer.delete(0, 2) == "He"
+    assert buffer.delete(3, 0) == ""
+    assert buffer.text() == "llo, Wor"
+
+    snapshot = buffer.snapshot()
+    buffer.insert(8, "ld!")
+    buffer.restore(snapshot)
+    assert buffer.text() == "llo, Wor"
+
+
+def test_text_editor_undo_redo():
+    """Test that undo/redo replay compact edits correctly."""
+    editor = TextEditor(verbose=False)
+    editor.type_text("Hello")
+    editor.type_text(" World")
+    editor.delete_chars(6)
+    assert editor.content == "Hello"
+    assert editor.undo_stack.peek() == ('delete', 5, ' World')
+
+    editor.undo()
+    assert editor.content == "Hello World"
+    editor.undo()
+    assert editor.content == "Hello"
+    editor.redo()
+    assert editor.content == "Hello World"
+
+    # A new edit discards the redo history
+    editor.type_text("!")
+    assert editor.redo_stack.is_empty() == True
+    assert editor.content == "Hello World!"
+
+    # Deleting more than there is removes everything
+    editor.delete_chars(100)
+    assert editor.content == ""
+    editor.undo()
+    assert editor.content == "Hello World!"
+
+    # Undo/redo on empty history are no-ops
+    editor = TextEditor(verbose=False)
+    editor.undo()
+    editor.redo()
+    assert editor.content == ""
+
+
+def test_text_editor_checkpoints():
+    """Test multi-step undo/redo through periodic checkpoints."""
+    editor = TextEditor(verbose=False, checkpoint_interval=3)
+    plain = TextEditor(verbose=False)
+    states = [""]
+    for i in range(10):
+        for target in (editor, plain):
+            target.type_text(str(i))
+        states.append(editor.content)
+
+    for steps in [4, 1, 3, 2]:
+        editor.undo(steps)
+        plain.undo(steps)
+        assert editor.content == plain.content
+    assert editor.content == states[0]
+
+    editor.redo(7)
+    assert editor.content == states[7]
+    editor.undo(5)
+    assert editor.content == states[2]
+
+    # Checkpoints past a diverging edit are dropped
+    editor.type_text("x")
+    editor.undo(3)
+    assert editor.content == states[0]
+    editor.redo(3)
+    assert editor.content == states[2] + "x"
+
+
+def test_text_editor_bounded_history():
+    """Test capped undo history and coalesced typing."""
+    editor = TextEditor(verbose=False, history_limit=2)
+    for word in ["one ", "two ", "three"]:
+        editor.type_text(word)
+    editor.undo(5)
+    assert editor.content == "one "
+    assert editor.undo_stack.evicted_items == 1
+
+    editor = TextEditor(verbose=False, history_bytes=1000)
+    for _ in range(100):
+        editor.type_text("x" * 50)
+    assert editor.undo_stack.retained_bytes <= 1000
+    assert editor.undo_stack.evicted_items > 0
+
+    editor = TextEditor(verbose=False, coalesce_typing=True)
+    for char in "Hello":
+        editor.type_text(char)
+    editor.delete_chars(2)
+    editor.type_text("p!")
+    assert editor.undo_stack.size() == 3
+    editor.undo()
+    assert editor.content == "Hel"
+    editor.undo()
+    editor.undo()
+    assert editor.content == ""
+    editor.redo()
+    assert editor.content == "Hello"
+
+
+def test_function_call_executor():
+    """Test running generator recursions deeper than the recursion limit."""
+    def count_down(n):
+        if n == 0:
+            return 0
+        return 1 + (yield count_down, n - 1)
+
+    def fibonacci(n):
+        if n < 2:
+            return n
+        return (yield fibonacci, n - 1) + (yield fibonacci, n - 2)
+
+    def fail(n):
+        if n == 0:
+            raise KeyError(n)
+        return (yield fail, n - 1)
+
+    def recover(n):
+        try:
+            return (yield fail, n)
+        except KeyError:
+            return "recovered"
+
+    depth = sys.getrecursionlimit() * 20
+    simulator = FunctionCallSimulator()
+    assert simulator.run(count_down, depth) == depth
+    assert simulator.max_depth == depth + 1
+    assert simulator.call_count == depth + 1
+    assert simulator.run(fibonacci, 15) == 610
+    assert simulator.run(len, "abc") == 3  # Plain functions run directly
+
+    # The garbage collector is only paused on request
+    def collecting():
+        return (yield gc.isenabled,)
+
+    assert simulator.run(collecting) == True
+    assert simulator.run(collecting, disable_gc=True) == False
+    assert gc.isenabled() == True
+
+    # Exceptions unwind through the callers, which may catch them
+    assert simulator.run(recover, 1000) == "recovered"
+    try:
+        simulator.run(fail, 1000)
+        assert False, "Should raise KeyError"
+    except KeyError:
+        pass
+
+    simulator = FunctionCallSimulator(memoize=True)
+    assert simulator.run(fibonacci, 300) == 222232244629420445529739893461909967206666939096499764990979600
+    assert simulator.call_count == 301
+    assert simulator.run(fibonacci, 300) == 222232244629420445529739893461909967206666939096499764990979600
+    assert simulator.call_count == 301  # Answered from the memo
+
+
+def test_function_call_simulation():
+    """Test the hand-driven call stack and its snapshots."""
+    import contextlib
+    import io
+
+    simulator = FunctionCallSimulator()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        simulator.call_function("factorial", {"n": 2})
+        snapshot = simulator.snapshot()
+        simulator.call_function("factorial", {"n": 1})
+        simulator.call_stack.push({'function': "extra", 'parameters': {},
+                                   'call_id': 0, 'local_vars': {}})
+        simulator.show_call_stack()
+    assert simulator.call_stack.size() == 3  # Mutable, as before
+    assert "extra" in output.getvalue().splitlines()[-2]
+    assert list(simulator.snapshot()) == list(simulator.call_stack)
+    assert simulator.snapshot().peek()['function'] == "extra"
+    assert list(snapshot) == [{'function': "factorial", 'parameters': {"n": 2},
+                               'call_id': 1, 'local_vars': {}}]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(4):
+            simulator.return_from_function()
+    assert simulator.call_stack.is_empty() == True
+    assert simulator.snapshot().is_empty() == True
+    assert snapshot.size() == 1
+
+
+def test_call_trace():
+    """Test recording call events and exporting them."""
+    def fibonacci(n):
+        if n < 2:
+            return n
+        return (yield fibonacci, n - 1) + (yield fibonacci, n - 2)
+
+    trace = CallTrace()
+    simulator = FunctionCallSimulator(trace=trace)
+    assert simulator.run(fibonacci, 4) == 3
+    events = list(trace.events())
+    assert len(events) == trace.recorded == 2 * simulator.call_count == 18
+    assert [event[0] for event in events[:5]] == [CallTrace.CALL] * 4 + [CallTrace.RETURN]
+    assert [event[4] for event in events[:5]] == [1, 2, 3, 4, 4]
+    assert events[-1][:3] == (CallTrace.RETURN, events[0][1], 1)
+    timestamps = [event[3] for event in events]
+    assert timestamps == sorted(timestamps)
+
+    folded = dict(line.rsplit(" ", 1) for line in trace.folded_stacks().splitlines())
+    name = events[0][1]
+    assert set(folded) == {";".join([name] * depth) for depth in range(1, 5)}
+    total = sum(int(ns) for ns in folded.values())
+    assert total == timestamps[-1] - timestamps[0]
+
+    chrome = json.loads(json.dumps(trace.chrome_trace()))
+    phases = [event['ph'] for event in chrome['traceEvents']]
+    assert phases.count('B') == phases.count('E') == 9
+    assert chrome['traceEvents'][0]['ts'] == 0
+
+    # The simulated calls record events instead of printing
+    trace.clear()
+    simulator.call_function("factorial", {"n": 2})
+    simulator.call_function("factorial", {"n": 1})
+    simulator.return_from_function(1)
+    simulator.return_from_function(2)
+    assert [(kind, name, depth) for kind, name, call_id, ns, depth in trace.events()] == [
+        (CallTrace.CALL, "factorial", 1), (CallTrace.CALL, "factorial", 2),
+        (CallTrace.RETURN, "factorial", 2), (CallTrace.RETURN, "factorial", 1)]
+
+    # A full buffer keeps the newest events
+    trace = CallTrace(capacity=5)
+    FunctionCallSimulator(trace=trace).run(fibonacci, 4)
+    assert trace.dropped == 13
+    assert len(list(trace.events())) == 5
+    assert all(line.startswith("...") for line in trace.folded_stacks().splitlines())
+    chrome = trace.chrome_trace()
+    assert [event['ph'] for event in chrome['traceEvents']] == ['B', 'E']
+
+
+def run_all_tests():
+    """Run all tests manually (for environments without pytest)."""
+    print("Running application tests...")
+
+    try:
+        test_text_buffer()
+        print("✓ TextBuffer test passed")
+
+        test_text_editor_undo_redo()
+        print("✓ TextEditor undo/redo test passed")
+
+        test_text_editor_checkpoints()
+        print("✓ TextEditor checkpoints test passed")
+
+        test_text_editor_bounded_history()
+        print("✓ TextEditor bounded history test passed")
+
+        test_function_call_executor()
+        print("✓ Function call executor test passed")
+
+        test_function_call_simulation()
+        print("✓ Function call simulation test passed")
+
+        test_call_trace()
+        print("✓ Call trace test passed")
+
+        print("\nAll tests passed! ✓")
+
+    except Exception as e:
+        print(f"Test failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_all_tests()
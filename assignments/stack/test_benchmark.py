@@ -0,0 +1,81 @@
+"""
+Unit tests for the benchmark harness.
+
+This module checks that benchmark runs produce consistent statistics and
+that run comparisons flag regressions.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import json
+import os
+import tempfile
+
+from benchmark import CASES, compare_runs, main, run_case, run_suite
+
+
+def test_run_case():
+    """Test statistics of a single benchmark case."""
+    result = run_case(CASES['push_pop/ArrayStack'], 100, repeat=3)
+    assert len(result['times_ns']) == 3
+    assert result['min_ns'] <= result['median_ns']
+    assert result['ops_per_sec'] > 0
+    assert result['peak_bytes'] > 0
+
+    result = run_case(CASES['bulk/ArrayStack'], 100, repeat=1, memory=False)
+    assert result['stdev_ns'] == 0.0
+    assert result['peak_bytes'] is None
+
+
+def test_every_case_runs():
+    """Test that every registered case runs at a small size."""
+    run = run_suite(sizes=[10], repeat=1, warmup=0, memory=False, verbose=False)
+    assert len(run['results']) == len(CASES)
+    assert 'python' in run and 'platform' in run
+
+
+def test_compare_runs():
+    """Test regression detection between two runs."""
+    baseline = {'results': [{'name': 'a', 'size': 10, 'median_ns': 100},
+                            {'name': 'b', 'size': 10, 'median_ns': 100},
+                            {'name': 'c', 'size': 10, 'median_ns': 100}]}
+    current = {'results': [{'name': 'a', 'size': 10, 'median_ns': 105},
+                           {'name': 'b', 'size': 10, 'median_ns': 150},
+                           {'name': 'd', 'size': 10, 'median_ns': 100}]}
+    rows = compare_runs(baseline, current, threshold=0.10)
+    assert [(name, regressed) for name, _, _, regressed in rows] == [('a', False), ('b', True)]
+    assert rows[1][2] == 1.5
+
+    with tempfile.TemporaryDirectory() as directory:
+        old = os.path.join(directory, "old.json")
+        new = os.path.join(directory, "new.json")
+        for path, run in [(old, baseline), (new, current)]:
+            with open(path, "w") as f:
+                json.dump(run, f)
+        assert main(['--compare', old, new]) == 1
+        assert main(['--compare', old, old]) == 0
+
+def run_all_tests():
+    """Run all tests manually (for environments without pytest)."""
+    print("Running benchmark tests...")
+
+    try:
+        test_run_case()
+        print("✓ Benchmark case test passed")
+
+        test_every_case_runs()
+        print("✓ Benchmark suite test passed")
+
+        test_compare_runs()
+        print("✓ Run comparison test passed")
+
+        print("\nAll tests passed! ✓")
+
+    except Exception as e:
+        print(f"Test failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_all_tests()
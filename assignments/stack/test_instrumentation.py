@@ -0,0 +1,126 @@
+"""
+Unit tests for stack instrumentation.
+
+This module checks that instrumented stacks keep the stack behaviour and
+record accurate counters, and that the plain classes are left untouched.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import os
+import tempfile
+
+from instrumentation import DEPTH_BUCKETS, HistogramSink, PrometheusFileSink, instrument, prometheus_text
+from stack import ArrayStack, LinkedListStack
+
+
+def test_instrumented_counters():
+    """Test pushes, pops, empty pops and peak depth for both stacks."""
+    for stack_class in [ArrayStack, LinkedListStack]:
+        stack = instrument(stack_class)(name="jobs")
+        assert isinstance(stack, stack_class)
+
+        for i in range(10):
+            stack.push(i)
+        stack.push_many([10, 11])
+        assert stack.pop() == 11
+        assert stack.pop_many(3) == [10, 9, 8]
+        while not stack.is_empty():
+            stack.pop()
+        try:
+            stack.pop()
+            assert False, "Should raise IndexError"
+        except IndexError:
+            pass
+
+        snapshot = stack.report()
+        assert snapshot['name'] == "jobs"
+        assert snapshot['pushes'] == 12
+        assert snapshot['pops'] == 12
+        assert snapshot['empty_pops'] == 1
+        assert snapshot['peak_depth'] == 12
+        assert snapshot['depth_histogram'] == {1: 1, 2: 1, 4: 2, 8: 4, 16: 4}
+        assert snapshot['depth_sum'] == sum(range(1, 13))
+
+    # Only list-backed stacks resize
+    assert instrument(ArrayStack)().metrics.resizes == 0
+    stack = instrument(ArrayStack)()
+    for i in range(100):
+        stack.push(i)
+    assert stack.metrics.resizes > 0
+    linked = instrument(LinkedListStack)()
+    linked.push(1)
+    assert linked.metrics.resizes == 0
+
+
+def test_plain_classes_untouched():
+    """Test that instrumenting doesn't change the original classes."""
+    instrumented = instrument(ArrayStack)
+    assert instrument(ArrayStack) is instrumented
+    assert ArrayStack.push is not instrumented.push
+    assert not hasattr(ArrayStack(), 'metrics')
+
+
+def test_sinks():
+    """Test the in-process and Prometheus file sinks."""
+    sink = HistogramSink()
+    stack = instrument(ArrayStack)(name="a", sink=sink)
+    for i in range(5):
+        stack.push(i)
+    stack.report()
+    stack.push(5)
+    stack.report()
+    assert len(sink.reports) == 2
+    assert sink.depth_histogram() == {1: 1, 2: 1, 4: 2, 8: 2}
+    other = instrument(ArrayStack)(name="b", sink=sink)
+    other.push(0)
+    other.report()
+    assert sink.depth_histogram() == {1: 2, 2: 1, 4: 2, 8: 2}
+
+    text = prometheus_text(sink.reports[1])
+    assert 'stack_pushes_total{stack="a"} 6' in text
+    assert 'stack_push_depth_bucket{stack="a",le="+Inf"} 6' in text
+    assert 'stack_push_depth_sum{stack="a"} 21' in text
+
+    # A bulk push records every depth it passes through
+    bulk = instrument(ArrayStack)()
+    bulk.push(0)
+    bulk.push_many(range(1000))
+    bulk.push_many([])
+    histogram = bulk.metrics.snapshot()['depth_histogram']
+    assert histogram == {bound: min(bound, 1001) - bound // 2 if bound > 1 else 1
+                         for bound in DEPTH_BUCKETS[:11]}
+    assert bulk.metrics.depth_sum == sum(range(1, 1002))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stack.prom")
+        stack.sink = PrometheusFileSink(path)
+        stack.report()
+        with open(path) as f:
+            assert f.read() == prometheus_text(stack.metrics.snapshot())
+
+
+def run_all_tests():
+    """Run all tests manually (for environments without pytest)."""
+    print("Running instrumentation tests...")
+
+    try:
+        test_instrumented_counters()
+        print("✓ Instrumented counters test passed")
+
+        test_plain_classes_untouched()
+        print("✓ Plain classes untouched test passed")
+
+        test_sinks()
+        print("✓ Sinks test passed")
+
+        print("\nAll tests passed! ✓")
+
+    except Exception as e:
+        print(f"Test failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,207 @@
+"""
+Unit tests for the queue implementations.
+
+This module checks TwoStackQueue, RingBuffer and AggregateQueue against
+collections.deque under random interleavings of operations.
+
+Author: Data Structure Course
+Date: 2024
+"""
+
+import operator
+import random
+import threading
+from collections import deque
+
+from queues import AggregateQueue, RingBuffer, TwoStackQueue
+
+
+def test_two_stack_queue():
+    """Test FIFO order through single and bulk operations."""
+    queue = TwoStackQueue([1, 2])
+    reference = deque([1, 2])
+    rng = random.Random(0)
+    for _ in range(3000):
+        choice = rng.random()
+        if choice < 0.4:
+            item = rng.random()
+            queue.enqueue(item)
+            reference.append(item)
+        elif choice < 0.5:
+            items = [rng.random() for _ in range(rng.randint(0, 4))]
+            queue.enqueue_many(items)
+            reference.extend(items)
+        elif choice < 0.8 and reference:
+            assert queue.dequeue() == reference.popleft()
+        elif reference:
+            n = rng.randint(0, len(reference))
+            assert queue.dequeue_many(n) == [reference.popleft() for _ in range(n)]
+        assert list(queue) == list(reference)
+        assert queue.size() == len(reference)
+        if reference:
+            assert queue.peek() == reference[0]
+
+    queue.clear()
+    assert queue.is_empty() == True
+    for method in [queue.dequeue, queue.peek, lambda: queue.dequeue_many(1)]:
+        try:
+            method()
+            assert False, "Should raise IndexError"
+        except IndexError:
+            pass
+
+
+def test_ring_buffer_overwrite():
+    """Test that a full buffer drops and counts its oldest items."""
+    rng = random.Random(1)
+    for typecode in [None, 'q']:
+        for capacity in [1, 2, 5]:
+            buffer = RingBuffer(capacity, typecode)
+            reference = deque(maxlen=capacity)
+            overwritten = 0
+            for _ in range(2000):
+                choice = rng.random()
+                if choice < 0.35:
+                    item = rng.randint(0, 99)
+                    overwritten += len(reference) == capacity
+                    buffer.enqueue(item)
+                    reference.append(item)
+                elif choice < 0.5:
+                    items = [rng.randint(0, 99) for _ in range(rng.randint(0, 8))]
+                    overwritten += max(len(reference) + len(items) - capacity, 0)
+                    buffer.enqueue_many(items)
+                    reference.extend(items)
+                elif choice < 0.75 and reference:
+                    assert buffer.dequeue() == reference.popleft()
+                elif reference:
+                    n = rng.randint(0, len(reference))
+                    assert list(buffer.dequeue_many(n)) == [reference.popleft()
+                                                            for _ in range(n)]
+                assert list(buffer) == list(reference)
+                assert buffer.overwritten == overwritten
+
+    buffer = RingBuffer(2)
+    buffer.enqueue_many(["a", "b"])
+    assert buffer.is_full() == True
+    assert buffer.try_enqueue("c") == False
+    assert buffer.peek() == "a"
+    buffer.clear()
+    try:
+        buffer.dequeue()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    for args in [(0,), (4, None, "drop")]:
+        try:
+            RingBuffer(*args)
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+
+
+def test_ring_buffer_back_pressure():
+    """Test that a blocking buffer makes a fast producer wait for its consumer."""
+    buffer = RingBuffer(4, overflow="block")
+    received = []
+
+    def consumer():
+        for _ in range(5000):
+            received.append(buffer.dequeue())
+
+    thread = threading.Thread(target=consumer)
+    thread.start()
+    for i in range(5000):
+        buffer.enqueue(i)
+    thread.join()
+    assert received == list(range(5000))
+    assert buffer.overwritten == 0
+
+    buffer.enqueue_many([1, 2, 3, 4])
+    assert buffer.try_enqueue(5) == False
+    try:
+        buffer.enqueue(5, timeout=0.01)
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    assert buffer.dequeue_many(4) == [1, 2, 3, 4]
+    try:
+        buffer.dequeue(timeout=0.01)
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+
+
+def test_aggregate_queue():
+    """Test aggregates of the whole queue and of a sliding window."""
+    rng = random.Random(2)
+    for combine, fold in [('min', min), ('max', max), ('sum', operator.add),
+                          (lambda a, b: a + b, operator.add)]:
+        queue = AggregateQueue(combine)
+        reference = deque()
+        for _ in range(2000):
+            if rng.random() < 0.55:
+                item = rng.randint(0, 99)
+                queue.enqueue(item)
+                reference.append(item)
+            elif reference:
+                assert queue.dequeue() == reference.popleft()
+            if reference:
+                expected = reference[0]
+                for item in list(reference)[1:]:
+                    expected = fold(expected, item)
+                assert queue.aggregate() == expected
+
+    # The fold keeps queue order for non-commutative combine functions
+    queue = AggregateQueue(lambda a, b: a + b, identity="")
+    reference = deque()
+    for _ in range(2000):
+        if rng.random() < 0.55:
+            item = rng.choice("abcdef")
+            queue.enqueue(item)
+            reference.append(item)
+        elif reference:
+            queue.dequeue()
+            reference.popleft()
+        assert queue.aggregate() == "".join(reference)
+
+    values = [rng.random() for _ in range(500)]
+    window = AggregateQueue('min', window=7)
+    for index, value in enumerate(values):
+        window.enqueue(value)
+        assert window.aggregate() == min(values[max(index - 6, 0):index + 1])
+    assert window.size() == 7
+
+    assert AggregateQueue('sum').aggregate() == 0
+    try:
+        AggregateQueue('max').aggregate()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+
+
+def run_all_tests():
+    """Run all tests manually (for environments without pytest)."""
+    print("Running queue tests...")
+
+    try:
+        test_two_stack_queue()
+        print("✓ TwoStackQueue test passed")
+
+        test_ring_buffer_overwrite()
+        print("✓ RingBuffer overwrite test passed")
+
+        test_ring_buffer_back_pressure()
+        print("✓ RingBuffer back-pressure test passed")
+
+        test_aggregate_queue()
+        print("✓ AggregateQueue test passed")
+
+        print("\nAll tests passed! ✓")
+
+    except Exception as e:
+        print(f"Test failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -9,6 +9,19 @@ Date: 2024
 """
 
 from stack import ArrayStack, LinkedListStack, is_balanced_parentheses, evaluate_postfix, infix_to_postfix
+from stack import ExpressionCache, compile_expression, evaluate_postfix_batch, tokenize
+from stack import evaluate_infix, evaluate_many, int_mode, decimal_mode
+from stack import BracketValidator, check_balanced_stream, TypedArrayStack
+from stack import ConcurrentStack, AsyncStack, BoundedStack, PersistentStack, DiskBackedStack
+from stack import AggregateStack
+from stack import dump, load
+from stack import next_greater, next_smaller, previous_greater, previous_smaller
+from stack import stock_span, largest_rectangle, sliding_window_max
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def test_array_stack_basic_operations():
@@ -73,6 +86,580 @@ def test_linked_list_stack_basic_operations():
     assert stack.is_empty() == True
 
 
+def test_persistent_stack():
+    """Test that PersistentStack versions share structure and stay valid."""
+    empty = PersistentStack()
+    assert empty.is_empty() == True
+    assert empty.size() == 0
+    
+    one = empty.push(1)
+    two = one.push(2)
+    branch = one.push('b')
+    assert list(two) == [2, 1]
+    assert list(branch) == ['b', 1]
+    assert two.peek() == 2
+    assert len(two) == 2
+    
+    item, rest = two.pop()
+    assert item == 2
+    assert list(rest) == [1]
+    assert list(two) == [2, 1]  # The old version is unchanged
+    assert rest._head is one._head  # Tails are shared
+    
+    snapshot = two.snapshot()
+    assert list(snapshot.push(3)) == [3, 2, 1]
+    assert list(snapshot) == [2, 1]
+    
+    assert list(PersistentStack([1, 2, 3])) == [3, 2, 1]
+    
+    for method in [empty.pop, empty.peek]:
+        try:
+            method()
+            assert False, "Should raise IndexError"
+        except IndexError:
+            pass
+    try:
+        one._size = 5
+        assert False, "Should raise AttributeError"
+    except AttributeError:
+        pass
+
+
+def test_typed_array_stack():
+    """Test the array.array-backed TypedArrayStack."""
+    stack = TypedArrayStack('q')
+    assert stack.is_empty() == True
+    assert stack.typecode == 'q'
+    
+    stack.push(1)
+    stack.push_many([2, 3, 4, 5])
+    assert stack.size() == 5
+    assert stack.peek() == 5
+    assert stack.pop() == 5
+    assert stack.pop_many(2) == [4, 3]
+    assert stack.pop_many(0) == []
+    assert stack.nbytes() == 2 * 8
+    
+    # Zero-copy export of the live region, bottom to top
+    with stack.view() as view:
+        assert view.tolist() == [1, 2]
+        assert view.readonly
+    stack.push(6)
+    
+    # Over-popping raises and leaves the stack unchanged
+    try:
+        stack.pop_many(4)
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    assert stack.size() == 3
+    
+    for _ in range(3):
+        stack.pop()
+    try:
+        stack.pop()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    try:
+        stack.peek()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+
+
+def test_bulk_operations():
+    """Test push_many, pop_many, peek_many and clear on every stack."""
+    for stack in [ArrayStack(), LinkedListStack(), TypedArrayStack('q')]:
+        stack.push_many(range(5))
+        assert stack.size() == 5
+        assert stack.peek() == 4
+        assert stack.peek_many(3) == [4, 3, 2]
+        assert stack.peek_many(5) == [4, 3, 2, 1, 0]
+        assert stack.peek_many(0) == []
+        assert stack.size() == 5  # peek_many shouldn't remove items
+        
+        assert stack.pop_many(2) == [4, 3]
+        assert stack.size() == 3
+        assert stack.pop() == 2
+        
+        # Asking for too many raises and leaves the stack unchanged
+        for method in [stack.pop_many, stack.peek_many]:
+            try:
+                method(3)
+                assert False, "Should raise IndexError"
+            except IndexError:
+                pass
+        assert stack.size() == 2
+        
+        stack.clear()
+        assert stack.is_empty() == True
+        stack.push(7)
+        assert stack.pop() == 7
+
+
+def test_bounded_stack():
+    """Test that BoundedStack evicts its oldest items past its limits."""
+    stack = BoundedStack(max_items=3)
+    stack.push_many([1, 2, 3, 4, 5])
+    assert stack.size() == 3
+    assert stack.pop_many(3) == [5, 4, 3]
+    assert stack.evicted_items == 2
+    
+    stack = BoundedStack(max_bytes=100, sizeof=len)
+    stack.push("a" * 40)
+    stack.push("b" * 40)
+    stack.push("c" * 40)  # Evicts the a's
+    assert stack.peek_many(2) == ["c" * 40, "b" * 40]
+    assert stack.stats() == {'retained_items': 2, 'retained_bytes': 80,
+                             'evicted_items': 1, 'evicted_bytes': 40}
+    
+    # The newest item is kept even if it alone exceeds the budget
+    stack.push("d" * 500)
+    assert stack.size() == 1
+    assert stack.peek() == "d" * 500
+    
+    stack.clear()
+    assert stack.is_empty() == True
+    assert stack.retained_bytes == 0
+    try:
+        stack.pop()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+
+
+def test_aggregate_stack():
+    """Test that AggregateStack keeps its aggregate through pushes and pops."""
+    import math
+    import operator
+    import random
+    
+    for combine, fold in [('min', min), ('max', max), ('sum', operator.add),
+                          (min, min), (math.gcd, math.gcd)]:
+        stack = AggregateStack(combine)
+        reference = []
+        rng = random.Random(3)
+        for _ in range(2000):
+            choice = rng.random()
+            if choice < 0.4:
+                item = rng.randint(1, 1000)
+                stack.push(item)
+                reference.append(item)
+            elif choice < 0.55:
+                items = [rng.randint(1, 1000) for _ in range(rng.randint(0, 5))]
+                stack.push_many(items)
+                reference.extend(items)
+            elif choice < 0.85 and reference:
+                assert stack.pop() == reference.pop()
+            elif reference:
+                n = rng.randint(0, len(reference))
+                expected = reference[len(reference) - n:][::-1]
+                del reference[len(reference) - n:]
+                assert stack.pop_many(n) == expected
+            if reference:
+                expected = reference[0]
+                for item in reference[1:]:
+                    expected = fold(expected, item)
+                assert stack.aggregate() == expected
+    
+    # Empty stacks return the identity, or raise without one
+    assert AggregateStack('sum').aggregate() == 0
+    assert AggregateStack('min', identity=math.inf).aggregate() == math.inf
+    stack = AggregateStack('max')
+    stack.push_many(["b", "c", "a"])
+    assert stack.aggregate() == "c"
+    stack.clear()
+    try:
+        stack.aggregate()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    try:
+        AggregateStack('median')
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+
+
+def test_disk_backed_stack():
+    """Test spilling to disk and reading back under interleaved operations."""
+    import random
+    
+    for typecode in [None, 'q']:
+        rng = random.Random(7)
+        reference = []
+        with DiskBackedStack(memory_items=8, typecode=typecode) as stack:
+            for i in range(5000):
+                choice = rng.random()
+                if choice < 0.5 or not reference:
+                    item = i if typecode else (i, str(i))
+                    stack.push(item)
+                    reference.append(item)
+                elif choice < 0.9:
+                    assert stack.pop() == reference.pop()
+                else:
+                    assert stack.peek() == reference[-1]
+                assert stack.memory_items() <= 8
+            assert stack.size() == len(reference)
+            assert stack.spills > 0 and stack.loads > 0
+            while reference:
+                assert stack.pop() == reference.pop()
+            assert stack.is_empty() == True
+            assert stack.disk_bytes() == 0
+    
+    stack = DiskBackedStack(memory_items=4)
+    for i in range(100):
+        stack.push(i)
+    assert len(stack) == 100
+    assert stack.disk_bytes() > 0
+    stack.clear()
+    assert stack.is_empty() == True
+    try:
+        stack.peek()
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    stack.close()
+    
+    try:
+        DiskBackedStack(memory_items=1)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+
+
+def test_snapshots():
+    """Test dump/load round trips for every stack class."""
+    import io
+    
+    def round_trip(stack, batch_size=3):
+        f = io.BytesIO()
+        dump(stack, f, batch_size=batch_size)
+        f.seek(0)
+        restored = load(f)
+        assert f.read() == b""
+        return restored
+    
+    items = [(i, str(i), bytearray(i)) for i in range(20)]
+    array_stack = ArrayStack()
+    array_stack.push_many(items)
+    restored = round_trip(array_stack)
+    assert type(restored) is ArrayStack
+    assert list(restored) == list(array_stack)
+    
+    # Deeper than the recursion limit
+    ll_stack = LinkedListStack(pool_size=5)
+    ll_stack.push_many(range(100000))
+    restored = round_trip(ll_stack, batch_size=1000)
+    assert list(restored) == list(ll_stack)
+    assert restored.pool_size == 5
+    
+    persistent = PersistentStack(items)
+    assert list(round_trip(persistent)) == list(persistent)
+    
+    typed = TypedArrayStack('q', range(10))
+    restored = round_trip(typed)
+    assert restored.typecode == 'q'
+    assert list(restored) == list(typed)
+    assert round_trip(TypedArrayStack('d')).is_empty() == True
+    
+    bounded = BoundedStack(max_items=5)
+    bounded.push_many(range(10))
+    restored = round_trip(bounded)
+    assert list(restored) == list(bounded)
+    assert restored.max_items == 5
+    
+    aggregate = AggregateStack('min', identity=100)
+    aggregate.push_many([5, 3, 8])
+    restored = round_trip(aggregate)
+    assert list(restored) == [8, 3, 5]
+    assert restored.aggregate() == 3
+    restored.pop_many(3)
+    assert restored.aggregate() == 100
+    
+    for typecode in [None, 'q']:
+        with DiskBackedStack(memory_items=4, typecode=typecode) as disk:
+            for i in range(50):
+                disk.push(i)
+            with round_trip(disk) as restored:
+                assert [restored.pop() for _ in range(50)] == list(range(49, -1, -1))
+            assert disk.size() == 50
+    
+    concurrent = ConcurrentStack(maxsize=10)
+    for i in range(3):
+        concurrent.push(i)
+    restored = round_trip(concurrent)
+    assert restored.maxsize == 10
+    assert [restored.pop() for _ in range(3)] == [2, 1, 0]
+    
+    async_stack = AsyncStack(storage=LinkedListStack)
+    async_stack.push_nowait("a")
+    async_stack.push_nowait("b")
+    restored = round_trip(async_stack)
+    assert restored.pop_nowait() == "b"
+    assert restored.size() == 1
+    
+    if np is not None:
+        array_stack = ArrayStack()
+        array_stack.push(np.arange(5))
+        assert list(round_trip(array_stack).peek()) == [0, 1, 2, 3, 4]
+    
+    # Errors
+    f = io.BytesIO()
+    dump(array_stack, f)
+    for data in [b"not a snapshot", f.getvalue()[:-3]]:
+        try:
+            load(io.BytesIO(data))
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+    for stack in [ArrayStack(), BoundedStack(max_bytes=10, sizeof=lambda item: 1),
+                  AggregateStack(lambda a, b: a + b)]:
+        f = io.BytesIO()
+        try:
+            dump([1, 2] if type(stack) is ArrayStack else stack, f)
+            assert False, "Should raise TypeError"
+        except TypeError:
+            pass
+        assert f.getvalue() == b""  # Rejected before writing anything
+    
+    # The garbage collector is only paused on request
+    import gc
+    f = io.BytesIO()
+    dump(ll_stack, f, batch_size=1000)
+    for disable_gc in [False, True]:
+        f.seek(0)
+        assert list(load(f, disable_gc=disable_gc)) == list(ll_stack)
+        assert gc.isenabled() == True
+
+
+def test_concurrent_stack_stress():
+    """Test that concurrent pushes and pops neither lose nor duplicate items."""
+    import threading
+    
+    for options in [{}, {'maxsize': 8}, {'elimination': True},
+                    {'maxsize': 8, 'elimination': True}]:
+        stack = ConcurrentStack(**options)
+        popped = []
+        popped_lock = threading.Lock()
+        
+        def produce(worker):
+            for i in range(2000):
+                stack.push((worker, i))
+        
+        def consume():
+            items = [stack.pop(timeout=10) for _ in range(2000)]
+            with popped_lock:
+                popped.extend(items)
+        
+        threads = ([threading.Thread(target=produce, args=(w,)) for w in range(4)] +
+                   [threading.Thread(target=consume) for _ in range(4)])
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sorted(popped) == [(w, i) for w in range(4) for i in range(2000)]
+        assert stack.is_empty() == True
+
+
+def test_concurrent_stack_blocking():
+    """Test timeouts, back-pressure and the non-blocking variants."""
+    import threading
+    
+    stack = ConcurrentStack(maxsize=2)
+    assert stack.try_pop() is None
+    assert stack.try_pop(default='empty') == 'empty'
+    try:
+        stack.pop(timeout=0.01)
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    
+    assert stack.try_push(1) == True
+    stack.push(2)
+    assert stack.is_full() == True
+    assert stack.try_push(3) == False
+    try:
+        stack.push(3, timeout=0.01)
+        assert False, "Should raise IndexError"
+    except IndexError:
+        pass
+    assert stack.peek() == 2
+    
+    # A blocked push completes once a pop makes room
+    pusher = threading.Thread(target=stack.push, args=(3,))
+    pusher.start()
+    assert stack.pop() == 2
+    pusher.join(timeout=5)
+    assert stack.pop() == 3
+    assert stack.pop() == 1
+    
+    # A blocked pop wakes up on push
+    result = []
+    popper = threading.Thread(target=lambda: result.append(stack.pop(timeout=5)))
+    popper.start()
+    stack.push('late')
+    popper.join(timeout=5)
+    assert result == ['late']
+    
+    # Timeouts give up on a lock held elsewhere; non-blocking calls only
+    # refuse to wait for items or space, so contention never fails them
+    for options in [{}, {'elimination': True}]:
+        stack = ConcurrentStack(maxsize=2, **options)
+        stack.push(1)
+        with stack._lock:
+            for method, args in [(stack.pop, ()), (stack.push, (2,))]:
+                try:
+                    method(*args, timeout=0.01)
+                    assert False, "Should raise IndexError"
+                except IndexError:
+                    pass
+        stack._lock.acquire()
+        releaser = threading.Timer(0.02, stack._lock.release)
+        releaser.start()
+        assert stack.try_push(2) == True
+        releaser.join()
+        stack._lock.acquire()
+        releaser = threading.Timer(0.02, stack._lock.release)
+        releaser.start()
+        assert stack.try_pop(default='busy') == 2
+        releaser.join()
+        assert stack.try_push(3) == True
+        assert stack.try_push(4) == False
+        assert stack.pop() == 3
+        assert stack.pop() == 1
+        assert stack.try_pop(default='empty') == 'empty'
+
+
+def test_concurrent_stack_elimination():
+    """Test that a pop can take an item offered by a contended push."""
+    import threading
+    import time
+    
+    stack = ConcurrentStack(elimination=True, slots=1, spins=100000)
+    stack._lock.acquire()  # Simulate contention
+    pusher = threading.Thread(target=stack.push, args=('handed over',))
+    pusher.start()
+    while not stack._slots[0]:
+        time.sleep(0.001)
+    assert stack.pop() == 'handed over'
+    stack._lock.release()
+    pusher.join(timeout=5)
+    assert stack.eliminated == 1
+    assert stack.is_empty() == True
+
+
+def test_async_stack():
+    """Test awaitable pop, bounded push, cancellation and join."""
+    import asyncio
+    
+    async def scenario():
+        stack = AsyncStack(maxsize=2)
+        try:
+            stack.pop_nowait()
+            assert False, "Should raise IndexError"
+        except IndexError:
+            pass
+        
+        # A waiting pop is woken by a push
+        popper = asyncio.ensure_future(stack.pop())
+        await asyncio.sleep(0)
+        await stack.push('a')
+        assert await popper == 'a'
+        
+        # A cancelled waiter doesn't swallow the wake-up
+        cancelled = asyncio.ensure_future(stack.pop())
+        waiting = asyncio.ensure_future(stack.pop())
+        await asyncio.sleep(0)
+        stack.push_nowait('b')
+        cancelled.cancel()
+        assert await waiting == 'b'
+        assert cancelled.cancelled()
+        
+        # push blocks while full and resumes after a pop
+        stack.push_nowait(1)
+        stack.push_nowait(2)
+        try:
+            stack.push_nowait(3)
+            assert False, "Should raise IndexError"
+        except IndexError:
+            pass
+        pusher = asyncio.ensure_future(stack.push(3))
+        await asyncio.sleep(0)
+        assert not pusher.done()
+        assert await stack.pop() == 2
+        await pusher
+        assert [stack.pop_nowait(), stack.pop_nowait()] == [3, 1]
+        
+        # join waits for task_done on every pushed item
+        for _ in range(5):
+            stack.task_done()
+        try:
+            stack.task_done()
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+        await stack.push('job')
+        joiner = asyncio.ensure_future(stack.join())
+        await asyncio.sleep(0)
+        assert not joiner.done()
+        await stack.pop()
+        stack.task_done()
+        await asyncio.wait_for(joiner, 1)
+    
+    asyncio.run(scenario())
+
+
+def test_linked_list_stack_pool():
+    """Test that pooled LinkedListStack nodes are recycled correctly."""
+    stack = LinkedListStack(pool_size=2)
+    stack.push_many(['a', 'b', 'c', 'd'])
+    assert stack.pop() == 'd'
+    assert stack.pop_many(2) == ['c', 'b']
+    assert stack._free_count == 2  # Capped at pool_size
+    
+    recycled = stack._free
+    assert recycled.data is None  # Popped items aren't kept alive
+    stack.push('e')
+    assert stack._head is recycled
+    stack.push_many(['f', 'g'])
+    assert stack._free_count == 0
+    assert stack.peek_many(4) == ['g', 'f', 'e', 'a']
+    assert stack.size() == 4
+    
+    while not stack.is_empty():
+        stack.pop()
+    assert stack._free_count == 2
+
+
+def test_stack_inspection():
+    """Test non-destructive iteration, len, bool and truncated repr."""
+    for stack in [ArrayStack(), LinkedListStack()]:
+        assert len(stack) == 0
+        assert not stack
+        
+        stack.push_many([1, 2, 3])
+        assert len(stack) == 3
+        assert stack
+        assert list(stack) == [3, 2, 1]
+        assert list(reversed(stack)) == [1, 2, 3]
+        assert stack.size() == 3  # Iteration doesn't remove items
+    
+    array_stack = ArrayStack()
+    array_stack.push_many(range(1000))
+    array_stack.repr_limit = 3
+    assert repr(array_stack) == "ArrayStack([..., 997, 998, 999], size=1000)"
+    assert str(ArrayStack()) == "ArrayStack([])"
+    
+    ll_stack = LinkedListStack()
+    ll_stack.push_many(['a', 'b', 'c'])
+    assert repr(ll_stack) == "LinkedListStack(['c', 'b', 'a'])"
+    ll_stack.repr_limit = 2
+    assert repr(ll_stack) == "LinkedListStack(['c', 'b', ...], size=3)"
+
+
 def test_stack_exceptions():
     """Test that stacks raise appropriate exceptions."""
     array_stack = ArrayStack()
@@ -122,6 +709,46 @@ def test_balanced_parentheses():
     assert is_balanced_parentheses("())") == False
 
 
+def test_balanced_parentheses_stream():
+    """Test the chunked bracket validator."""
+    import io
+    
+    # Agrees with the in-memory checker
+    for expr in ["()", "([{}])", "", "a(b[c{d}e]f)g", "(", ")", "([)]", "())"]:
+        assert check_balanced_stream(expr)[0] == is_balanced_parentheses(expr)
+        chunks = [expr[i:i + 2].encode() for i in range(0, len(expr), 2)]
+        assert check_balanced_stream(chunks)[0] == is_balanced_parentheses(expr)
+    
+    # Offsets point at the first mismatch, across chunk boundaries
+    assert check_balanced_stream([b"{[(", b"x)]", b"y)"]) == (False, 7)
+    assert check_balanced_stream(io.BytesIO(b"((x)"), chunk_size=1) == (False, 4)
+    assert check_balanced_stream(io.StringIO("[a}"), chunk_size=2) == (False, 2)
+    
+    # Buffers are read in place; offsets past a 64 KiB window stay exact
+    import mmap
+    import tempfile
+    data = b"(" + b"x" * 100000 + b"]" + b"()" * 10
+    for chunk in [bytearray(data), memoryview(data),
+                  memoryview(bytearray(data)).cast('B', (1, len(data)))]:
+        assert check_balanced_stream([b"[[", chunk]) == (False, 100003)
+    with tempfile.TemporaryFile() as f:
+        f.write(data)
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert check_balanced_stream(mapped) == (False, 100001)
+            assert check_balanced_stream([mapped[:1], memoryview(mapped)]) == (False, 100002)
+    
+    # str offsets are character indexes, not UTF-8 byte offsets
+    assert check_balanced_stream(["(é", "ü]"]) == (False, 3)
+    
+    validator = BracketValidator()
+    assert validator.feed("{[")
+    assert validator.depth == 2
+    assert validator.feed(b"]}")
+    assert validator.close()
+    assert validator.offset == 4
+
+
 def test_postfix_evaluation():
     """Test postfix expression evaluation."""
     assert evaluate_postfix("3 4 +") == 7.0
@@ -129,6 +756,9 @@ def test_postfix_evaluation():
     assert evaluate_postfix("15 7 1 1 + - / 3 * 2 1 1 + + -") == 5.0
     assert evaluate_postfix("5") == 5.0
     assert evaluate_postfix("2 3 + 4 5 + *") == 45.0
+    assert evaluate_postfix("15 7 1 1 + − / 3 × 2 1 1 + + −") == 5.0
+    assert evaluate_postfix("5 -3 + 2 **") == 4.0
+    assert evaluate_postfix("3 4+2*") == 14.0
 
 
 def test_infix_to_postfix():
@@ -137,6 +767,318 @@ def test_infix_to_postfix():
     assert infix_to_postfix("3 + 4 * 2") == "3 4 2 * +"
     assert infix_to_postfix("( 3 + 4 ) * 2") == "3 4 + 2 *"
     assert infix_to_postfix("A * B + C") == "A B * C +"
+    assert infix_to_postfix("3-4") == "3 4 -"
+    assert infix_to_postfix("(3+4)*2") == "3 4 + 2 *"
+    assert infix_to_postfix("2^3^2") == "2 3 2 ^ ^"
+    assert infix_to_postfix("1.5e3 − x × 2") == "1.5e3 x 2 * -"
+    
+    # Unary minus binds tighter than * but looser than ^
+    assert infix_to_postfix("-2^2") == "0 2 2 ^ -"
+    assert compile_expression("-2**2", notation="infix").evaluate() == -4.0
+    assert compile_expression("2*-(1+2)", notation="infix").evaluate() == -6.0
+    
+    for expression, message in [("3 4", "Invalid infix expression"),
+                                ("3 +", "Invalid infix expression"),
+                                ("(3 + 4", "Mismatched parentheses"),
+                                ("3 + 4)", "Mismatched parentheses"),
+                                ("2 $ 3", "Invalid token: $"),
+                                ("2x + 1", "Invalid token: 2x")]:
+        try:
+            infix_to_postfix(expression)
+            assert False, "Should raise ValueError"
+        except ValueError as e:
+            assert str(e) == message
+
+
+def test_evaluate_infix():
+    """Test one-pass infix evaluation against the compiled pipeline."""
+    assert evaluate_infix("3 + 4 * 2") == 11.0
+    assert evaluate_infix("(3+4)*2") == 14.0
+    assert evaluate_infix("2^3^2") == 512.0
+    assert evaluate_infix("-x**2 + y", {'x': 3, 'y': 1}) == -8.0
+    
+    variables = {'a': 2, 'b': 0.5}
+    for expression in ["a*(b+1)/-a", "1.5e2 - a ^ -b", "((a))", "- - a",
+                       "1/0 + 2)", "a + c", "1 / (a - a)", "(a +", "a b", "2 ? 1"]:
+        try:
+            expected = compile_expression(expression, notation="infix").evaluate(variables)
+        except ValueError as e:
+            expected = str(e)
+        try:
+            result = evaluate_infix(expression, variables)
+        except ValueError as e:
+            result = str(e)
+        assert result == expected, expression
+
+
+def test_evaluate_many():
+    """Test batch evaluation in and across processes."""
+    expressions = [f"{i} * x + 1" for i in range(1000)] + ["1 / 0", "x +"]
+    expected = [i * 2.0 + 1 for i in range(1000)]
+    for workers, chunksize in [(1, None), (2, 64)]:
+        results = evaluate_many(expressions, {'x': 2}, workers=workers, chunksize=chunksize)
+        assert results[:1000] == expected
+        assert [str(error) for error in results[1000:]] == [
+            "Division by zero", "Invalid infix expression"]
+    
+    # An overflow mid-batch stays in place instead of failing the batch
+    for workers in [1, 2]:
+        results = evaluate_many(["1 + 1", "big * 2", "3 * 3"], {'big': 10 ** 400},
+                                workers=workers, chunksize=1)
+        assert results[0] == 2.0 and results[2] == 9.0
+        assert isinstance(results[1], OverflowError)
+    
+    assert evaluate_many(["3 4 +", "5 ?"], notation="postfix")[0] == 7.0
+    assert evaluate_many([]) == []
+
+
+def test_numeric_modes():
+    """Test integer, Decimal and Fraction evaluation modes."""
+    from decimal import Context, Decimal
+    from fractions import Fraction
+    
+    big = "12345678901234567890 1 +"
+    assert evaluate_postfix(big, mode="int") == 12345678901234567891
+    assert evaluate_postfix("7 2 /", mode="int") == 3
+    assert evaluate_postfix("-7 2 /", mode="int") == -4
+    assert evaluate_postfix("7 2 /", mode=int_mode("true")) == Fraction(7, 2)
+    assert type(evaluate_postfix("8 2 /", mode=int_mode("true"))) is int
+    assert evaluate_postfix("0.1 0.2 +", mode="decimal") == Decimal("0.3")
+    assert evaluate_postfix("1 3 /", mode=decimal_mode(Context(prec=3))) == Decimal("0.333")
+    # Equal contexts share one mode, so the compiled program is reused
+    context = Context(prec=3)
+    assert decimal_mode(context) is decimal_mode(Context(prec=3))
+    assert decimal_mode(Context(prec=4)) is not decimal_mode(context)
+    cache = ExpressionCache()
+    for _ in range(3):
+        compile_expression("1 7 /", cache=cache, mode=decimal_mode(Context(prec=3)))
+    assert cache.stats()['hits'] == 2
+    mode = decimal_mode(context)
+    context.prec = 10  # Changing the caller's context leaves the mode alone
+    assert compile_expression("1 3 /", mode=mode).evaluate() == Decimal("0.333")
+    assert evaluate_postfix("1 3 / 3 *", mode="fraction") == 1
+    assert evaluate_postfix("2 -2 ^", mode="fraction") == Fraction(1, 4)
+    
+    program = compile_expression("price qty *", mode="decimal")
+    assert program.evaluate({'price': 0.1, 'qty': 3}) == Decimal("0.3")
+    assert compile_expression("price qty *", mode="decimal") is program
+    
+    # Errors read the same in every mode
+    for mode in ["float", "int", "decimal", "fraction", int_mode("true")]:
+        for expression, message in [("1 0 /", "Division by zero"),
+                                    ("3 4 ?", "Invalid token: ?"),
+                                    ("3 +", "Invalid postfix expression")]:
+            try:
+                evaluate_postfix(expression, mode=mode)
+                assert False, "Should raise ValueError"
+            except ValueError as e:
+                assert str(e) == message
+    for expression, mode in [("1.5 1 +", "int"), ("2 -1 ^", "int"), ("2 0.5 ^", "fraction"),
+                             ("1 2", "money")]:
+        try:
+            evaluate_postfix(expression, mode=mode)
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+
+
+def test_monotonic_kernels():
+    """Test the monotonic stack kernels against brute force."""
+    import random
+    
+    def brute_force(values, greater, forward):
+        result = []
+        for i, value in enumerate(values):
+            others = range(i + 1, len(values)) if forward else range(i - 1, -1, -1)
+            result.append(next((j for j in others if (values[j] > value if greater
+                                                      else values[j] < value)), -1))
+        return result
+    
+    assert next_greater([2, 1, 3, 3, 0]) == [2, 2, -1, -1, -1]
+    assert previous_smaller([3, 1, 2, 5, 4]) == [-1, -1, 1, 2, 2]
+    assert stock_span([100, 80, 60, 70, 60, 75, 85]) == [1, 1, 1, 2, 1, 4, 6]
+    assert largest_rectangle([2, 1, 5, 6, 2, 3]) == (10, 2, 4)
+    assert largest_rectangle([]) == (0, 0, 0)
+    assert sliding_window_max([1, 3, -1, -3, 5, 3, 6, 7], 3) == [1, 1, 4, 4, 6, 7]
+    assert sliding_window_max([1, 2], 3) == []
+    
+    rng = random.Random(3)
+    kernels = [(next_greater, True, True), (next_smaller, False, True),
+               (previous_greater, True, False), (previous_smaller, False, False)]
+    for _ in range(100):
+        values = [rng.randint(0, rng.choice([2, 10, 100])) for _ in range(rng.randint(0, 80))]
+        for kernel, greater, forward in kernels:
+            expected = brute_force(values, greater, forward)
+            assert kernel(values) == expected
+            if np is not None:
+                for dtype in [np.int64, np.float32, np.uint8]:
+                    chunk_size = rng.randint(1, 20)
+                    result = kernel(np.array(values, dtype=dtype), chunk_size=chunk_size)
+                    assert result.tolist() == expected
+        window = rng.randint(1, 10)
+        expected = [max(range(start, start + window), key=lambda j: (values[j], j))
+                    for start in range(len(values) - window + 1)]
+        assert sliding_window_max(values, window) == expected
+        if np is not None:
+            array_values = np.array(values)
+            assert sliding_window_max(array_values, window, chunk_size=7).tolist() == expected
+            assert stock_span(array_values, chunk_size=5).tolist() == stock_span(values)
+            assert largest_rectangle(array_values, chunk_size=5) == largest_rectangle(values)
+    
+    # Long monotonic runs exercise the carried stack and binary lifting
+    if np is not None:
+        ramp = np.concatenate([np.arange(5000, 0, -1), np.arange(5000)])
+        expected = next_greater(ramp.tolist())
+        assert next_greater(ramp, chunk_size=999).tolist() == expected
+        out = np.empty(len(ramp), dtype=np.int64)
+        assert previous_greater(ramp, out=out) is out
+        assert out.tolist() == previous_greater(ramp.tolist())
+    
+    try:
+        sliding_window_max([1, 2], 0)
+        assert False, "Should raise ValueError"
+    except ValueError:
+        pass
+
+
+def test_tokenize():
+    """Test the expression scanner."""
+    tokens = tokenize("2*-rate**1e-3")
+    assert [token.kind for token in tokens] == [
+        'number', 'operator', 'operator', 'name', 'operator', 'number']
+    assert [token.text for token in tokens] == ['2', '*', '-', 'rate', '^', '1e-3']
+    assert tokens[5].value == 0.001
+    assert [token.kind for token in tokenize("(a)")] == ['lparen', 'name', 'rparen']
+    
+    # Postfix has no unary operators, so a leading sign is part of a number
+    assert [token.value for token in tokenize("3 -4 −5-", "postfix")] == [3.0, -4.0, -5.0, '-']
+    assert [token.text for token in tokenize("3 -4", "infix")] == ['3', '-', '4']
+    
+    for expression in ["1.2.3", "4e", "a.b", "#"]:
+        try:
+            tokenize(expression)
+            assert False, "Should raise ValueError"
+        except ValueError as e:
+            assert str(e) == f"Invalid token: {expression}"
+
+
+def test_postfix_errors():
+    """Test that postfix evaluation reports malformed input."""
+    for expression, message in [("3 +", "Invalid postfix expression"),
+                                ("3 4", "Invalid postfix expression"),
+                                ("", "Invalid postfix expression"),
+                                ("3 4 ?", "Invalid token: ?"),
+                                ("( 3 4 + )", "Invalid token: ("),
+                                ("1 0 /", "Division by zero")]:
+        try:
+            evaluate_postfix(expression)
+            assert False, "Should raise ValueError"
+        except ValueError as e:
+            assert str(e) == message
+
+
+def test_compiled_expression():
+    """Test compiling and caching expressions."""
+    cache = ExpressionCache(maxsize=2)
+    
+    program = compile_expression("3 4 + 2 *", cache=cache)
+    assert program.evaluate() == 14.0
+    assert program.max_depth == 2
+    assert compile_expression("3 4 + 2 *", cache=cache) is program
+    
+    infix = compile_expression("( A + B ) * 2", notation="infix", cache=cache)
+    assert infix.source == "A B + 2 *"
+    assert infix.variables == ('A', 'B')
+    assert infix.evaluate({'A': 3, 'B': 4}) == 14.0
+    
+    compile_expression("1 2 +", cache=cache)
+    assert cache.stats() == {'hits': 1, 'misses': 3, 'evictions': 1,
+                             'size': 2, 'maxsize': 2}
+    
+    # Unbound variables fail the same way as unknown tokens
+    try:
+        infix.evaluate({'A': 1})
+        assert False, "Should raise ValueError"
+    except ValueError as e:
+        assert str(e) == "Invalid token: B"
+    
+    # A small cache shared by threads keeps evicting under concurrent lookups
+    import threading
+    shared = ExpressionCache(maxsize=4)
+    failures = []
+    
+    def worker(offset):
+        try:
+            for i in range(2000):
+                n = (i + offset) % 8
+                assert compile_expression(f"{n} 1 +", cache=shared).evaluate() == n + 1
+        except Exception as e:
+            failures.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    stats = shared.stats()
+    assert stats['hits'] + stats['misses'] == 8000
+    assert stats['size'] == 4
+    
+    # Compiled programs are immutable
+    try:
+        program._code = ()
+        assert False, "Should raise AttributeError"
+    except AttributeError:
+        pass
+
+
+def test_postfix_batch():
+    """Test batch postfix evaluation over NumPy columns."""
+    if np is None:
+        return  # Batch evaluation needs NumPy
+    
+    columns = {'P': np.array([1.0, 2.0, 3.0]), 'Q': np.array([2.0, 0.0, 4.0])}
+    result = evaluate_postfix_batch("P Q + 2 *", columns)
+    assert result.tolist() == [6.0, 4.0, 14.0]
+    
+    # Matches the scalar evaluator row by row
+    for i in range(3):
+        row = f"{columns['P'][i]} {columns['Q'][i]} + 2 *"
+        assert result[i] == evaluate_postfix(row)
+    
+    try:
+        evaluate_postfix_batch("P Q /", columns)
+        assert False, "Should raise ValueError"
+    except ValueError as e:
+        assert str(e) == "Division by zero"
+    
+    result, mask = evaluate_postfix_batch("P Q / 1 +", columns, errors="mask")
+    assert mask.tolist() == [False, True, False]
+    assert result[0] == 1.5 and np.isnan(result[1]) and result[2] == 1.75
+    
+    # Powers the scalar evaluator rejects are errors, not NaN or inf
+    for expression, values in [("x 0.5 ^", [4.0, -8.0]), ("x 1000 ^", [2.0, 10.0])]:
+        try:
+            evaluate_postfix(f"{values[1]} {expression[2:]}")
+            assert False, "Should raise ValueError"
+        except ValueError:
+            pass
+        try:
+            compile_expression(expression).evaluate_batch({'x': values})
+            assert False, "Should raise ValueError"
+        except ValueError as e:
+            assert str(e) == "Math error"
+        result, mask = compile_expression(expression).evaluate_batch({'x': values}, "mask")
+        assert mask.tolist() == [False, True]
+        assert result[0] == evaluate_postfix(f"{values[0]} {expression[2:]}")
+        assert np.isnan(result[1])
+    
+    try:
+        evaluate_postfix_batch("P R +", columns)
+        assert False, "Should raise ValueError"
+    except ValueError as e:
+        assert str(e) == "Invalid token: R"
 
 
 def run_all_tests():
@@ -150,18 +1092,84 @@ def run_all_tests():
         test_linked_list_stack_basic_operations()
         print("✓ LinkedListStack basic operations test passed")
         
+        test_persistent_stack()
+        print("✓ PersistentStack test passed")
+        
+        test_typed_array_stack()
+        print("✓ TypedArrayStack test passed")
+        
+        test_bulk_operations()
+        print("✓ Bulk operations test passed")
+        
+        test_bounded_stack()
+        print("✓ BoundedStack test passed")
+        
+        test_aggregate_stack()
+        print("✓ AggregateStack test passed")
+        
+        test_disk_backed_stack()
+        print("✓ DiskBackedStack test passed")
+        
+        test_snapshots()
+        print("✓ Snapshots test passed")
+        
+        test_concurrent_stack_stress()
+        print("✓ ConcurrentStack stress test passed")
+        
+        test_concurrent_stack_blocking()
+        print("✓ ConcurrentStack blocking test passed")
+        
+        test_concurrent_stack_elimination()
+        print("✓ ConcurrentStack elimination test passed")
+        
+        test_async_stack()
+        print("✓ AsyncStack test passed")
+        
+        test_linked_list_stack_pool()
+        print("✓ LinkedListStack pool test passed")
+        
+        test_stack_inspection()
+        print("✓ Stack inspection test passed")
+        
         test_stack_exceptions()
         print("✓ Stack exceptions test passed")
         
         test_balanced_parentheses()
         print("✓ Balanced parentheses test passed")
         
+        test_balanced_parentheses_stream()
+        print("✓ Balanced parentheses stream test passed")
+        
         test_postfix_evaluation()
         print("✓ Postfix evaluation test passed")
         
+        test_postfix_errors()
+        print("✓ Postfix errors test passed")
+        
+        test_compiled_expression()
+        print("✓ Compiled expression test passed")
+        
+        test_postfix_batch()
+        print("✓ Postfix batch test passed")
+        
         test_infix_to_postfix()
         print("✓ Infix to postfix test passed")
         
+        test_tokenize()
+        print("✓ Tokenizer test passed")
+        
+        test_evaluate_infix()
+        print("✓ Infix evaluation test passed")
+        
+        test_evaluate_many()
+        print("✓ Batch evaluation test passed")
+        
+        test_numeric_modes()
+        print("✓ Numeric modes test passed")
+        
+        test_monotonic_kernels()
+        print("✓ Monotonic kernels test passed")
+        
         print("\nAll tests passed! ✓")
         
     except Exception as e: